@@ -14,7 +14,7 @@ class AnalysisLogic:
         """
         self.loggerObj = loggerObj
 
-    def __call__(self, GP, input_data, camera_id):
+    def __call__(self, GP, input_data, camera_id, detections=None):
         """
         Invokes the AnalysisLogic to perform image analysis.
         
@@ -23,6 +23,8 @@ class AnalysisLogic:
                        for running the analysis.
         - input_data (dict): Dictionary containing image data and other related information.
         - camera_id (int/str): ID representing the camera from which the image originates.
+        - detections (tuple): Tracker model detections already computed for the image by the
+                              batch scheduler, None to run the tracker model in the interface.
         
         Returns:
         - dict: Dictionary containing analysis results, camera ID, group ID, and image ID.
@@ -35,7 +37,10 @@ class AnalysisLogic:
             # Inferencing the image using the appropriate interface object             
             
             
-            res_dict, object_count = GP.interfaceObjs[camera_id][int(input_data["iterator"])].run(image=input_data["image"]) 
+            if detections is None:
+                res_dict, object_count = GP.interfaceObjs[camera_id][int(input_data["iterator"])].run(image=input_data["image"]) 
+            else:
+                res_dict, object_count = GP.interfaceObjs[camera_id][int(input_data["iterator"])].run(image=input_data["image"], detections=detections)
             #interface.run 
             
 
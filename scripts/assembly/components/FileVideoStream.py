@@ -13,6 +13,7 @@ from requests.exceptions import RequestException
 import io
 from PIL import Image
 import numpy as np
+from assembly.components.serializer import dumps
 print=functools.partial(print, flush=True)
 
 class NodeCommServer:
@@ -112,7 +113,7 @@ class NodeCommServer:
             self.channel = None
         return None
 
-    def send(self, message):
+    def send(self, message, body=None):
         """
         Sends a message to the publishing queue.
         
@@ -120,13 +121,15 @@ class NodeCommServer:
         -----------
         message : dict
             The message to be sent.
+        body : bytes, optional
+            The message already serialized to JSON, serialized here if not given.
         """
         if not self.channel:
             self.loggerObj.logger.error("Channel is not initialized.")
             print(f"[ERROR] {datetime.datetime.now()} Channel is not initialized.")
             return
         
-        message_json = json.dumps(message)
+        message_json = body if body is not None else dumps(message)
         while True:
             try:
                 self.channel.basic_publish(exchange=self.exchange_publish, routing_key=self.publishing_queue, body=message_json)
@@ -150,6 +153,10 @@ class varientchange_server:
         self.host = host
         self.channel = None
         self.connection = None
+        self.messages = queue.Queue() # Variant change messages received by the consumer thread
+        self.message_event = threading.Event() # Set while there are messages waiting in self.messages
+        self.consuming = False
+        self.consumer_thread = None
         self.loggerObj.logger.info("varientchangeServer initialized.")
 
 
@@ -198,16 +205,7 @@ class varientchange_server:
             if method_frame:
                 print("routing_key: ", method_frame.routing_key)
                 self.channel.basic_ack(delivery_tag=method_frame.delivery_tag)
-                print(f"[INFO] {datetime.datetime.now()} Read a file from Queue for {self.consuming_queue} with key {method_frame.routing_key}!!!")
-                self.loggerObj.queuing_logger.info(f"Read a file from Queue for {self.consuming_queue} with key {method_frame.routing_key}!!!")
-                self.loggerObj.loop_logger.info(f"Read a file from Queue for {self.consuming_queue} with key {method_frame.routing_key}!!!")
-                message = json.loads(body)
-                message["camera_id"] = method_frame.routing_key
-                # if 'variant_change' in message:
-                #     message["type"] = "variant_change"
-                # else:
-                #     message["type"] = "data"
-                return message
+                return self.parse_message(method_frame, body)
             else:
                 return None
             
@@ -217,6 +215,101 @@ class varientchange_server:
             self.channel = None
         return None
 
+    def parse_message(self, method_frame, body):
+        """
+        Converts a message delivered from the consuming queue to a JSON object.
+
+        Returns:
+        --------
+        dict
+            The message with the routing key added as camera_id.
+        """
+        print(f"[INFO] {datetime.datetime.now()} Read a file from Queue for {self.consuming_queue} with key {method_frame.routing_key}!!!")
+        self.loggerObj.queuing_logger.info(f"Read a file from Queue for {self.consuming_queue} with key {method_frame.routing_key}!!!")
+        self.loggerObj.loop_logger.info(f"Read a file from Queue for {self.consuming_queue} with key {method_frame.routing_key}!!!")
+        message = json.loads(body)
+        message["camera_id"] = method_frame.routing_key
+        # if 'variant_change' in message:
+        #     message["type"] = "variant_change"
+        # else:
+        #     message["type"] = "data"
+        return message
+
+    def start_consumer(self):
+        """
+        Starts a background thread that owns the RabbitMQ connection and waits for
+        variant change messages, so the main loop never has to poll the broker.
+        Received messages are put on self.messages and self.message_event is set.
+        """
+        self.consuming = True
+        self.consumer_thread = threading.Thread(target=self.consume, daemon=True)
+        self.consumer_thread.start()
+
+    def stop_consumer(self):
+        """
+        Stops the background consumer thread.
+        """
+        self.consuming = False
+        if self.consumer_thread is not None and self.consumer_thread is not threading.current_thread():
+            self.consumer_thread.join(timeout=5)
+        self.consumer_thread = None
+
+    def on_message(self, channel, method_frame, header_frame, body):
+        # Called by pika in the consumer thread for every delivered message
+        try:
+            message = self.parse_message(method_frame, body)
+            self.messages.put(message)
+            self.message_event.set()
+        except Exception as e:
+            self.loggerObj.logger.exception(f"Error in varientchangeServer message: {e}")
+            print(f"[ERROR] {datetime.datetime.now()} Error in varientchangeServer message: {e}")
+        channel.basic_ack(delivery_tag=method_frame.delivery_tag)
+
+    def consume(self):
+        """
+        Consumer thread loop, (re)connects to RabbitMQ and dispatches delivered messages
+        to on_message until stop_consumer is called.
+        """
+        while self.consuming:
+            try:
+                if not self.channel:
+                    self.start()
+                    if not self.channel:
+                        time.sleep(1)
+                        continue
+                    self.channel.basic_consume(queue=self.consuming_queue, on_message_callback=self.on_message)
+                # Waits for deliveries, returning regularly to check if the consumer is stopped
+                self.connection.process_data_events(time_limit=1)
+            except Exception as e:
+                self.loggerObj.logger.exception(f"Error in varientchangeServer consume: {e}")
+                print(f"[ERROR] {datetime.datetime.now()} Error in varientchangeServer consume: {e}")
+                self.channel = None
+                time.sleep(1)
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.channel = None
+
+    def get_message(self):
+        """
+        Returns the next variant change message received by the consumer thread without blocking.
+
+        Returns:
+        --------
+        dict or None
+            The next message, None if there is none.
+        """
+        self.message_event.clear()
+        try:
+            message = self.messages.get_nowait()
+        except queue.Empty:
+            return None
+        if not self.messages.empty():
+            self.message_event.set()
+        return message
+
 
 
 
@@ -0,0 +1,93 @@
+import os, time
+from collections import OrderedDict
+
+
+# Class that batches the tracker detection of frames coming from different cameras
+class BatchScheduler:
+    """
+    Groups the frames extracted from the shared queue by the tracker model they use
+    (model uuid in GP.ModelDict) and runs a single batched forward per model. The
+    detections are then scattered back so that each camera's Interface only has to
+    run the tracker and the ROI processors.
+
+    Attributes:
+        GP (object): Global Parameters object holding the interface objects.
+        loggerObj (object): Logger object to log information.
+        max_batch (int): Maximum number of frames extracted for one batch.
+        max_wait (float): Seconds to wait for more frames after the first one arrived.
+    """
+
+    def __init__(self, GP, loggerObj, max_batch=None, max_wait_ms=None):
+        """
+        Initializes the BatchScheduler.
+
+        Args:
+            GP (object): Global Parameters object.
+            loggerObj (object): Logger object.
+            max_batch (int): Maximum batch size, defaults to BATCH_MAX_SIZE env or 4.
+            max_wait_ms (float): Maximum wait in milliseconds, defaults to BATCH_MAX_WAIT_MS env or 5.
+        """
+        self.GP = GP
+        self.loggerObj = loggerObj
+        self.max_batch = max(1, int(max_batch if max_batch is not None else os.getenv("BATCH_MAX_SIZE", 4)))
+        self.max_wait = float(max_wait_ms if max_wait_ms is not None else os.getenv("BATCH_MAX_WAIT_MS", 5)) / 1000
+
+    # Method to get the interface that processes a frame
+    def getInterface(self, camera_id, input_data):
+        """
+        Returns the Interface object built for the camera and iterator of a frame.
+
+        Args:
+            camera_id (str): The identifier for the camera.
+            input_data (dict): The frame info extracted from the queue.
+
+        Returns:
+            object: The Interface object.
+        """
+        return self.GP.interfaceObjs[camera_id][int(input_data["iterator"])]
+
+    # Method to group the frames by tracker model
+    def group(self, batch):
+        """
+        Groups the frames of a batch by the uuid of their tracker model. Frames whose
+        pipeline has no tracker or skips the detection on this frame are left out.
+
+        Args:
+            batch (list): (camera_id, frame_info) pairs.
+
+        Returns:
+            OrderedDict: Model uuid as the key and the indices of the frames in the batch as value.
+        """
+        groups = OrderedDict()
+        for ind, (camera_id, input_data) in enumerate(batch):
+            interface = self.getInterface(camera_id, input_data)
+            if not interface.tracker_status or not interface.needsDetection():
+                continue
+            groups.setdefault(interface.tracker_model_id, []).append(ind)
+        return groups
+
+    # Method to run the batched detection
+    def run(self, batch):
+        """
+        Runs one batched forward per tracker model on the tracker inputs of the frames of the
+        batch (detection band, downscaled), the boxes are returned in frame coordinates.
+
+        Args:
+            batch (list): (camera_id, frame_info) pairs.
+
+        Returns:
+            list: Detections (bboxes, classes, scores) for each frame of the batch, None for
+                  frames without a tracker.
+        """
+        detections = [None] * len(batch)
+        for model_id, indices in self.group(batch).items():
+            x = time.time()
+            interfaces = [self.getInterface(*batch[ind]) for ind in indices]
+            # Each frame is cut to the detection band and scaled as set in its pipeline
+            inputs = [interface.trackerInput(batch[ind][1]["image"]) for ind, interface in zip(indices, interfaces)]
+            images = [image for image, _ in inputs]
+            results = interfaces[0].tracker_model.forward_batch(images=images)
+            for ind, interface, (_, transform), result in zip(indices, interfaces, inputs, results):
+                detections[ind] = interface.remapDetections(result, transform)
+            self.loggerObj.loop_logger.info(f"Batched tracker detection of {len(images)} frames with model {model_id} took {time.time() - x}")
+        return detections
@@ -0,0 +1,207 @@
+import os, time, queue
+import ctypes
+import multiprocessing
+import numpy as np
+from multiprocessing import shared_memory
+
+
+# Shared memory ring buffer used to pass frames from a transmitter process to the MainProcessor
+class FrameRingBuffer:
+    """
+    A fixed-slot shared memory ring buffer for a single transmitter (camera).
+
+    The transmitter process writes the pixels of a grabbed frame straight into one of the
+    slots and only a small header (slot index, frame count, configId, beltId, ...) is put
+    on the shared queue. The MainProcessor reads the pixels from the slot and hands the slot
+    back once it has its own copy, so the frame itself is never pickled.
+
+    Attributes:
+        transmitter_id (str): ID of the transmitter that owns this buffer.
+        num_slots (int): Number of frames that can be in flight at the same time.
+        free_slots (multiprocessing.Queue): Queue of (generation, slot) pairs that can be written.
+        slot_size (int): Size of a single slot in bytes (the camera PayloadSize).
+        generation (int): Increased every time the slots are reallocated.
+        acquire_timeout (float): Seconds the transmitter waits for a free slot before the
+                                 frame is dropped.
+    """
+
+    def __init__(self, transmitter_id, num_slots=None, acquire_timeout_ms=None):
+        """
+        Initializes the FrameRingBuffer. Shared memory is only allocated by the
+        transmitter process once the payload size of the camera is known.
+
+        Args:
+            transmitter_id (str): ID of the transmitter that owns this buffer.
+            num_slots (int): Number of slots, defaults to FRAME_BUFFER_SLOTS env or 8.
+            acquire_timeout_ms (float): Wait for a free slot, defaults to FRAME_SLOT_WAIT_MS env or 10.
+        """
+        self.transmitter_id = transmitter_id
+        self.num_slots = int(num_slots if num_slots is not None else os.getenv("FRAME_BUFFER_SLOTS", 8))
+        self.acquire_timeout = float(acquire_timeout_ms if acquire_timeout_ms is not None else os.getenv("FRAME_SLOT_WAIT_MS", 10)) / 1000
+        self.free_slots = multiprocessing.Queue()
+        self.slot_size = 0
+        self.generation = 0
+        self.shm = None # Producer side shared memory block
+        self.slot_views = [] # Producer side flat numpy views of each slot
+        self.attached = {} # Consumer side shared memory blocks by name
+
+    def __getstate__(self):
+        # Shared memory handles are process local, only the queue and sizes are shared
+        state = self.__dict__.copy()
+        state["shm"] = None
+        state["slot_views"] = []
+        state["attached"] = {}
+        return state
+
+    # -------------------------- Transmitter (producer) side --------------------------
+    def allocate(self, slot_size):
+        """
+        Allocates the shared memory slots for the given payload size. Called by the
+        transmitter process after the camera is configured, does nothing if the slots
+        are already allocated with the same size.
+
+        Args:
+            slot_size (int): Size of one frame in bytes.
+        """
+        slot_size = int(slot_size)
+        if self.shm is not None and slot_size == self.slot_size:
+            return
+        self.close()
+        self.generation += 1
+        self.slot_size = slot_size
+        name = f"frames_{self.transmitter_id.replace('-', '')[:12]}_{os.getpid()}_{self.generation}"
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=self.slot_size * self.num_slots)
+        self.slot_views = [np.ndarray((self.slot_size,), dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_size) for slot in range(self.num_slots)]
+        for slot in range(self.num_slots):
+            self.free_slots.put((self.generation, slot))
+
+    def acquire(self, timeout=None):
+        """
+        Gets a slot that is free to be written. The wait is kept short so a slow MainProcessor
+        makes the transmitter drop frames instead of stalling the camera.
+
+        Args:
+            timeout (float): Seconds to wait for the MainProcessor to give back a slot,
+                             defaults to acquire_timeout, 0 only takes a slot already free.
+
+        Returns:
+            int or None: Slot index, or None if no slot was freed in time.
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+        while True:
+            try:
+                generation, slot = self.free_slots.get(timeout=max(0., deadline - time.time()))
+            except queue.Empty:
+                return None
+            # Slots from an older allocation are dropped
+            if generation == self.generation:
+                return slot
+
+    def slot_array(self, slot, shape):
+        """
+        Returns a numpy array that writes directly into the given slot.
+
+        Args:
+            slot (int): Slot index.
+            shape (tuple): Shape of the frame, e.g. (height, width).
+
+        Returns:
+            np.ndarray: uint8 array backed by the shared memory slot.
+        """
+        nbytes = int(np.prod(shape))
+        return self.slot_views[slot][:nbytes].reshape(shape)
+
+    def slot_pointer(self, slot):
+        """
+        Returns a pointer to the memory of the given slot, used to grab a frame
+        from the camera SDK straight into the slot.
+
+        Args:
+            slot (int): Slot index.
+
+        Returns:
+            ctypes.c_void_p: Address of the first byte of the slot.
+        """
+        return self.slot_views[slot].ctypes.data_as(ctypes.c_void_p)
+
+    def discard(self, slot):
+        """
+        Puts back a slot that was acquired but never published (e.g. a failed grab).
+
+        Args:
+            slot (int): Slot index.
+        """
+        self.free_slots.put((self.generation, slot))
+
+    def header(self, slot, shape):
+        """
+        Creates the part of the frame header that points to the pixels in shared memory.
+
+        Args:
+            slot (int): Slot index.
+            shape (tuple): Shape of the frame written in the slot.
+
+        Returns:
+            dict: Slot information to be added to the frame info.
+        """
+        return {"transmitter_id": self.transmitter_id, "shm_name": self.shm.name, "generation": self.generation, "slot": slot, "slot_size": self.slot_size, "shape": tuple(shape)}
+
+    def close(self):
+        """
+        Releases and removes the shared memory owned by the transmitter.
+        """
+        if self.shm is not None:
+            self.slot_views = []
+            try:
+                self.shm.close()
+            except BufferError:
+                # A view on the buffer is still alive, it is freed with the view
+                pass
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+            self.shm = None
+
+    # -------------------------- MainProcessor (consumer) side --------------------------
+    def read(self, frame_info):
+        """
+        Returns a view of the frame pixels described by a frame header. The view is only
+        valid until the slot is released.
+
+        Args:
+            frame_info (dict): Frame header put on the shared queue by the transmitter.
+
+        Returns:
+            np.ndarray: uint8 array of shape frame_info["shape"].
+        """
+        name = frame_info["shm_name"]
+        if name not in self.attached:
+            # Dropping handles of older allocations of this transmitter
+            self.detach()
+            self.attached[name] = shared_memory.SharedMemory(name=name)
+        shape = tuple(frame_info["shape"])
+        offset = frame_info["slot"] * frame_info["slot_size"]
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.attached[name].buf, offset=offset)
+
+    def release(self, frame_info):
+        """
+        Gives the slot of a frame header back to the transmitter.
+
+        Args:
+            frame_info (dict): Frame header whose pixels are no longer needed.
+        """
+        self.free_slots.put((frame_info["generation"], frame_info["slot"]))
+
+    def detach(self):
+        """
+        Closes the consumer side handles of the shared memory.
+        """
+        for shm in self.attached.values():
+            try:
+                shm.close()
+            except BufferError:
+                # A view on the buffer is still alive, it is freed with the view
+                pass
+        self.attached = {}
@@ -0,0 +1,165 @@
+import os, time, datetime, threading, functools
+from collections import deque
+import cv2
+print=functools.partial(print, flush=True)
+
+
+# Pool of threads writing the annotated images to disk
+class ImageWriter:
+    """
+    Encodes and writes images from a pool of threads fed by a bounded queue, so the main
+    loop only has to enqueue them. cv2 releases the GIL while encoding and writing, so the
+    threads run in parallel with the inference.
+
+    Attributes:
+        loggerObj (object): Logger object to log information.
+        workers (int): Number of writer threads.
+        max_queue (int): Maximum number of images waiting to be written.
+        quality (int): JPEG quality (0-100).
+        policy (str): What to do when the queue is full, "skip" does not write the new one,
+                      "drop_oldest" replaces the oldest image waiting (already advertised by
+                      isPathUsed, which is then not exact).
+        late_after (float): Seconds after which a write is counted as late.
+        counters (dict): Number of queued, written, dropped, late and failed writes.
+    """
+
+    def __init__(self, loggerObj, workers=None, max_queue=None, quality=None, policy=None, late_ms=None):
+        """
+        Initializes the ImageWriter, the threads are started by start.
+
+        Args:
+            loggerObj (object): Logger object.
+            workers (int): Writer threads, defaults to IMAGE_WRITER_WORKERS env or 2.
+            max_queue (int): Queue size, defaults to IMAGE_WRITER_QUEUE env or 16.
+            quality (int): JPEG quality, defaults to IMAGE_JPEG_QUALITY env or 95 (cv2 default).
+            policy (str): Full queue policy, defaults to IMAGE_WRITER_POLICY env or "skip".
+            late_ms (float): Late write threshold in milliseconds, defaults to IMAGE_WRITER_LATE_MS env or 1000.
+        """
+        self.loggerObj = loggerObj
+        self.workers = max(1, int(workers if workers is not None else os.getenv("IMAGE_WRITER_WORKERS", 2)))
+        self.max_queue = max(1, int(max_queue if max_queue is not None else os.getenv("IMAGE_WRITER_QUEUE", 16)))
+        self.quality = int(quality if quality is not None else os.getenv("IMAGE_JPEG_QUALITY", 95))
+        self.policy = policy if policy is not None else os.getenv("IMAGE_WRITER_POLICY", "skip")
+        if self.policy not in ("drop_oldest", "skip"):
+            raise ValueError(f"Unknown image writer policy {self.policy}")
+        self.late_after = float(late_ms if late_ms is not None else os.getenv("IMAGE_WRITER_LATE_MS", 1000)) / 1000
+
+        self.images = deque()
+        self.condition = threading.Condition()
+        self.counters = {"queued": 0, "written": 0, "dropped": 0, "late": 0, "failed": 0}
+        self.in_progress = 0
+        self.running = False
+        self.threads = []
+
+    def start(self):
+        """
+        Starts the writer threads.
+        """
+        self.running = True
+        self.threads = [threading.Thread(target=self.loop, daemon=True) for _ in range(self.workers)]
+        for thread in self.threads:
+            thread.start()
+        self.loggerObj.logger.info(f"ImageWriter started with {self.workers} threads.")
+
+    def stop(self, timeout=5):
+        """
+        Stops the writer threads once the queued images are written.
+
+        Args:
+            timeout (float): Seconds to wait for each thread.
+        """
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join(timeout=timeout)
+        self.threads = []
+
+    def write(self, path, image, sidecar=None):
+        """
+        Enqueues an image to be written, never blocks. The image must not be modified after.
+
+        Args:
+            path (str): Path of the image file.
+            image (array): The image.
+            sidecar (tuple): Path and content (bytes) of a file that only exists with the image,
+                             dropped along with it and removed if the image cannot be written.
+
+        Returns:
+            bool: False if the image was skipped because the queue is full, otherwise True.
+        """
+        with self.condition:
+            if len(self.images) >= self.max_queue:
+                self.counters["dropped"] += 1
+                if self.policy == "skip":
+                    self.loggerObj.loop_logger.warning(f"Image queue full, skipped {path}")
+                    return False
+                dropped_path = self.images.popleft()[0]
+                self.loggerObj.loop_logger.warning(f"Image queue full, dropped {dropped_path}")
+            self.images.append((path, image, sidecar, time.time()))
+            self.counters["queued"] += 1
+            self.condition.notify()
+        return True
+
+    def flush(self, timeout=5):
+        """
+        Waits until the queued images are written.
+
+        Args:
+            timeout (float): Maximum seconds to wait.
+
+        Returns:
+            bool: True if everything was written, False on timeout.
+        """
+        end = time.time() + timeout
+        with self.condition:
+            while self.images or self.in_progress:
+                remaining = end - time.time()
+                if remaining <= 0:
+                    return False
+                self.condition.wait(timeout=remaining)
+        return True
+
+    def stats(self):
+        """
+        Returns the counters of the writer.
+
+        Returns:
+            dict: The counters and the number of images waiting.
+        """
+        with self.condition:
+            return dict(self.counters, pending=len(self.images))
+
+    def loop(self):
+        """
+        Writer thread loop, writes the queued images until stop is called and the queue is empty.
+        """
+        while True:
+            with self.condition:
+                while self.running and not self.images:
+                    self.condition.wait(timeout=1)
+                if not self.images:
+                    return
+                path, image, sidecar, queued_at = self.images.popleft()
+                self.in_progress += 1
+            try:
+                # Sidecar first, so a reader never sees the image without it
+                if sidecar is not None:
+                    with open(sidecar[0], "wb") as outfile:
+                        outfile.write(sidecar[1])
+                written = cv2.imwrite(path, image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            except Exception as e:
+                written = False
+                self.loggerObj.logger.error(f"Error in ImageWriter for {path}: {str(e)}")
+                print(f"[ERROR] {datetime.datetime.now()} Error in ImageWriter for {path}: {str(e)}")
+            if not written and sidecar is not None and os.path.exists(sidecar[0]):
+                os.remove(sidecar[0])
+            with self.condition:
+                self.in_progress -= 1
+                if not written:
+                    self.counters["failed"] += 1
+                else:
+                    self.counters["written"] += 1
+                    if time.time() - queued_at > self.late_after:
+                        self.counters["late"] += 1
+                self.condition.notify_all()
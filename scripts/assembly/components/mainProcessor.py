@@ -1,5 +1,10 @@
-import time, datetime, gc, traceback, sys, json, os, cv2
+import time, datetime, gc, traceback, sys, os, cv2, queue
 from assembly.model_utils.initialize import updateVariants, extractFrameVCO
+from assembly.components.batchScheduler import BatchScheduler
+from assembly.components.imageWriter import ImageWriter
+from assembly.components.retention import RetentionPolicy, SaveDirRotator
+from assembly.model_utils.renderer import render_eagerly, deferred_sidecar
+from assembly.components.serializer import dumps
 import numpy as np
 from collections import OrderedDict
 
@@ -30,8 +35,19 @@ class MainProcessor:
         self.transmitter_manager = transmitter_manager
 
         self.varientchangeServer = varientchangeServer
+        # Groups the frames of all cameras by tracker model for batched inference
+        self.batchScheduler = BatchScheduler(GP=self.GP, loggerObj=self.loggerObj)
+        # Writes the annotated images in the background, imagePath is sent before the file exists
+        self.imageWriter = ImageWriter(loggerObj=self.loggerObj)
+        self.imageWriter.start()
+        # Decides which frames get their image saved, and keeps the save dir under its size cap
+        self.retentionPolicy = RetentionPolicy()
+        self.saveDirRotator = SaveDirRotator(save_dir=self.save_dir, loggerObj=self.loggerObj)
+        self.saveDirRotator.start()
 
         self.st_s = time.time()
+        # Seconds the main loop blocks waiting for a frame before checking for a variant change
+        self.frame_wait_timeout = float(os.getenv("FRAME_WAIT_TIMEOUT", 0.5))
 
 
 
@@ -39,25 +55,50 @@ class MainProcessor:
         # self.imageSender = imageSender
     def stop(self):
         self.running = False
+        self.varientchangeServer.stop_consumer()
+        self.output_sender.stop()
+        self.imageWriter.stop()
+        self.saveDirRotator.stop()
 
 
 
-    def extract_frame_from_queue(self):
+    def extract_frame_from_queue(self, timeout=None):
         """
         Extracts a frame from the shared queue and returns the image along with its metadata.
+        Blocks until a frame arrives or the timeout expires.
+
+        Args:
+            timeout (float): Seconds to wait for a frame, defaults to FRAME_WAIT_TIMEOUT.
         
         Returns:
             dict: Dictionary containing the camera ID as the key, and a sub-dictionary 
                   with the image, group_id, and iterator as values.
         """
-        if not self.shared_queue.empty():
-            frame_info = self.shared_queue.get()
+        try:
+            frame_info = self.shared_queue.get(timeout=self.frame_wait_timeout if timeout is None else timeout)
+        except queue.Empty:
+            frame_info = None
+        if frame_info is not None:
             img_master = OrderedDict()
             
             img_master[frame_info["beltId"]] = frame_info
-            image = frame_info["image"]
-
-            image = cv2.merge([image, image , image])
+            if "image" in frame_info:
+                image = frame_info["image"]
+                image = cv2.merge([image, image , image])
+            else:
+                # Frame is in a shared memory slot, merging copies it so the slot can be given back
+                frame_buffer = self.transmitter_manager.frame_buffers[frame_info["transmitter_id"]]
+                try:
+                    image = frame_buffer.read(frame_info)
+                except FileNotFoundError:
+                    # Header from a transmitter that was stopped (e.g. variant change)
+                    self.loggerObj.loop_logger.info(f"Dropping frame {frame_info['frame_count']} of stopped transmitter {frame_info['transmitter_id']}")
+                    return {}
+                try:
+                    image = cv2.merge([image, image , image])
+                finally:
+                    # Slot given back even if the merge fails, or the transmitter runs out of slots
+                    frame_buffer.release(frame_info)
             # Convert to (H, W, C) format by adding a channel dimension
             # image = np.expand_dims(image, axis=-1)  # Shape becomes (2048, 3072, 1)
 
@@ -73,26 +114,34 @@ class MainProcessor:
         
         return {}
 
+    def extract_batch_from_queue(self):
+        """
+        Extracts the frames that are ready in the shared queue, waiting for the first one
+        and then for up to BATCH_MAX_WAIT_MS for more, until BATCH_MAX_SIZE frames are collected.
+
+        Returns:
+            list: (camera_id, frame_info) pairs in the order they were extracted.
+        """
+        batch = list(self.extract_frame_from_queue().items())
+        if len(batch) == 0:
+            return batch
+        deadline = time.time() + self.batchScheduler.max_wait
+        while len(batch) < self.batchScheduler.max_batch:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            img_master = self.extract_frame_from_queue(timeout=remaining)
+            if len(img_master) == 0:
+                break
+            batch.extend(img_master.items())
+        return batch
 
-    def convert_np_types(self,obj):
-        if isinstance(obj, dict):
-            return {k: self.convert_np_types(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self.convert_np_types(i) for i in obj]
-        elif isinstance(obj, np.integer):
-            return int(obj)
-        elif isinstance(obj, np.floating):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        else:
-            return obj
 
     def handle_variant_change(self):
         # print(f"[INFO] {datetime.datetime.now()} Received data for Variant change")
         # self.loggerObj.logger.info(f"Received data for Variant change")
         self.varient_change = False
-        message = self.varientchangeServer.read()
+        message = self.varientchangeServer.get_message()
         if message is not None: 
             print("coming here ")
             self.varient_change = True
@@ -155,13 +204,14 @@ class MainProcessor:
             print(f"Error reading {classes_file}: {e}")
             return []
 
-    def analyse(self, input_data, camera_id):
+    def analyse(self, input_data, camera_id, detections=None):
         """
         Conducts inference on the given data from a specific camera.
 
         Args:
             input_data (dict): The data from the camera which includes the image.
             camera_id (str): The identifier for the camera.
+            detections (tuple): Tracker model detections already computed for the image, defaults to None.
 
         Returns:
             dict: The results from the analysis logic.
@@ -169,7 +219,10 @@ class MainProcessor:
         try:
             x = time.time()
             self.loggerObj.loop_logger.info(f'Analysis Started!!! {time.time()}')
-            outputres, object_count = self.analysisLogic(GP=self.GP, input_data=input_data, camera_id=camera_id) 
+            if detections is None:
+                outputres, object_count = self.analysisLogic(GP=self.GP, input_data=input_data, camera_id=camera_id) 
+            else:
+                outputres, object_count = self.analysisLogic(GP=self.GP, input_data=input_data, camera_id=camera_id, detections=detections)
             print("Time taken for single inference: ", time.time() - x, time.time())
             self.loggerObj.loop_logger.info(f"Time taken for single inference: {time.time() - x}, {time.time()}")
             return outputres, object_count 
@@ -178,15 +231,152 @@ class MainProcessor:
             raise
     
     
+    # Method that passes a single frame through analysis, output prep, visualisation and sending
+    def process_frame(self, camera_id, input_data, detections=None):
+        """
+        Runs a single extracted frame through the whole pipeline, from analysis to pushing the result.
+
+        Args:
+            camera_id (str): The identifier for the camera.
+            input_data (dict): The frame info extracted from the queue, including the image.
+            detections (tuple): Tracker model detections computed by the batch scheduler, None to run the model.
+        """
+        main_st = time.time()
+        
+        # Analysis
+        try:
+            output_res, object_count= self.analyse(input_data=input_data, camera_id=camera_id, detections=detections)
+            print("------------------------------------------------------------")
+            print("output_res:",output_res)
+            
+            
+            # cv2.imwrite(f'frame_with_roi.png', frame_with_roi)
+            print("------------------------------------------------------------")
+        except Exception as e:
+            traceback.print_exception(*sys.exc_info())
+            exc_type, exc_value, exc_traceback = sys.exc_info()
+            # Print traceback to a string
+            traceback_string = "".join(traceback.format_exception(exc_type, exc_value, exc_traceback))
+            # Log the traceback string
+            print(f"[ERROR] {datetime.datetime.now()} {e}" )
+            self.loggerObj.logger.error("-----------------------------------")
+            self.loggerObj.logger.error("An error occurred:\n%s", traceback_string)
+            self.loggerObj.logger.error("-----------------------------------")
+            self.loggerObj.loop_logger.exception(f'Error Happened in the Main Analysis!!!')
+            print(f"[INFO] {datetime.datetime.now()} Error Happened in the Main Analysis!!! ")
+            sys.exit(1)
+
+        st2 = time.time()
+        
+        # output formation
+        main_result = self.outputprepObj.run(res=output_res, interfaceObj=self.GP.interfaceObjs[camera_id][int(input_data["iterator"])])
+        print(f"Time taken for output prep {time.time()-st2}, {time.time()}")
+        self.loggerObj.loop_logger.info(f"Time taken for output prep {time.time()-st2}, {time.time()}")
+        # timestamp = str(datetime.datetime.now()).split(".")[0].replace(" ", ",")
+        now = datetime.datetime.now()
+
+# Format the timestamp to include milliseconds
+        timestamp = now.strftime('%Y-%m-%d,%H:%M:%S') + ':' + str(int(now.microsecond / 1000)).zfill(3)
+        main_result["timestamp"] = timestamp
+
+
+        image_name = f"{input_data['frame_count']}_{timestamp}_{input_data['groupId']}_{input_data['iterator']}.jpg"
+        
+        main_result["imagePath"] = image_name
+
+  
+
+        print("------------------------------------------------------------")
+        print("main_result:",main_result)
+        print("------------------------------------------------------------")
+
+        # Results with their boxes, final_prep keeps only the pass flags and the info
+        results = main_result["result"]
+        main_result = self.outputprepObj.final_prep(result=main_result)
+
+        # Retention, the image of the frame is only saved if the policy keeps it
+        keep = self.retentionPolicy.keep(main_result)
+
+        st3 = time.time()
+        written = False
+        if keep:
+            # Visualisation, right away or deferred to the renderer depending on the policy of the camera
+            frame_to_draw_roi = input_data["image"]
+            roi = output_res["roi"]
+            direction = output_res["direction"]
+            image_path = os.path.join(self.save_dir, image_name)
+            visualization = self.GP.interfaceObjs[camera_id][int(input_data["iterator"])].visualization
+
+            sidecar = None
+            if render_eagerly(visualization, results):
+                res_image = self.visualisor.draw(image=frame_to_draw_roi, results={"result": results}, object_count=object_count, roi=roi, direction=direction)
+            else:
+                # Raw frame at the resolution of the annotated images, with the results to draw on it
+                res_image = self.visualisor.resize_image(original_image=frame_to_draw_roi, resize_ratio=self.visualisor.resize_ratio)
+                sidecar = deferred_sidecar(image_path, results=results, object_count=object_count, roi=roi, direction=direction, source_width=frame_to_draw_roi.shape[1], uuid_class_map=self.visualisor.uuid_class_map)
+            print(f"Time taken for Visualisation {time.time()-st3}, {time.time()}")
+            self.loggerObj.loop_logger.info(f"Time taken for Visualisation {time.time()-st3}, {time.time()}")
+
+            st4 = time.time()
+            written = self.imageWriter.write(image_path, res_image, sidecar=sidecar)
+            print(f"Time taken for Queuing image {time.time()-st4}, {time.time()}")
+            self.loggerObj.loop_logger.info(f"Time taken for Queuing image {time.time()-st4}, {time.time()}, writer {self.imageWriter.stats()}")
+        else:
+            self.loggerObj.loop_logger.info(f"Image {image_name} not kept by the {self.retentionPolicy.mode} retention policy")
+        # Only advertise the image if it was queued to be written
+        main_result["isPathUsed"] = main_result["isPathUsed"] and written
+
+        # Serialized once, NumPy types included, for the snapshot, the broker and the log
+        st5 = time.time()
+        body = dumps(main_result)
+        print(f"Time taken for Serialization {time.time()-st5}, {time.time()}")
+        self.loggerObj.loop_logger.info(f"Time taken for Serialization {time.time()-st5}, {time.time()}")
+
+        st5 = time.time()
+        with open("OUTPUT_latest.json", "wb") as outfile:
+            outfile.write(body)
+        # Sending to backend
+
+
+        # if main_result_converted.get('result'):
+        #     # Write the output to a file
+        #     with open("OUTPUT_latest.json", "w") as outfile:
+        #         json.dump(main_result_converted, outfile)
+
+        #     # Sending to backend
+        #     self.output_sender.send(message=main_result_converted)
+        #     self.loggerObj.loop_logger.info(f"what is the message that i am sending {main_result_converted}")
+        # else:
+        #     self.loggerObj.loop_logger.info("Result is empty, not sending the message")
+
+
+
+        self.output_sender.send(message=main_result, body=body)
+        self.loggerObj.loop_logger.info(f"what is the message that i am sending {body.decode()}")
+
+        print(f"Time taken for RabbitMq pushing {time.time()-st5}, {time.time()}")
+        self.loggerObj.loop_logger.info(f"Time taken for RabbitMq pushing {time.time()-st5}, {time.time()}, publisher {self.output_sender.stats()}")
+        # Memory of the tracker of the camera, to see the tracks and analysed ids do not pile up
+        interface = self.GP.interfaceObjs[camera_id][int(input_data["iterator"])]
+        if interface.tracker_status:
+            self.loggerObj.loop_logger.info(f"Tracker memory of {camera_id}: {interface.tracker.memory_stats()}")
+
+        print("[INFO] Time taken for the whole process: From Getting frame to pushing res", time.time() - main_st, time.time())
+        self.loggerObj.loop_logger.info(f"[INFO] Time taken for the whole process: From Getting frame to pushing res { time.time() - main_st},{ time.time()}")
+
+
     def run(self):
         """
         Continuously processes incoming frames and manages exceptions.
         """
         st = time.time()
         # run_time = 300
+
+        # Variant change messages are received in the background, the loop is only signalled
+        self.varientchangeServer.start_consumer()
         
         # Infinite loop to keep processing incoming frames
-        while True: 
+        while self.running: 
             # curr_time = time.time()
             # if curr_time - self.st_s > run_time:
             #     print("->time to stop<-")
@@ -196,149 +386,37 @@ class MainProcessor:
 
 
             try:
-                    # Check if there are no images in the queue every 5 seconds
-                if int((time.time() - st)) == 5 and self.shared_queue is not None:
+                # Check for varinat change, only when the consumer thread signalled a message
+                if self.varientchangeServer.message_event.is_set():
+                    self.varientChange()
+                
+                # Extract frames, blocks until a frame arrives or FRAME_WAIT_TIMEOUT
+                batch = self.extract_batch_from_queue()
+                extracted_batch_size = len(batch)
+
+                # Check if there are no images in the queue every 5 seconds
+                if extracted_batch_size == 0 and time.time() - st >= 5:
                     print(f"[INFO] {datetime.datetime.now()} No images present in Q!!!")
                     print("Active cameras: ",list(self.GP.interfaceObjs.keys()), [len(self.GP.interfaceObjs[key]) for key in list(self.GP.interfaceObjs.keys())])
                     self.loggerObj.loop_logger.info(f"No images present in Q!!!")
                     st = time.time()
-                
-                # Check for varinat change
-                self.varientChange()
-                
-                # Extract frame
-                st1 = time.time()
-
-                img_master_dict = self.extract_frame_from_queue()
-                extracted_batch_size = len(img_master_dict)
                 if extracted_batch_size > 0:
+                    # Time from the frame being grabbed to being read from the Q
+                    st1 = batch[0][1].get("timestamp", time.time())
                     print(f"Time taken for rading image from Q {time.time()-st1, {time.time()}}")
                     self.loggerObj.loop_logger.info(f"Time taken for reading image from Q {time.time()-st1, {time.time()}}")
                
                 # If images are extracted, process them
                 if extracted_batch_size>0: 
-                    main_st = time.time()
                     st = time.time()
-                    # Extracting data
- 
-#                    img_master_dict OrderedDict([(None, {'id': '142b6840-b1c2-4505-9a18-ccb809c3adbc', 'camera_ip': '192.168.69.131', 'image': array([[[13, 13, 13],
-#         [14, 14, 14],
-#         [10, 10, 10],
-
-
-
-
-
-                    camera_id = list(img_master_dict.keys())[0]
-                    
-                    input_data = img_master_dict[camera_id]
-                    
-                    # Analysis
-                    try:
-                        output_res, object_count= self.analyse(input_data=input_data, camera_id=camera_id)
-                        print("------------------------------------------------------------")
-                        print("output_res:",output_res)
-                        
-                        
-                        # cv2.imwrite(f'frame_with_roi.png', frame_with_roi)
-                        print("------------------------------------------------------------")
-                    except Exception as e:
-                        traceback.print_exception(*sys.exc_info())
-                        exc_type, exc_value, exc_traceback = sys.exc_info()
-                        # Print traceback to a string
-                        traceback_string = "".join(traceback.format_exception(exc_type, exc_value, exc_traceback))
-                        # Log the traceback string
-                        print(f"[ERROR] {datetime.datetime.now()} {e}" )
-                        self.loggerObj.logger.error("-----------------------------------")
-                        self.loggerObj.logger.error("An error occurred:\n%s", traceback_string)
-                        self.loggerObj.logger.error("-----------------------------------")
-                        self.loggerObj.loop_logger.exception(f'Error Happened in the Main Analysis!!!')
-                        print(f"[INFO] {datetime.datetime.now()} Error Happened in the Main Analysis!!! ")
-                        sys.exit(1)
-
+                    # Tracker detections of the whole batch, one batched forward per model
                     st2 = time.time()
-                    
-                    # output formation
-                    main_result = self.outputprepObj.run(res=output_res, interfaceObj=self.GP.interfaceObjs[camera_id][int(input_data["iterator"])])
-                    print(f"Time taken for output prep {time.time()-st2}, {time.time()}")
-                    self.loggerObj.loop_logger.info(f"Time taken for output prep {time.time()-st2}, {time.time()}")
-                    # timestamp = str(datetime.datetime.now()).split(".")[0].replace(" ", ",")
-                    now = datetime.datetime.now()
-
-# Format the timestamp to include milliseconds
-                    timestamp = now.strftime('%Y-%m-%d,%H:%M:%S') + ':' + str(int(now.microsecond / 1000)).zfill(3)
-                    main_result["timestamp"] = timestamp
-
-
-                    image_name = f"{input_data['frame_count']}_{timestamp}_{input_data['groupId']}_{input_data['iterator']}.jpg"
-                    
-                    main_result["imagePath"] = image_name
-
-              
-
-                    print("------------------------------------------------------------")
-                    print("main_result:",main_result)
-                    print("------------------------------------------------------------")
-
-                    st3 = time.time()
-                    # Visualisation
-                    frame_to_draw_roi = input_data["image"]
-                    roi = output_res["roi"]
-                    direction = output_res["direction"]
-
-                    res_image = self.visualisor.draw(image=frame_to_draw_roi, results=main_result, object_count=object_count, roi=roi, direction=direction)
-                    print(f"Time taken for Visualisation {time.time()-st3}, {time.time()}")
-                    self.loggerObj.loop_logger.info(f"Time taken for Visualisation {time.time()-st3}, {time.time()}")
-
-                    # Adding the timestamp
-                    
-                    # Final prep of output
-                    main_result = self.outputprepObj.final_prep(result=main_result)
-
-                    st4 = time.time()
-
-            
-
-                    
-
-                    cv2.imwrite(os.path.join(self.save_dir, f"{input_data['frame_count']}_{timestamp}_{input_data['groupId']}_{input_data['iterator']}.jpg"), res_image)
-
-                    print(f"Time taken for Writing image {time.time()-st4}, {time.time()}")
-                    self.loggerObj.loop_logger.info(f"Time taken for Writing image {time.time()-st4}, {time.time()}")
-                    
-                    main_result_converted = self.convert_np_types(main_result)
-                    
-                    
-                    
-                    # print("checking the type of json", type(main_result))
-                    st5 = time.time()
-                    with open("OUTPUT_latest.json", "w") as outfile:
-                        
-                        json.dump(main_result_converted, outfile)
-                    # Sending to backend
-
-
-                    # if main_result_converted.get('result'):
-                    #     # Write the output to a file
-                    #     with open("OUTPUT_latest.json", "w") as outfile:
-                    #         json.dump(main_result_converted, outfile)
-
-                    #     # Sending to backend
-                    #     self.output_sender.send(message=main_result_converted)
-                    #     self.loggerObj.loop_logger.info(f"what is the message that i am sending {main_result_converted}")
-                    # else:
-                    #     self.loggerObj.loop_logger.info("Result is empty, not sending the message")
-
-
-
-                    self.output_sender.send(message=main_result_converted)
-                    self.loggerObj.loop_logger.info(f"what is the message that i am sending {main_result_converted}")
-
-                    print(f"Time taken for RabbitMq pushing {time.time()-st5}, {time.time()}")
-                    self.loggerObj.loop_logger.info(f"Time taken for RabbitMq pushing {time.time()-st5}, {time.time()}")
+                    detections = self.batchScheduler.run(batch)
+                    print(f"Time taken for batched detection of {extracted_batch_size} frames {time.time()-st2}, {time.time()}")
+                    self.loggerObj.loop_logger.info(f"Time taken for batched detection of {extracted_batch_size} frames {time.time()-st2}, {time.time()}")
 
-                    print("[INFO] Time taken for the whole process: From Getting frame to pushing res", time.time() - main_st, time.time())
-                    self.loggerObj.loop_logger.info(f"[INFO] Time taken for the whole process: From Getting frame to pushing res { time.time() - main_st},{ time.time()}")
+                    for (camera_id, input_data), frame_detections in zip(batch, detections):
+                        self.process_frame(camera_id=camera_id, input_data=input_data, detections=frame_detections)
             
 
 
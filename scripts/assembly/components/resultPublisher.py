@@ -0,0 +1,299 @@
+import os, time, datetime, threading, functools
+from collections import deque
+import pika
+from assembly.components.resultSpool import ResultSpool
+from assembly.components.serializer import CONTENT_TYPES, encode, join, check_content_type
+print=functools.partial(print, flush=True)
+
+
+# Class that publishes the results to RabbitMQ from its own thread
+class ResultPublisher:
+    """
+    Publishes the results to the result queue from a background thread, so the inference
+    loop only has to enqueue them. The thread owns its own RabbitMQ connection, publishes
+    with confirms and reconnects with an exponential backoff when the broker is down.
+    Messages are kept serialized in a bounded in-memory queue, the oldest one is dropped when
+    it is full.
+    With a spool, the messages are moved to disk while the broker is unreachable and replayed
+    in order, at a throttled rate, once it is back.
+
+    Attributes:
+        exchange_publish (str): Name of the exchange to publish to.
+        publishing_queue (str): Name of the queue (and routing key) to publish to.
+        host (str): RabbitMQ host.
+        loggerObj (object): Logger object to log information.
+        max_queue (int): Maximum number of messages waiting to be published.
+        batch_size (int): Maximum number of results published as one message, 1 publishes
+                          every result on its own.
+        flush_interval (float): Seconds to wait for more results to fill a batch.
+        confirm (bool): Whether to use publisher confirms.
+        backoff_max (float): Maximum seconds between two reconnection attempts.
+        spool (ResultSpool): On-disk spool used during broker outages, None to keep the
+                             messages in memory only.
+        replay_rate (float): Maximum spooled messages replayed per second.
+        content_type (str): Serialization of the published messages, "json" or "msgpack".
+        counters (dict): Number of queued, sent and dropped messages, failed connections or
+                         publishes, reconnection attempts and spooled and replayed messages.
+    """
+
+    def __init__(self, exchange_publish_name, publishing_queue, host, loggerObj, max_queue=None, batch_size=None, flush_ms=None, confirm=None, backoff_max=None, spool_path=None, replay_rate=None, content_type=None):
+        """
+        Initializes the ResultPublisher, the thread is started by start.
+
+        Args:
+            exchange_publish_name (str): Name of the exchange to publish to.
+            publishing_queue (str): Name of the queue to publish to.
+            host (str): RabbitMQ host.
+            loggerObj (object): Logger object.
+            max_queue (int): Queue size, defaults to PUBLISH_MAX_QUEUE env or 1000.
+            batch_size (int): Results per message, defaults to PUBLISH_BATCH_SIZE env or 1.
+            flush_ms (float): Flush interval in milliseconds, defaults to PUBLISH_FLUSH_MS env or 0.
+            confirm (bool): Publisher confirms, defaults to PUBLISH_CONFIRM env or True.
+            backoff_max (float): Maximum reconnection delay in seconds, defaults to PUBLISH_BACKOFF_MAX env or 30.
+            spool_path (str): SQLite file of the spool, defaults to PUBLISH_SPOOL_PATH env, no spool if empty.
+            replay_rate (float): Replayed messages per second, defaults to PUBLISH_REPLAY_RATE env or 50.
+            content_type (str): Serialization, defaults to PUBLISH_CONTENT_TYPE env or "json".
+        """
+        self.exchange_publish = exchange_publish_name
+        self.publishing_queue = publishing_queue
+        self.host = host
+        self.loggerObj = loggerObj
+        self.max_queue = max(1, int(max_queue if max_queue is not None else os.getenv("PUBLISH_MAX_QUEUE", 1000)))
+        self.batch_size = max(1, int(batch_size if batch_size is not None else os.getenv("PUBLISH_BATCH_SIZE", 1)))
+        self.flush_interval = float(flush_ms if flush_ms is not None else os.getenv("PUBLISH_FLUSH_MS", 0)) / 1000
+        self.confirm = confirm if confirm is not None else os.getenv("PUBLISH_CONFIRM", "true").lower() == "true"
+        self.backoff_max = float(backoff_max if backoff_max is not None else os.getenv("PUBLISH_BACKOFF_MAX", 30))
+        spool_path = spool_path if spool_path is not None else os.getenv("PUBLISH_SPOOL_PATH", "")
+        self.spool = ResultSpool(spool_path) if spool_path else None
+        self.pending_spool = self.spool.count() if self.spool is not None else 0 # Left by a previous run are replayed first
+        self.replay_rate = float(replay_rate if replay_rate is not None else os.getenv("PUBLISH_REPLAY_RATE", 50))
+        self.content_type = content_type if content_type is not None else os.getenv("PUBLISH_CONTENT_TYPE", "json")
+        check_content_type(self.content_type)
+        self.properties = pika.BasicProperties(content_type=CONTENT_TYPES[self.content_type])
+
+        self.messages = deque()
+        self.condition = threading.Condition()
+        self.counters = {"queued": 0, "sent": 0, "dropped": 0, "failed": 0, "reconnects": 0, "spooled": 0, "replayed": 0}
+        self.connection = None
+        self.channel = None
+        self.running = False
+        self.stopped = threading.Event() # Interrupts the backoff wait, the condition is notified by every send
+        self.thread = None
+        self.failures = 0 # Consecutive failed connections or publishes, sets the backoff
+
+    def start(self):
+        """
+        Starts the publishing thread.
+        """
+        self.running = True
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.loop, daemon=True)
+        self.thread.start()
+        self.loggerObj.logger.info("ResultPublisher started.")
+
+    def stop(self, timeout=5):
+        """
+        Stops the publishing thread, the messages still queued are published first if the
+        broker is reachable within the timeout, what is left is moved to the spool.
+
+        Args:
+            timeout (float): Seconds to wait for the thread.
+        """
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self.stopped.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=timeout)
+        self.thread = None
+        self.close()
+        if self.spool is not None:
+            self.spill()
+            self.spool.close()
+
+    def send(self, message, body=None):
+        """
+        Enqueues a message for publishing, never blocks.
+
+        Args:
+            message (dict): The result to publish.
+            body (bytes): The result already serialized to JSON, reused as it is for the
+                          json content type.
+        """
+        if body is None or self.content_type != "json":
+            body = encode(message, self.content_type)
+        with self.condition:
+            if len(self.messages) >= self.max_queue:
+                self.messages.popleft()
+                self.counters["dropped"] += 1
+                self.loggerObj.queuing_logger.warning(f"Result queue full, dropped the oldest result")
+            self.messages.append(body)
+            self.counters["queued"] += 1
+            self.condition.notify()
+
+    def stats(self):
+        """
+        Returns the counters of the publisher.
+
+        Returns:
+            dict: The counters, the pending messages in memory and in the spool.
+        """
+        with self.condition:
+            return dict(self.counters, pending=len(self.messages), pending_spool=self.pending_spool)
+
+    def connect(self):
+        """
+        Opens the connection and declares the exchange and queue, as NodeCommServer does.
+        A single attempt is made, the retries are done by the thread with a backoff.
+        """
+        creds = pika.PlainCredentials('guest', 'guest')
+        self.connection = pika.BlockingConnection(
+            pika.ConnectionParameters(host=self.host, credentials=creds, heartbeat=15, connection_attempts=1)
+        )
+        self.channel = self.connection.channel()
+        self.channel.exchange_declare(exchange=self.exchange_publish, exchange_type='direct')
+        self.channel.queue_declare(queue=self.publishing_queue, durable=False, arguments={'x-message-ttl': 30000})
+        self.channel.queue_bind(exchange=self.exchange_publish, queue=self.publishing_queue, routing_key=self.publishing_queue)
+        if self.confirm:
+            self.channel.confirm_delivery()
+        print(f"[INFO] {datetime.datetime.now()} ResultPublisher connected with RabbitMQ!!!")
+        self.loggerObj.logger.info(f"ResultPublisher connected with RabbitMQ")
+
+    def close(self):
+        """
+        Closes the connection, ignoring errors of a connection that is already broken.
+        """
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+        self.connection = None
+        self.channel = None
+
+    def backoff(self):
+        """
+        Seconds to wait before the next attempt after the consecutive failures.
+        """
+        return min(self.backoff_max, 0.5 * 2 ** (self.failures - 1))
+
+    def wait(self, seconds):
+        """
+        Waits for the given seconds or until the publisher is stopped. With a spool, the
+        messages received meanwhile are moved to it every second.
+        """
+        end = time.time() + seconds
+        while not self.stopped.wait(timeout=min(1., max(0., end - time.time()))) and time.time() < end:
+            self.spill()
+        self.spill()
+
+    def spill(self):
+        """
+        Moves the messages of the in-memory queue to the end of the spool.
+        """
+        if self.spool is None:
+            return
+        with self.condition:
+            messages = list(self.messages)
+            self.messages.clear()
+        self.spool.append(messages)
+        self.pending_spool += len(messages)
+        self.counters["spooled"] += len(messages)
+
+    def replay(self):
+        """
+        Publishes the oldest messages of the spool and removes them once confirmed. The
+        messages queued meanwhile are spooled first, so the order is kept, and the replay
+        is throttled to replay_rate messages per second.
+
+        Returns:
+            bool: True if spooled messages were published, False if the spool is empty.
+        """
+        if not self.pending_spool:
+            return False
+        self.spill()
+        last_id, batch = self.spool.peek(self.batch_size)
+        if not batch:
+            self.pending_spool = 0
+            return False
+        self.publish(batch)
+        self.spool.remove(last_id)
+        self.pending_spool -= len(batch)
+        self.counters["sent"] += len(batch)
+        self.counters["replayed"] += len(batch)
+        self.failures = 0
+        if self.replay_rate > 0:
+            self.stopped.wait(timeout=len(batch) / self.replay_rate)
+        return True
+
+    def next_batch(self):
+        """
+        Waits for messages and returns up to batch_size of them, without removing them from
+        the queue. With a flush interval the batch is given that time to fill.
+
+        Returns:
+            list: The messages to publish, empty if the publisher is stopped.
+        """
+        with self.condition:
+            while self.running and not self.messages:
+                self.condition.wait(timeout=1)
+            if self.running and self.batch_size > 1 and self.flush_interval > 0:
+                deadline = time.time() + self.flush_interval
+                while self.running and len(self.messages) < self.batch_size and time.time() < deadline:
+                    self.condition.wait(timeout=deadline - time.time())
+            return [self.messages[i] for i in range(min(self.batch_size, len(self.messages)))]
+
+    def publish(self, batch):
+        """
+        Publishes a batch. Without batching (batch_size 1) the result is published as it is,
+        with batching every message is a list, even of a single result, so the consumer
+        always gets the same shape. With confirms enabled pika raises if the broker does not
+        confirm the message.
+
+        Args:
+            batch (list): The serialized messages to publish.
+        """
+        body = batch[0] if self.batch_size == 1 else join(batch, self.content_type)
+        self.channel.basic_publish(exchange=self.exchange_publish, routing_key=self.publishing_queue, body=body, properties=self.properties)
+
+    def acknowledge(self, batch):
+        """
+        Removes a published batch from the queue, unless its messages were dropped meanwhile.
+        """
+        with self.condition:
+            for message in batch:
+                if self.messages and self.messages[0] is message:
+                    self.messages.popleft()
+            self.counters["sent"] += len(batch)
+        self.loggerObj.queuing_logger.info(f"Published {len(batch)} results to the result Queue")
+
+    def loop(self):
+        """
+        Publishing thread loop, (re)connects to RabbitMQ and publishes the queued messages
+        until stop is called and the queue is empty or the broker is unreachable.
+        """
+        while self.running or (self.messages and self.channel is not None and not self.pending_spool):
+            try:
+                if self.channel is None:
+                    if not self.running:
+                        break
+                    if self.failures:
+                        self.counters["reconnects"] += 1
+                    self.connect()
+                # Spooled messages go first, the queue is only used directly once the spool is empty
+                if self.running and self.replay():
+                    continue
+                batch = self.next_batch()
+                if not batch:
+                    continue
+                self.publish(batch)
+                self.acknowledge(batch)
+                self.failures = 0
+            except Exception as e:
+                self.failures += 1
+                self.counters["failed"] += 1
+                delay = self.backoff()
+                self.loggerObj.logger.error(f"Error in ResultPublisher: {str(e)}, retrying in {delay} seconds")
+                print(f"[ERROR] {datetime.datetime.now()} Error in ResultPublisher: {str(e)}")
+                self.close()
+                self.wait(delay)
@@ -0,0 +1,101 @@
+import os, sqlite3, threading
+from contextlib import contextmanager
+
+
+# Append-only on-disk spool of results that could not be published
+class ResultSpool:
+    """
+    SQLite (WAL mode) table of results waiting for the broker, in the order they were
+    appended. Results are only removed once they are published, so they survive a broker
+    outage as well as a restart of the process.
+
+    Attributes:
+        path (str): Path of the SQLite database.
+        connection (sqlite3.Connection): Connection shared by the publishing and main threads.
+        lock (threading.Lock): Serializes the use of the connection.
+    """
+
+    def __init__(self, path):
+        """
+        Opens (or creates) the spool.
+
+        Args:
+            path (str): Path of the SQLite database.
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS results (id INTEGER PRIMARY KEY AUTOINCREMENT, body BLOB NOT NULL)")
+
+    @contextmanager
+    def transaction(self):
+        """
+        Holds the lock and runs the statements of the block in one explicit transaction, the
+        connection is in autocommit mode so they would otherwise be committed one by one.
+        """
+        with self.lock:
+            self.connection.execute("BEGIN")
+            try:
+                yield
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+
+    def append(self, messages):
+        """
+        Appends messages at the end of the spool, in one transaction.
+
+        Args:
+            messages (list): The serialized messages to spool.
+        """
+        if not messages:
+            return
+        with self.transaction():
+            self.connection.executemany("INSERT INTO results (body) VALUES (?)", [(message,) for message in messages])
+
+    def peek(self, limit):
+        """
+        Returns the oldest messages of the spool without removing them.
+
+        Args:
+            limit (int): Maximum number of messages.
+
+        Returns:
+            tuple: Id of the last message returned (None if the spool is empty) and the serialized messages.
+        """
+        with self.lock:
+            rows = self.connection.execute("SELECT id, body FROM results ORDER BY id LIMIT ?", (limit,)).fetchall()
+        if not rows:
+            return None, []
+        # Spools of older versions hold the messages as text
+        return rows[-1][0], [body.encode() if isinstance(body, str) else body for _, body in rows]
+
+    def remove(self, last_id):
+        """
+        Removes the messages up to last_id, once they are published.
+
+        Args:
+            last_id (int): Id returned by peek.
+        """
+        with self.transaction():
+            self.connection.execute("DELETE FROM results WHERE id <= ?", (last_id,))
+
+    def count(self):
+        """
+        Returns the number of spooled messages.
+        """
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,171 @@
+import os, time, threading, datetime, functools
+from collections import deque
+print=functools.partial(print, flush=True)
+
+# Retention modes, which frames get their image saved
+RETENTION_MODES = ("all", "fail", "sample", "rate")
+
+
+# Class that decides which frames get their image saved
+class RetentionPolicy:
+    """
+    Decides from the final result of a frame if its image is saved, for each camera:
+    "all" saves every frame, "fail" only frames with a failed result, "sample" every failed
+    frame and one in every_n passed frames and "rate" at most per_minute frames a minute.
+
+    Attributes:
+        mode (str): Retention mode.
+        every_n (int): Passed frames per saved one in "sample" mode.
+        per_minute (int): Maximum frames saved a minute in "rate" mode.
+        passed_counts (dict): Passed frames seen for each camera.
+        saved_times (dict): Times of the frames saved in the last minute for each camera.
+    """
+
+    def __init__(self, mode=None, every_n=None, per_minute=None):
+        """
+        Initializes the RetentionPolicy.
+
+        Args:
+            mode (str): Retention mode, defaults to RETENTION_MODE env or "all".
+            every_n (int): Defaults to RETENTION_EVERY_N env or 10.
+            per_minute (int): Defaults to RETENTION_PER_MINUTE env or 60.
+        """
+        self.mode = mode if mode is not None else os.getenv("RETENTION_MODE", "all")
+        if self.mode not in RETENTION_MODES:
+            raise ValueError(f"Unknown retention mode {self.mode}")
+        self.every_n = max(1, int(every_n if every_n is not None else os.getenv("RETENTION_EVERY_N", 10)))
+        self.per_minute = max(0, int(per_minute if per_minute is not None else os.getenv("RETENTION_PER_MINUTE", 60)))
+        self.passed_counts = {}
+        self.saved_times = {}
+
+    def keep(self, result, now=None):
+        """
+        Checks if the image of a frame is saved.
+
+        Args:
+            result (dict): The result after OutputPrep.final_prep, with "cameraId" and the "pass"
+                           flag of each object in "result".
+            now (float): Current time, defaults to time.time().
+
+        Returns:
+            bool: True if the image is saved.
+        """
+        if self.mode == "all":
+            return True
+        failed = any(not res["pass"] for res in result["result"])
+        camera_id = result.get("cameraId")
+        if self.mode == "fail":
+            return failed
+        if self.mode == "sample":
+            if failed:
+                return True
+            count = self.passed_counts.get(camera_id, 0)
+            self.passed_counts[camera_id] = count + 1
+            return count % self.every_n == 0
+        # At most per_minute in any sliding minute
+        now = time.time() if now is None else now
+        saved = self.saved_times.setdefault(camera_id, deque())
+        while saved and now - saved[0] >= 60:
+            saved.popleft()
+        if len(saved) >= self.per_minute:
+            return False
+        saved.append(now)
+        return True
+
+
+# Class that keeps the size of the save directory under a cap
+class SaveDirRotator:
+    """
+    Background thread deleting the oldest files of the save directory when its size goes
+    over the cap, down to low_water of the cap.
+
+    Attributes:
+        save_dir (str): Directory of the saved images.
+        max_bytes (int): Size cap in bytes, 0 disables the rotation.
+        interval (float): Seconds between two checks.
+        low_water (float): Fraction of the cap the directory is brought down to.
+        loggerObj (object): Logger object to log information.
+        deleted (int): Number of files deleted.
+    """
+
+    def __init__(self, save_dir, loggerObj, max_mb=None, interval=None, low_water=0.9):
+        """
+        Initializes the SaveDirRotator, the thread is started by start.
+
+        Args:
+            save_dir (str): Directory of the saved images.
+            loggerObj (object): Logger object.
+            max_mb (float): Size cap in MB, defaults to SAVE_DIR_MAX_MB env or 0 (no cap).
+            interval (float): Seconds between checks, defaults to SAVE_DIR_ROTATE_INTERVAL env or 60.
+            low_water (float): Fraction of the cap kept after a rotation.
+        """
+        self.save_dir = save_dir
+        self.loggerObj = loggerObj
+        self.max_bytes = int(float(max_mb if max_mb is not None else os.getenv("SAVE_DIR_MAX_MB", 0)) * 1024 * 1024)
+        self.interval = float(interval if interval is not None else os.getenv("SAVE_DIR_ROTATE_INTERVAL", 60))
+        self.low_water = low_water
+        self.deleted = 0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """
+        Starts the rotation thread, nothing is done without a cap.
+        """
+        if self.max_bytes <= 0:
+            return
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops the rotation thread.
+        """
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+        self.thread = None
+
+    def rotate(self):
+        """
+        Deletes the oldest files of the save directory if it is over the cap.
+
+        Returns:
+            int: Number of files deleted.
+        """
+        files = []
+        total = 0
+        with os.scandir(self.save_dir) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        if total <= self.max_bytes:
+            return 0
+        target = self.max_bytes * self.low_water
+        deleted = 0
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            deleted += 1
+        self.deleted += deleted
+        self.loggerObj.loop_logger.info(f"Deleted the {deleted} oldest files of {self.save_dir}, {total} bytes left")
+        return deleted
+
+    def loop(self):
+        """
+        Rotation thread loop, checks the save directory every interval until stopped.
+        """
+        while not self.stopped.wait(timeout=self.interval):
+            try:
+                self.rotate()
+            except Exception as e:
+                self.loggerObj.logger.error(f"Error in SaveDirRotator: {str(e)}")
+                print(f"[ERROR] {datetime.datetime.now()} Error in SaveDirRotator: {str(e)}")
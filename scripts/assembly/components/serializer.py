@@ -0,0 +1,91 @@
+import json
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # Falls back to the json module, several times slower
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Only needed for the msgpack content type
+    msgpack = None
+
+# Content types a result can be published as
+CONTENT_TYPES = {"json": "application/json", "msgpack": "application/msgpack"}
+
+
+def to_builtin(obj):
+    """
+    Converts the NumPy values the encoders do not handle natively to Python types.
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Type is not serializable: {type(obj)}")
+
+
+def dumps(obj):
+    """
+    Serializes a result to JSON, NumPy scalars and arrays included, so it does not have
+    to be converted first.
+
+    Args:
+        obj (dict or list): The result.
+
+    Returns:
+        bytes: The UTF-8 JSON.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=to_builtin, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=to_builtin).encode()
+
+
+def encode(obj, content_type="json"):
+    """
+    Serializes a result in the given content type.
+
+    Args:
+        obj (dict or list): The result.
+        content_type (str): "json" or "msgpack".
+
+    Returns:
+        bytes: The serialized result.
+    """
+    if content_type == "msgpack":
+        return msgpack.packb(obj, default=to_builtin)
+    return dumps(obj)
+
+
+def join(bodies, content_type="json"):
+    """
+    Joins serialized results into a serialized list, without decoding them.
+
+    Args:
+        bodies (list): The serialized results.
+        content_type (str): "json" or "msgpack".
+
+    Returns:
+        bytes: The serialized list of the results.
+    """
+    if content_type == "msgpack":
+        n = len(bodies)
+        if n < 16:
+            header = bytes([0x90 | n])
+        elif n < 2 ** 16:
+            header = b"\xdc" + n.to_bytes(2, "big")
+        else:
+            header = b"\xdd" + n.to_bytes(4, "big")
+        return header + b"".join(bodies)
+    return b"[" + b",".join(bodies) + b"]"
+
+
+def check_content_type(content_type):
+    """
+    Raises if a content type is unknown or its encoder is not installed.
+    """
+    if content_type not in CONTENT_TYPES:
+        raise ValueError(f"Unknown content type {content_type}")
+    if content_type == "msgpack" and msgpack is None:
+        raise ImportError("msgpack is needed to publish the results as msgpack")
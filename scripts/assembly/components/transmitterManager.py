@@ -1,5 +1,6 @@
 import multiprocessing
 from assembly.interfaces.transmitterInterface import TransmitterInterface
+from assembly.components.frameBuffer import FrameRingBuffer
 import logging
 import os
 from queue import Queue
@@ -10,6 +11,7 @@ class TransmitterManager:
         self.processes = {}  # Dictionary to keep track of subprocesses
         self.interfaces = {}  # Dictionary to keep track of transmitter interfaces and stop events
         self.shared_queue = multiprocessing.Queue()  # Shared queue for inter-process communication
+        self.frame_buffers = {}  # Shared memory frame buffers for each transmitter
         self.logger = transmitterlog
         
 
@@ -19,8 +21,10 @@ class TransmitterManager:
         for transmitter_id, transmitter_config in self.config["transmitterInfo"].items():
             t = time.time()
             stop_event = multiprocessing.Event()  # Create a stop event for each transmitter
+            frame_buffer = FrameRingBuffer(transmitter_id)  # Frames are passed through shared memory, only headers go on the queue
+            self.frame_buffers[transmitter_id] = frame_buffer
             
-            interface = TransmitterInterface(self.shared_queue, transmitter_config["camera_ip"], transmitter_config, stop_event, transmitter_id, self.logger)
+            interface = TransmitterInterface(self.shared_queue, transmitter_config["camera_ip"], transmitter_config, stop_event, transmitter_id, self.logger, frame_buffer)
             self.interfaces[transmitter_id] = {"interfaceTrans": interface, "stop_event": stop_event}
             process = multiprocessing.Process(target=self.run_transmitter, args=(interface,))
             self.processes[transmitter_id] = process
@@ -63,6 +67,9 @@ class TransmitterManager:
             b = time.time() - a
             self.logger.info(f"time taken for process to join , {b}")
 
+            if transmitter_id in self.frame_buffers:
+                self.frame_buffers[transmitter_id].detach()  # Closing the shared memory opened by the main process
+
 
             x = time.time() - t
             self.logger.info(f"Time taken to stop: {x} for the tranmitter :: {transmitter_id}")
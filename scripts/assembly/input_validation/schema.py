@@ -11,6 +11,7 @@ cameraInfo_schema = {
                         "type": "array",
                         "items": {"type": "string"}
                     },
+                    "visualization": {"type": "string", "enum": ["always", "on_fail", "never"]},
                     "tracker": {
                         "type": "object",
                         "properties": {
@@ -29,7 +30,11 @@ cameraInfo_schema = {
                                 },
                                 "required": ["direction", "coordinates", "type", "line"],
                                 "additionalProperties": True
-                            }
+                            },
+                            "detect_every": {"type": "integer", "minimum": 1},
+                            "roi_guard": {"type": "number", "minimum": 0},
+                            "detection_band": {"type": "number", "minimum": 0},
+                            "tracker_scale": {"type": "number", "exclusiveMinimum": 0, "maximum": 1}
                         },
                         "required": ["model_id", "roi"],
                         "additionalProperties": True
@@ -124,6 +129,14 @@ modelInfo_schema = {
                 "minimum": 0,
                 "maximum": 1  # Assuming threshold is between 0 and 1
             },
+            "backend": {
+                "type": "string",
+                "enum": ["ultralytics", "onnxruntime", "torch"]  # onnxruntime for YoloV8 models (modelKey 0 and 3), torch for YoloV8 detection (modelKey 0)
+            },
+            "intraOpThreads": {
+                "type": "integer",
+                "minimum": 0
+            },
             "params": {
                 "type": "object",
                 # "properties": {
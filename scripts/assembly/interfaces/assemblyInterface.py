@@ -83,24 +83,40 @@ class AssemblyInterface:
         Makes the class callable. Simplifies the process of running an image through the entire pipeline.
 
         Args:
-            image (array): The input image.
+            image (array or list): The input image, or a list of images to run as one batch.
 
         Returns:
-            tuple: Bounding boxes, class names, and confidence scores.
+            tuple: Bounding boxes, class names, and confidence scores,
+                   a list of them when a list of images is passed.
         """
+        if isinstance(image, list):
+            return self.forward_batch(images=image)
         input = self.preProcess( image=image)
         pred_output = self.forward( input=input)
         bboxes, classes, scores = self.postProcess( pred_output=pred_output)
         print(f"\n\n\n ----------------------classes after post_processing: {classes}\n\n\n")
         
-        if isinstance(self.conf_thresh, float):
-            bboxes, classes, scores = self.applyConfThresh(bboxes=bboxes, classes=classes, confs=scores)
-        else:
-            bboxes, classes, scores = self.applyClasswiseConfThresh(bboxes=bboxes, classes=classes, confs=scores)
+        bboxes, classes, scores = self.applyThresh(bboxes=bboxes, classes=classes, confs=scores)
         # res_json = self.createResJson(bboxes=bboxes, classes=classes, conf=scores)
         # custom_nms((bboxes, classes, scores))
         return bboxes, classes, scores
     
+    # Method that can be used to call the Assembly interface on a list of images
+    def forward_batch(self, images):
+        """
+        Runs a list of images through the pipeline, in a single model call when the
+        model supports batched inference.
+
+        Args:
+            images (list): The input images.
+
+        Returns:
+            list: Bounding boxes, class names, and confidence scores for each image.
+        """
+        if not hasattr(self.model, "forward_batch"):
+            return [self(image=image) for image in images]
+        return [self.applyThresh(bboxes=bboxes, classes=classes, confs=scores) for bboxes, classes, scores in self.model.forward_batch(images)]
+
     # Method to create a resjson in the standard format
     def createResJson(self, bboxes, classes, conf):
         """
@@ -125,6 +141,23 @@ class AssemblyInterface:
                 result[class_name] = {"partName": class_name, "count": 1, "boxes":[bboxes[id]]}
         return list(result.values())
     
+    # Method to apply the threshold of this interface, single or classwise
+    def applyThresh(self, bboxes, classes, confs):
+        """
+        Applies the confidence threshold of the interface to the model's output.
+
+        Args:
+            bboxes (list): List of bounding boxes.
+            classes (list): List of class indices.
+            confs (list): List of confidence scores.
+
+        Returns:
+            tuple: Filtered bounding boxes, classes, and confidence scores.
+        """
+        if isinstance(self.conf_thresh, float):
+            return self.applyConfThresh(bboxes=bboxes, classes=classes, confs=confs)
+        return self.applyClasswiseConfThresh(bboxes=bboxes, classes=classes, confs=confs)
+
     # Method to apply thresholding on the results
     # Dynamic thresholding
     def applyConfThresh(self, bboxes, classes, confs):
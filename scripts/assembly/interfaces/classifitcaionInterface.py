@@ -83,17 +83,35 @@ class ClassificationInterface:
         Makes the class callable. Simplifies the process of running an image through the entire pipeline.
 
         Args:
-            image (array): The input image.
+            image (array or list): The input image, or a list of images to run as one batch.
 
         Returns:
-            tuple: Class name and confidence score.
+            tuple: Class name and confidence score, a list of them when a list of images is passed.
         """
+        if isinstance(image, list):
+            return self.forward_batch(images=image)
         input = self.preProcess( image=image)
         pred_output = self.forward( input=input)
         class_name, class_conf = self.postProcess( pred_output=pred_output)
         # res_json = self.createResJson(class_name=class_name, class_conf=class_conf)
         return class_name, class_conf
     
+    # Method that can be used to call the Classification interface on a list of images
+    def forward_batch(self, images):
+        """
+        Runs a list of images through the pipeline, in a single model call when the
+        model supports batched inference.
+
+        Args:
+            images (list): The input images.
+
+        Returns:
+            list: Class name and confidence score for each image.
+        """
+        if not hasattr(self.model, "forward_batch"):
+            return [self(image=image) for image in images]
+        return list(self.model.forward_batch(images))
+    
     # Method to create a resjson in the standard format
     def createResJson(self, class_name, class_conf):
         """
@@ -78,16 +78,16 @@ class inferenceInterface:
         crop = image[y1:y2, x1:x2].copy()
         return crop
     
-    # Main method to run a image through the built pipeline 
-    def run(self, image, roi=[]):
+    # Method to crop the main roi of this pipeline from the image
+    def mainCrop(self, image):
         """
-        Runs the image through the built pipeline and returns the output.
+        Converts the main ROI of the pipeline to absolute values and crops it from the image.
         
         Args:
-            image (array): The image on which inference is to be run. # cropped according to the tracker yolo detection
+            image (array): The image on which inference is to be run.
             
         Returns:
-            Output: The inference output wrapped in an Output object.
+            tuple: The absolute main ROI [x1, y1, x2, y2] and the cropped image.
         """
         # Converting ROI to proper format
         main_cropping = self.checkRoi(roi=self.main_croping, image_shape=image.shape) # returning absolute value roi = shape of cropped image = [0,0, height, width]
@@ -95,14 +95,45 @@ class inferenceInterface:
         #main cropping is [0, 0, 148, 228] because roi is 0011
         # Main cropping
         cropped_image = self.cropping(image=image, roi=main_cropping) #needed when roi =! 0011
+        return main_cropping, cropped_image
 
+    # Main method to run a image through the built pipeline 
+    def run(self, image, roi=[]):
+        """
+        Runs the image through the built pipeline and returns the output.
+        
+        Args:
+            image (array): The image on which inference is to be run. # cropped according to the tracker yolo detection
+            
+        Returns:
+            Output: The inference output wrapped in an Output object.
+        """
+        main_cropping, cropped_image = self.mainCrop(image=image)
+        model1_res = self.model1(image=cropped_image)
+        return self.processModel1Result(image=image, roi=roi, main_cropping=main_cropping, model1_res=model1_res)
+
+    # Method to build the output from the model1 result, running the second stage if needed
+    def processModel1Result(self, image, roi, main_cropping, model1_res):
+        """
+        Retraces the model1 result of the main cropping to the image and runs the second stage models.
+        
+        Args:
+            image (array): The image on which inference is run.
+            roi (list): Absolute position of the image in the actual frame.
+            main_cropping (list): The absolute main ROI cropped from the image.
+            model1_res (tuple): Output of model1 on the main cropping, (bboxes, classes, scores) for
+                                detection and (class_name, class_conf) for classification.
+            
+        Returns:
+            Output: The inference output wrapped in an Output object.
+        """
         main_res = {"detection":{}, "classification":{}}
         
         
         if self.model1_type == "detection":
             
             # If its a detection model
-            bboxes, classes, scores = self.model1(image=cropped_image)
+            bboxes, classes, scores = model1_res
             
 
 
@@ -123,21 +154,18 @@ class inferenceInterface:
             
             bboxes = self.retrace(top_left_corner=main_cropping[:2], bounding_boxes=bboxes) # Just passing top left of main cropping
             
+            # Objects that need a second stage classification, grouped by class name
+            objects_to_classify = dict()
             for box, class_name, score in zip(bboxes, classes, scores):
                 print("[DEBUG] Processing Detection Class:", class_name)
                 det_res = {}
                 
                 det_res["box"] = self.retrace_box(top_left_pt=roi[:2], bbox=box) # retracing to the absolute image incase of tracker is enabled
                 det_res["det_score"] = score
-                if class_name in list(self.model2.keys()):
-                    # Cropping the object
+                if class_name in self.model2:
+                    # Cropping the object, classified later with the rest of its class
                     cropped_object = self.cropping(image, roi=box)
-                    # passing image to modelas 
-
-                    classfication_name, class_conf = self.model2[class_name](image=cropped_object)
-                    # Adding result to dict
-                    det_res["class_name"] = classfication_name
-                    det_res["class_score"] = class_conf
+                    objects_to_classify.setdefault(class_name, []).append((det_res, cropped_object))
                     
                 
                 if class_name not in main_res["detection"].keys():
@@ -145,13 +173,32 @@ class inferenceInterface:
                 else:
                     main_res["detection"][class_name].append(det_res)
 
+            # Passing all the objects of a class to its model as one batch
+            self.classifyObjects(objects_to_classify=objects_to_classify)
+
         else:
-            class_name, class_conf = self.model1(image=cropped_image)
+            class_name, class_conf = model1_res
             main_res["classification"] = {"class_score":class_conf, "class_name": class_name, "box":self.retrace_box(top_left_pt=roi[:2], bbox=main_cropping)}
         
         
         return main_res
        
+    # Method to run the second stage classification of the detected objects
+    def classifyObjects(self, objects_to_classify):
+        """
+        Classifies the cropped objects of each class with its model2 in a single batch
+        and adds the class name and score to their detection results.
+        
+        Args:
+            objects_to_classify (dict): Class name as the key and a list of (det_res, cropped_object) as value.
+        """
+        for class_name, objects in objects_to_classify.items():
+            results = self.model2[class_name].forward_batch(images=[cropped_object for _, cropped_object in objects])
+            for (det_res, _), (classfication_name, class_conf) in zip(objects, results):
+                # Adding result to dict
+                det_res["class_name"] = classfication_name
+                det_res["class_score"] = class_conf
+
     # Method to retrace the bounding boxes to the actual image
     def retrace(self, top_left_corner, bounding_boxes):
         """
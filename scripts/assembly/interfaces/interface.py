@@ -3,6 +3,7 @@ import numpy as np
 from assembly.interfaces.inferenceInterface import inferenceInterface
 from assembly.interfaces.assemblyInterface import AssemblyInterface
 from assembly.interfaces.trackerInterface import TrackerInterface
+from assembly.model_utils.renderer import VISUALIZATION_MODES
 
 
 # Class that takes in the group info for a particular camera 
@@ -47,13 +48,33 @@ class Interface:
             - Initializes ROI processors for cropping and inference.
         """
         self.tracker_status = True if "tracker" in self.group_info["steps"] else False
+        # Annotated images rendered for every frame ("always"), only for failed ones ("on_fail") or
+        # never, the others are rendered on demand from the raw frame and its results
+        self.visualization = self.group_info.get("visualization", os.getenv("VISUALIZATION_MODE", "always"))
+        if self.visualization not in VISUALIZATION_MODES:
+            raise ValueError(f"Unknown visualization mode {self.visualization}")
         if self.tracker_status:
+            self.tracker_model_id = self.group_info["tracker"]["model_id"]
             self.tracker_model = AssemblyInterface(model=self.ModelDict[self.group_info["tracker"]["model_id"]], threshold=0.75)
             self.tracker = TrackerInterface(tracker=self.TrackerDict[self.camera_id], roi=self.group_info["tracker"]["roi"]["line"], dir=self.group_info["tracker"]["roi"]["direction"])
+            # Run the tracker model every detect_every frames, the frames in between are served by the
+            # tracker prediction unless a track is about to cross the ROI (within roi_guard pixels)
+            self.detect_every = max(1, int(self.group_info["tracker"].get("detect_every", os.getenv("TRACKER_DETECT_EVERY", 1))))
+            self.roi_guard = float(self.group_info["tracker"].get("roi_guard", os.getenv("TRACKER_ROI_GUARD", 0)))
+            self.frames_since_detection = 0
+            # Half width of the strip around the ROI line the tracker model runs on, in pixels or as a
+            # fraction of the frame when below 1, 0 runs it on the whole frame
+            self.detection_band = float(self.group_info["tracker"].get("detection_band", os.getenv("TRACKER_DETECTION_BAND", 0)))
+            # Scale of the copy of the frame (or band) the tracker model runs on, the crops for the
+            # ROI processors are still taken from the full resolution frame
+            self.tracker_scale = min(1., float(self.group_info["tracker"].get("tracker_scale", os.getenv("TRACKER_SCALE", 1))))
         #tracker in trackerinterface is the tracker model ocsort or centroid that only being used for video frames
         self.roi_processors = dict() 
+        # roi_ids of the roi_processors grouped by the model_1 they use, run as one batch
+        self.shared_models = dict()
         for roi_id, interface_info in self.group_info["cropping"].items():
             self.roi_processors[roi_id] = inferenceInterface(interface_info=interface_info, ModelDict=self.ModelDict)
+            self.shared_models.setdefault(interface_info["model_1"][0]["model_id"], []).append(roi_id)
 
             self.ground_truth[roi_id] = interface_info["ground_truth"]
 
@@ -74,13 +95,129 @@ class Interface:
         return crop
     
     
+    # Method to run all the rois using the same model in a single batch
+    def runSharedModel(self, model_id, roi_ids, images, rois, roi_results):
+        """
+        Crops the main roi of every roi_processor sharing a model from every image, runs the
+        crops through the model as one batch and lets each roi_processor finish its own
+        pipeline with its own threshold and retrace offsets.
+
+        Args:
+            model_id (str): The uuid of the shared model in ModelDict.
+            roi_ids (list): The roi_ids of the roi_processors using the model.
+            images (list): The images to run, one per tracked object or the whole frame.
+            rois (list): Absolute position of each image in the actual frame.
+            roi_results (list): Dictionary for each image where the roi outputs are added.
+        """
+        jobs = []
+        for ind, image in enumerate(images):
+            for roi_id in roi_ids:
+                main_cropping, cropped_image = self.roi_processors[roi_id].mainCrop(image=image)
+                jobs.append((ind, roi_id, main_cropping, cropped_image))
+
+        outputs = self.ModelDict[model_id].forward_batch([cropped_image for _, _, _, cropped_image in jobs])
+
+        for (ind, roi_id, main_cropping, _), model1_res in zip(jobs, outputs):
+            processer = self.roi_processors[roi_id]
+            if processer.model1_type == "detection":
+                # Threshold of the roi
+                bboxes, classes, scores = model1_res
+                model1_res = processer.model1.applyThresh(bboxes=bboxes, classes=classes, confs=scores)
+            roi_results[ind][roi_id] = processer.processModel1Result(image=images[ind], roi=rois[ind], main_cropping=main_cropping, model1_res=model1_res)
+
+    # Method to extract the band around the ROI line the tracker model runs on
+    def bandImage(self, image):
+        """
+        Extracts the strip of the image within detection_band of the ROI line, along the
+        direction of movement.
+
+        Args:
+            image (array): The full frame.
+
+        Returns:
+            tuple: The strip and its (x, y) offset in the frame, the frame itself and (0, 0)
+                   when no band is set.
+        """
+        if self.detection_band <= 0:
+            return image, (0, 0)
+        vertical = self.tracker.dir in ["up2down", "down2up"]
+        extent = image.shape[0] if vertical else image.shape[1]
+        half = self.detection_band * extent if self.detection_band < 1 else self.detection_band
+        roi = self.group_info["tracker"]["roi"]["line"]
+        start, end = max(0, int(roi - half)), min(extent, int(roi + half))
+        if vertical:
+            return image[start:end], (0, start)
+        return image[:, start:end], (start, 0)
+
+    # Method to build the input of the tracker model from a frame
+    def trackerInput(self, image):
+        """
+        Cuts the frame to the detection band and downscales it by tracker_scale.
+
+        Args:
+            image (array): The full frame.
+
+        Returns:
+            tuple: The tracker model input and the (x offset, y offset, x scale, y scale) that
+                   maps it to the frame.
+        """
+        band, (ox, oy) = self.bandImage(image)
+        if self.tracker_scale >= 1:
+            return band, (ox, oy, 1., 1.)
+        h, w = band.shape[:2]
+        size = (max(1, int(round(w * self.tracker_scale))), max(1, int(round(h * self.tracker_scale))))
+        small = cv2.resize(band, size, interpolation=cv2.INTER_LINEAR)
+        return small, (ox, oy, size[0] / w, size[1] / h)
+
+    # Method to move the tracker model detections back to the frame
+    def remapDetections(self, detections, transform):
+        """
+        Maps the boxes detected on the tracker model input back to frame coordinates.
+
+        Args:
+            detections (tuple): Bounding boxes, classes and scores detected on the input.
+            transform (tuple): (x offset, y offset, x scale, y scale) returned by trackerInput.
+
+        Returns:
+            tuple: Bounding boxes in frame coordinates, classes and scores.
+        """
+        bboxes, classes, scores = detections
+        ox, oy, sx, sy = transform
+        if sx != 1 or sy != 1:
+            bboxes = [[int(round(x1 / sx)), int(round(y1 / sy)), int(round(x2 / sx)), int(round(y2 / sy))] for x1, y1, x2, y2 in bboxes]
+        if ox or oy:
+            bboxes = [[x1 + ox, y1 + oy, x2 + ox, y2 + oy] for x1, y1, x2, y2 in bboxes]
+        return bboxes, classes, scores
+
+    # Method to check if the tracker model has to run on the next frame
+    def needsDetection(self):
+        """
+        Checks if the tracker model has to run on the next frame. With detect_every > 1 the
+        detection is skipped until the scheduled frame, unless the tracker can not predict, a
+        new track has no motion yet or a track not analysed yet is predicted to cross the ROI
+        before that frame.
+
+        Returns:
+            bool: True if the detection has to run, otherwise False.
+        """
+        if not self.tracker_status:
+            return False
+        if self.detect_every <= 1 or not self.tracker.canPredict():
+            return True
+        remaining = self.detect_every - self.frames_since_detection - 1
+        if remaining <= 0 or self.tracker.hasTentativeTracks():
+            return True
+        return self.tracker.approachingRoi(steps=remaining, guard=self.roi_guard)
+
     # Method that passes an image through the built pipeline
-    def run(self, image): 
+    def run(self, image, detections=None): 
         """
         Runs the image through the built pipeline and returns the output.
 
         Args:
             image (array): The image on which the pipeline is to be run.
+            detections (tuple): Tracker model detections (bboxes, classes, scores) already computed
+                                for the image, e.g. by a batched forward. Defaults to None.
 
         Returns:
             dict: Dictionary containing tracker and ROI processor outputs.
@@ -100,8 +237,18 @@ class Interface:
             
             
             
-            # Passing image to detection model
-            bboxes, classes, scores = self.tracker_model(image=image)
+            # Frame served by the tracker prediction, nothing crosses the ROI before the next detection
+            if detections is None and not self.needsDetection():
+                self.frames_since_detection += 1
+                return res_dict, self.tracker.coast()[1]
+            self.frames_since_detection = 0
+
+            # Passing image to detection model, unless it was already done in a batch
+            if detections is None:
+                tracker_input, transform = self.trackerInput(image)
+                bboxes, classes, scores = self.remapDetections(self.tracker_model(image=tracker_input), transform)
+            else:
+                bboxes, classes, scores = detections
             
             # Passing the detections to tracker
             # frame_with_roi = self.tracker.draw_roi(frame_with_roi)
@@ -120,6 +267,7 @@ class Interface:
         #{'tracker': [[1770, 426, 1918, 654], [1167, 423, 1532, 663], [
         # 542, 423, 877, 662], [3, 426, 232, 674]], 'cropping': []}
 
+        rois = []
         for ind, image in enumerate(images):
             # Initialize roi to None
             roi = [0,0,1,1]
@@ -127,18 +275,22 @@ class Interface:
             if "tracker" in res_dict and len(res_dict["tracker"]) > 0:
                 # Extract bounding box coordinates
                 roi = res_dict["tracker"][ind] #orignal cordinates for detection
+            rois.append(roi)
                 
             
-            # Initialize roi_res dictionary
-            roi_res = {}
-            x = time.time()
-            # Iterate through roi_processors and run with extracted roi
-            for roi_id, processer in self.roi_processors.items():
-                
-                roi_res[roi_id] = processer.run(image=image, roi=roi) #image = cropped but roi = absolute wrt real image 
+        # Initialize roi_res dictionary for each image
+        roi_results = [dict() for _ in images]
+        x = time.time()
+        # Running the roi_processors that share a model together, with extracted roi
+        for model_id, roi_ids in self.shared_models.items():
+            if len(images) * len(roi_ids) == 1:
+                roi_results[0][roi_ids[0]] = self.roi_processors[roi_ids[0]].run(image=images[0], roi=rois[0]) #image = cropped but roi = absolute wrt real image 
+            else:
+                self.runSharedModel(model_id=model_id, roi_ids=roi_ids, images=images, rois=rois, roi_results=roi_results)
                 
-            # Append roi_res to cropping results in res_dict
-            res_dict["cropping"].append(roi_res)
+        # Append roi_res to cropping results in res_dict, in the order of the roi_processors
+        for roi_res in roi_results:
+            res_dict["cropping"].append({roi_id: roi_res[roi_id] for roi_id in self.roi_processors})
         
         
 
@@ -68,6 +68,7 @@ class TrackerInterface:
         """
         result = {}
         tracker_res = self.update(dets=dets, confs=confs, classes=classes)
+        self.compactQueue(tracker_res)
         if len(tracker_res) > 0:  # Checking if any bounding box was there
             # for tracker_dict in tracker_res:
             for id, bbox in tracker_res.items():
@@ -121,6 +122,84 @@ class TrackerInterface:
         return analysedFlag
 
 
+    def canPredict(self):
+        """
+        Checks if the tracker can serve frames without detections from its motion prediction.
+
+        Returns:
+            bool: True if the tracker has coast, peek and tentative_tracks (OC-SORT), otherwise False.
+        """
+        return all(hasattr(self.tracker, name) for name in ("coast", "peek", "tentative_tracks"))
+
+    def hasTentativeTracks(self):
+        """
+        Checks if the tracker has new tracks that were never matched, their motion is unknown
+        so they can not be predicted.
+
+        Returns:
+            bool: True if there are tentative tracks, otherwise False.
+        """
+        return self.tracker.tentative_tracks() > 0
+
+    def coast(self):
+        """
+        Advances the tracker on a frame where the detection was skipped. No object is reported
+        as crossing on such a frame, approachingRoi makes sure the detection runs before.
+
+        Returns:
+            tuple: Empty tracking results and the object count.
+        """
+        self.tracker.coast()
+        return {}, self.object_count
+
+    def approachingRoi(self, steps, guard=0):
+        """
+        Checks if an object not analysed yet is predicted to cross the ROI within the next
+        steps frames.
+
+        Args:
+            steps (int): Number of frames to look ahead.
+            guard (float): Extra margin in pixels before the ROI.
+
+        Returns:
+            bool: True if an object is about to cross the ROI, otherwise False.
+        """
+        shift = guard if self.operator is operator.ge else -guard
+        for id, bbox in self.tracker.peek(steps).items():
+            if self.objAnalysed(id):
+                continue
+            x1, y1, x2, y2 = bbox
+            cord = (y1 + y2) / 2 if self.dir in ["up2down", "down2up"] else (x1 + x2) / 2
+            if self.operator(cord + shift, self.roi):
+                return True
+        return False
+
+    def compactQueue(self, tracker_res):
+        """
+        Forgets the analysed ids that the tracker no longer tracks, so the queue only holds live
+        objects and an id reused by the tracker is not taken as already analysed.
+
+        Args:
+            tracker_res (dict): Tracking results of the current frame.
+        """
+        if not hasattr(self.tracker, "live_ids"):
+            return
+        live_ids = set(self.tracker.live_ids()) | set(tracker_res)
+        if any(obj_id not in live_ids for obj_id in self.queue):
+            self.queue = deque((obj_id for obj_id in self.queue if obj_id in live_ids), maxlen=self.queue.maxlen)
+
+    def memory_stats(self):
+        """
+        Memory metric of the tracker: live tracks, stored boxes and bytes (see the tracker's
+        memory_stats) plus the number of analysed ids kept in the queue.
+
+        Returns:
+            dict: The tracker stats with "analysed_ids" added.
+        """
+        stats = dict(self.tracker.memory_stats()) if hasattr(self.tracker, "memory_stats") else {}
+        stats["analysed_ids"] = len(self.queue)
+        return stats
+
     def draw_roi(self, frame):
         """
         Draws the ROI on the frame.
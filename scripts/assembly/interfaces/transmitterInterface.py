@@ -21,7 +21,7 @@ transmitter_queues = {}
 
 
 class TransmitterInterface:
-    def __init__(self, shared_queue, camera_ip, transmitter_config, stop_event, transmitter_id, transmitterlog):
+    def __init__(self, shared_queue, camera_ip, transmitter_config, stop_event, transmitter_id, transmitterlog, frame_buffer=None):
         self.transmitter = None
         self.queue = shared_queue  # Shared queue for inter-process communication
         self.camera_ip = camera_ip  # IP address of the camera
@@ -29,6 +29,7 @@ class TransmitterInterface:
         self.transmitter_id = transmitter_id
         self.stop_event = stop_event  # Event to signal stopping the transmitter
         self.logger = transmitterlog
+        self.frame_buffer = frame_buffer  # Shared memory buffer the MVS transmitters write frames into
     def _create_transmitter(self):
         """Create the appropriate transmitter based on the configuration."""
         self.logger.info(f"Working with camera type: {self.transmitter_config['camera_type']}")
@@ -38,17 +39,17 @@ class TransmitterInterface:
 
         elif self.transmitter_config['camera_type'] == 'streaming':
             self.logger.info(f"Transmitter Initialization started for {self.transmitter_config}")
-            self.transmitter = ContinuousStreamingTransmitter(self.queue, self.camera_ip, self.transmitter_config, self.transmitter_id, self.logger, self.stop_event)
+            self.transmitter = ContinuousStreamingTransmitter(self.queue, self.camera_ip, self.transmitter_config, self.transmitter_id, self.logger, self.stop_event, self.frame_buffer)
             self.logger.info("Transmitter Initialization completed")
 
 
         elif self.transmitter_config['camera_type'] == 'Software Trigger':
         
-            self.transmitter = SoftwareTriggerTransmitter(self.queue, self.camera_ip, self.transmitter_config, self.transmitter_id, self.logger,self.stop_event)
+            self.transmitter = SoftwareTriggerTransmitter(self.queue, self.camera_ip, self.transmitter_config, self.transmitter_id, self.logger,self.stop_event, self.frame_buffer)
             self.logger.info("Transmitter Initialization completed")
         elif self.transmitter_config['camera_type'] == 'Hardware Trigger':
             self.logger.info(f"Transmitter Initialization started for {self.transmitter_config}")
-            self.transmitter = HardwareTriggerTransmitter(self.queue, self.camera_ip, self.transmitter_config, self.transmitter_id, self.logger)
+            self.transmitter = HardwareTriggerTransmitter(self.queue, self.camera_ip, self.transmitter_config, self.transmitter_id, self.logger, self.frame_buffer)
             self.logger.info("Transmitter Initialization completed")
     def run(self):
         """Run the transmitter until the stop event is set."""
@@ -2,20 +2,33 @@ import os
 import numpy as np
 import cv2
 
+# Hershey glyphs lose their spacing below this font scale
+MIN_FONT_SCALE = 0.3
+
+
+def thickness(full_resolution_thickness, scale):
+    """
+    Line thickness on an image scaled by scale, rounded up so thin lines stay visible.
+    """
+    return max(1, int(np.ceil(full_resolution_thickness * scale)))
+
+
 class VisualizeResults:
     """
     A utility class to visualize detection and classification results
     on images using bounding boxes and text annotations.
     """
 
-    def __init__(self, uuid_class_map):
+    def __init__(self, uuid_class_map, resize_ratio=4):
         """
         Initializes the VisualizeResults class with a UUID to class name map.
         
         Args:
         - uuid_class_map (dict): Dictionary mapping UUIDs to class names.
+        - resize_ratio (int, optional): Ratio the saved image is downscaled by. Defaults to 4.
         """
         self.uuid_class_map = uuid_class_map
+        self.resize_ratio = resize_ratio
     
    
     def get_class_name(self, uuid):
@@ -30,7 +43,7 @@ class VisualizeResults:
         """
         return self.uuid_class_map.get(uuid, "Unknown")
 
-    def draw_box(self, frame, box, color=[0, 255, 0]):
+    def draw_box(self, frame, box, color=[0, 255, 0], scale=1.):
         """
         Draws a bounding box on the given frame.
         
@@ -38,15 +51,16 @@ class VisualizeResults:
         - frame (np.array): The image on which the box will be drawn.
         - box (tuple): Coordinates of the box in the format (x1, y1, x2, y2).
         - color (list, optional): Color of the bounding box. Defaults to green.
+        - scale (float, optional): Scale of the frame relative to the box coordinates. Defaults to 1.
 
         Returns:
         - np.array: Image with the bounding box drawn.
         """
         x1, y1, x2, y2 = box
-        cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), color, 5)
+        cv2.rectangle(frame, (int(x1 * scale), int(y1 * scale)), (int(x2 * scale), int(y2 * scale)), color, thickness(5, scale))
         return frame
     
-    def draw_roi(self, frame, roi, direction):
+    def draw_roi(self, frame, roi, direction, scale=1.):
         """
         Draws the ROI on the given frame.
 
@@ -54,6 +68,7 @@ class VisualizeResults:
             frame (np.array): The frame on which the ROI will be drawn.
             roi (int or tuple): The ROI coordinate or bounding box.
             direction (str): The direction of movement.
+            scale (float): Scale of the frame relative to the ROI coordinates.
 
         Returns:
             np.array: The frame with the ROI drawn on it.
@@ -66,18 +81,21 @@ class VisualizeResults:
                 roi = int(roi * height)  # Scale by height for vertical line
             else:
                 roi = int(roi * width)   # Scale by width for horizontal line
+        else:
+            # Pixel coordinates of the full resolution frame
+            roi = int(roi * scale) if isinstance(roi, (int, np.integer)) else [int(cord * scale) for cord in roi]
 
         if isinstance(roi, int):
             if direction in ["up2down", "down2up"]:
-                cv2.line(frame, (0, roi), (frame.shape[1], roi), (0, 255, 0), 2)
+                cv2.line(frame, (0, roi), (frame.shape[1], roi), (0, 255, 0), thickness(2, scale))
             else:
-                cv2.line(frame, (roi, 0), (roi, frame.shape[0]), (0, 255, 0), 2)
+                cv2.line(frame, (roi, 0), (roi, frame.shape[0]), (0, 255, 0), thickness(2, scale))
         else:
-            cv2.rectangle(frame, (roi[0], roi[1]), (roi[2], roi[3]), (0, 255, 0), 2)
+            cv2.rectangle(frame, (roi[0], roi[1]), (roi[2], roi[3]), (0, 255, 0), thickness(2, scale))
         return frame
 
     # Method to write the classname
-    def write_name(self, frame, text, pt, color=[255, 255, 0]):
+    def write_name(self, frame, text, pt, color=[255, 255, 0], scale=1.):
         """
         Writes text annotations on the given frame.
         
@@ -86,21 +104,23 @@ class VisualizeResults:
         - text (str): Text to be written on the image.
         - pt (tuple): Position where the text will start.
         - color (list, optional): Color of the text. Defaults to yellow.
+        - scale (float, optional): Scale of the frame relative to pt. Defaults to 1.
 
         Returns:
         - np.array: Image with the text written.
         """
         # writing on images
-        cv2.putText(frame, text, (pt[0] - 10, pt[1] - 10), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
+        cv2.putText(frame, text, (int((pt[0] - 10) * scale), int((pt[1] - 10) * scale)), cv2.FONT_HERSHEY_SIMPLEX, max(scale, MIN_FONT_SCALE), color, thickness(2, scale), cv2.LINE_AA if scale < 1 else cv2.LINE_8)
         return frame
 
-    def draw_result(self, image, result_info):
+    def draw_result(self, image, result_info, scale=1.):
         """
         Draws the results on the image.
         
         Args:
         - image (np.array): The image on which the results will be drawn.
         - result_info (dict): Dictionary containing the results to be drawn.
+        - scale (float, optional): Scale of the image relative to the boxes. Defaults to 1.
         
         Returns:
         - np.array: Image with the results drawn.
@@ -112,16 +132,17 @@ class VisualizeResults:
             
             color = [0, 255, 0] if info["pass"] else [0, 0, 255]
             for box in info["boxes"]:
-                image = self.draw_box(frame=image, box=box, color=color)
-                image = self.write_name(frame=image, text=class_name, pt=box[:2])
+                image = self.draw_box(frame=image, box=box, color=color, scale=scale)
+                image = self.write_name(frame=image, text=class_name, pt=box[:2], scale=scale)
 
             for box in info["fail_boxes"]:
-                image = self.draw_box(frame=image, box=box, color=[0, 0, 255])
-                image = self.write_name(frame=image, text=f"{class_name}_absent", pt=box[:2])
+                image = self.draw_box(frame=image, box=box, color=[0, 0, 255], scale=scale)
+                image = self.write_name(frame=image, text=f"{class_name}_absent", pt=box[:2], scale=scale)
         return image
     
-    def print_object_count(self, image, count, position=(50, 50), color=[255, 255, 0]):
-        cv2.putText(image, f"Object Count: {count}", position, cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
+    def print_object_count(self, image, count, position=(50, 50), color=[255, 255, 0], scale=1.):
+        position = (int(position[0] * scale), int(position[1] * scale))
+        cv2.putText(image, f"Object Count: {count}", position, cv2.FONT_HERSHEY_SIMPLEX, max(scale, MIN_FONT_SCALE), color, thickness(2, scale), cv2.LINE_AA if scale < 1 else cv2.LINE_8)
         return image
     
     # Method to resize the results image
@@ -143,27 +164,37 @@ class VisualizeResults:
         resized_image = cv2.resize(original_image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
         return resized_image
 
-    def draw(self, image, results, object_count=None, roi=None, direction=None):
+    def draw(self, image, results, object_count=None, roi=None, direction=None, source_width=None):
         """
-        Draws the results on the image and prints the object count if available.
+        Downscales the image and draws the results on it, with the geometry scaled by the same
+        ratio, and prints the object count if available. The given image is not modified.
         
         Args:
-        - image (np.array): The image on which the results will be drawn.
+        - image (np.array): The full resolution image the results refer to.
         - results (dict): The results to be drawn on the image.
         - object_count (int, optional): The object count to be printed. Defaults to None.
+        - source_width (int, optional): Width of the frame the results refer to when the image
+          is already downscaled, it is then drawn on as it is. Defaults to None.
         
         Returns:
-        - np.array: The image with the results and object count drawn.
+        - np.array: The downscaled image with the results and object count drawn.
         """
+        if source_width is None:
+            width = image.shape[1]
+            image = self.resize_image(original_image=image, resize_ratio=self.resize_ratio)
+        else:
+            width = source_width
+            image = image.copy()
+        scale = image.shape[1] / width
+
         for single_result in results["result"]:
-            image = self.draw_result(image=image, result_info=single_result)
+            image = self.draw_result(image=image, result_info=single_result, scale=scale)
         
         if object_count is not None:
-            image = self.print_object_count(image=image, count=object_count)
+            image = self.print_object_count(image=image, count=object_count, scale=scale)
         
         if roi is not None and direction is not None:
             print(f"what is roi here {roi}")
-            image = self.draw_roi(image, roi, direction)
+            image = self.draw_roi(image, roi, direction, scale=scale)
         
-        image = self.resize_image(original_image=image)
         return image
\ No newline at end of file
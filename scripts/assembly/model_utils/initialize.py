@@ -87,7 +87,7 @@ class GlobalParameters():
         # Current active models 
         self.active_models = self.extract_values()
         # Loading the model dictionary
-        self.ModelDict = modelManager(model_params=self.model_params, loggerObj=self.loggerObj, MODELS_DIR=self.MODELS_DIR).load_models(model_dict=self.ModelDict, active_models=self.active_models, device="cuda")
+        self.ModelDict = modelManager(model_params=self.model_params, loggerObj=self.loggerObj, MODELS_DIR=self.MODELS_DIR).load_models(model_dict=self.ModelDict, active_models=self.active_models, device=str(self.device))
         # # Warm up each model
         # for model_id, model in self.ModelDict.items():
         #     print(f"Warming up model: {model_id}")
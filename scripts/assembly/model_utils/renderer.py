@@ -0,0 +1,136 @@
+import os, sys, json, argparse, functools
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import unquote
+import cv2
+from assembly.model_utils.Visualisor import VisualizeResults
+from assembly.components.serializer import dumps
+print=functools.partial(print, flush=True)
+
+# Visualization policies of a camera
+VISUALIZATION_MODES = ("always", "on_fail", "never")
+
+
+def render_eagerly(policy, results):
+    """
+    Checks if the annotated image of a frame is rendered right away or deferred to the renderer.
+
+    Args:
+        policy (str): Visualization policy of the camera, "always", "on_fail" or "never".
+        results (list): Results of the frame, class wise info with its "pass" flag for each object.
+
+    Returns:
+        bool: True to render now, False to store the raw frame and its results.
+    """
+    if policy == "never":
+        return False
+    if policy == "on_fail":
+        return any(not info["pass"] for result in results for info in result.values())
+    return True
+
+
+def sidecar_path(image_path):
+    """
+    Path of the results stored next to a deferred image.
+    """
+    return os.path.splitext(image_path)[0] + ".json"
+
+
+def deferred_sidecar(image_path, results, object_count, roi, direction, source_width, uuid_class_map):
+    """
+    Serializes what the renderer needs to draw the results on the raw frame saved at image_path.
+    The sidecar is written by the ImageWriter along with the frame, so both exist or neither.
+
+    Args:
+        image_path (str): Path the raw (downscaled) frame is written to.
+        results (list): Results of the frame, with their boxes in source frame coordinates,
+                        NumPy values are serialized as they are.
+        object_count (int): Object count printed on the image.
+        roi (int or list): ROI of the tracker.
+        direction (str): Direction of movement.
+        source_width (int): Width of the frame the results refer to.
+        uuid_class_map (dict): Class name of each class uuid.
+
+    Returns:
+        tuple: Path of the sidecar and its JSON content.
+    """
+    sidecar = {"results": results, "object_count": object_count, "roi": roi, "direction": direction,
+               "source_width": source_width, "uuid_class_map": uuid_class_map}
+    return sidecar_path(image_path), dumps(sidecar)
+
+
+def render(image_path):
+    """
+    Renders the annotated image of a frame. Images rendered eagerly have no sidecar and are
+    returned as they are.
+
+    Args:
+        image_path (str): Path of the saved image.
+
+    Returns:
+        np.array: The annotated image, None if the image does not exist.
+    """
+    image = cv2.imread(image_path)
+    if image is None or not os.path.exists(sidecar_path(image_path)):
+        return image
+    with open(sidecar_path(image_path)) as infile:
+        sidecar = json.load(infile)
+    visualisor = VisualizeResults(uuid_class_map=sidecar["uuid_class_map"])
+    return visualisor.draw(image=image, results={"result": sidecar["results"]}, object_count=sidecar["object_count"],
+                           roi=sidecar["roi"], direction=sidecar["direction"], source_width=sidecar["source_width"])
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    """
+    GET /render/<image name> returns the annotated JPEG of an image of save_dir.
+    """
+    save_dir = "."
+
+    def do_GET(self):
+        name = os.path.basename(unquote(self.path.split("?")[0]))
+        if not self.path.startswith("/render/") or not name:
+            self.send_error(404)
+            return
+        image = render(os.path.join(self.save_dir, name))
+        if image is None:
+            self.send_error(404, f"No image {name}")
+            return
+        body = cv2.imencode(".jpg", image)[1].tobytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(save_dir, host="127.0.0.1", port=8090):
+    """
+    Serves the rendered images of save_dir until interrupted.
+    """
+    handler = type("Handler", (RenderHandler,), {"save_dir": save_dir})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"[INFO] Rendering images of {save_dir} on http://{host}:{port}/render/<image name>")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Renders the annotated images deferred by the visualization policy.")
+    parser.add_argument("images", nargs="*", help="Images to render.")
+    parser.add_argument("-o", "--output-dir", help="Directory of the rendered images, next to the images by default.")
+    parser.add_argument("--serve", action="store_true", help="Serve the images of the save dir on /render/<image name>.")
+    parser.add_argument("--save-dir", default=os.getenv("SAVE_DIR", "."), help="Directory of the saved images, defaults to SAVE_DIR.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("RENDER_PORT", 8090)))
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.save_dir, host=args.host, port=args.port)
+        sys.exit(0)
+    for image_path in args.images:
+        image = render(image_path)
+        if image is None:
+            print(f"[ERROR] No image {image_path}")
+            continue
+        name, ext = os.path.splitext(os.path.basename(image_path))
+        output_path = os.path.join(args.output_dir or os.path.dirname(image_path), f"{name}_rendered{ext}")
+        cv2.imwrite(output_path, image)
+        print(f"[INFO] Rendered {output_path}")
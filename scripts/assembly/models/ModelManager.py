@@ -5,6 +5,8 @@ from assembly.models.detection.Frcnn_model import FasterRCNN
 from assembly.models.detection.Pointrend import PointRend
 from assembly.models.detection.Yolov8_model import YoloV8
 from assembly.models.classification.yolov8Classification import YoloV8Classification
+from assembly.models.detection.Yolov8_onnx import YoloV8Onnx
+from assembly.models.classification.yolov8ClassificationOnnx import YoloV8ClassificationOnnx
 import struct
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad, unpad
@@ -126,7 +128,8 @@ class modelManager:
         Args:
             model_dict (dict): The dictionary to populate with loaded models, indexed by UUIDs.
             active_models (list): A list of UUIDs specifying which models should be active.
-            device (str): The device where the models should be loaded ("cuda" or "cpu").
+            device (str): The device where the models should be loaded ("cuda" or "cpu"). Models with
+                          the "onnxruntime" backend in their model properties always run on the cpu.
 
         Returns:
             dict: The updated model_dict containing the loaded models.
@@ -185,7 +188,13 @@ class modelManager:
             elif model_key == 0: # YoloV8 Detection model
                 # print("yolo model params: ", os.path.join(self.MODELS_DIR, params["model_path"]),  params["model_properties"]["params"])["clases"])
                 classes_print = params["model_properties"]["params"]["classes"]
-                model_dict[uuid] = YoloV8(model_weights=os.path.join(self.MODELS_DIR, params["model_path"]), classes= classes_print, device=device) # Need to add rest of the params later
+                backend = params["model_properties"].get("backend", "ultralytics")
+                if backend == "onnxruntime":
+                    model_dict[uuid] = YoloV8Onnx(model_weights=os.path.join(self.MODELS_DIR, params["model_path"]), classes= classes_print, intra_op_threads=params["model_properties"].get("intraOpThreads"))
+                elif backend == "torch": # Direct nn.Module fast path
+                    model_dict[uuid] = YoloV8(model_weights=os.path.join(self.MODELS_DIR, params["model_path"]), classes= classes_print, device=device, fast_path=True)
+                else:
+                    model_dict[uuid] = YoloV8(model_weights=os.path.join(self.MODELS_DIR, params["model_path"]), classes= classes_print, device=device) # Need to add rest of the params later
                 print("------------------------------------")
                 print(f"[INFO] {datetime.datetime.now()} initial classes {classes_print}")
                 print("------------------------------------")
@@ -225,7 +234,10 @@ class modelManager:
 
 
             elif model_key == 3: # YoloV8 classifictaion model
-                model_dict[uuid] = YoloV8Classification(model_weights=os.path.join(self.MODELS_DIR, params["model_path"]), classes= params["model_properties"]["params"]["classes"], device=device)# Need to add rest of the params later
+                if params["model_properties"].get("backend", "ultralytics") == "onnxruntime":
+                    model_dict[uuid] = YoloV8ClassificationOnnx(model_weights=os.path.join(self.MODELS_DIR, params["model_path"]), classes= params["model_properties"]["params"]["classes"], intra_op_threads=params["model_properties"].get("intraOpThreads"))
+                else:
+                    model_dict[uuid] = YoloV8Classification(model_weights=os.path.join(self.MODELS_DIR, params["model_path"]), classes= params["model_properties"]["params"]["classes"], device=device)# Need to add rest of the params later
  
                 self.loggerObj.logger.info("[INFO] YoloV8-classification model loaded with uuid {uuid}")
                 print(f"[INFO] {datetime.datetime.now()} YoloV8-classifiction model loaded with uuid {uuid}")
@@ -72,6 +72,21 @@ class YoloV8Classification:
         pred = self.model.predict(device=self.device, source=input, imgsz=self.imgsz, verbose=False)
         return pred[0]
 
+    # Method to pass a list of images through the model in a single call
+    def forward_batch(self, images):
+        """
+        Runs a list of images through the whole pipeline as one batch.
+
+        Args:
+            images (list): The input images.
+
+        Returns:
+            list: Class name with highest confidence and its confidence score for each image.
+        """
+        inputs = [self.preProcess(image=image) for image in images]
+        preds = self.model.predict(device=self.device, source=inputs, imgsz=self.imgsz, verbose=False)
+        return [self.postProcess(pred_output=pred_output) for pred_output in preds]
+
     # Method to postprocess the result in proper format
     def postProcess(self, pred_output):
         """
@@ -110,11 +125,14 @@ class YoloV8Classification:
         Makes the class callable. Simplifies the process of running an image through the entire pipeline.
 
         Args:
-            image (array): The input image.
+            image (array or list): The input image, or a list of images to run as one batch.
 
         Returns:
-            tuple: Class name with highest confidence and its confidence score.
+            tuple: Class name with highest confidence and its confidence score,
+                   a list of them when a list of images is passed.
         """
+        if isinstance(image, list):
+            return self.forward_batch(images=image)
         input = self.preProcess(image=image)
         pred_output = self.forward(input=input)
         result = self.postProcess(pred_output=pred_output)
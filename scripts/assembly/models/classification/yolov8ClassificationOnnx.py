@@ -0,0 +1,150 @@
+import os, sys, cv2, datetime
+from PIL import Image
+import numpy as np
+from assembly.models.onnxUtils import export_onnx, create_session, to_blob
+
+
+# Yolo V8 classifictaion model run with ONNX Runtime
+class YoloV8ClassificationOnnx:
+    """
+    This class defines an interface for running classification inference with a YOLOv8 model
+    exported to ONNX and run with ONNX Runtime on the CPU. It returns the same outputs as
+    YoloV8Classification.
+
+    Attributes:
+        model_weights (str): Path to the model weights.
+        classes (list): List of classes the model can detect.
+        imgsz (tuple): Tuple representing the image size the model expects.
+        score_thresh (float): Confidence threshold for filtering model predictions.
+        session (object): The ONNX Runtime inference session.
+    """
+    def __init__(self, model_weights, classes, score_thresh=0.7, device="cpu", imgsz=(64, 64), intra_op_threads=None):
+        """
+        Initializes the YoloV8ClassificationOnnx class.
+
+        Args:
+            model_weights (str): Path to the .pt weights (exported to ONNX) or to the .onnx weights.
+            classes (list): List of class names the model can detect.
+            score_thresh (float): Confidence threshold.
+            device (str): Only "cpu" is supported by this backend.
+            imgsz (tuple): Image size (height, width) the model expects, as ultralytics takes it.
+            intra_op_threads (int): Number of threads used by ONNX Runtime inside an operator.
+        """
+        self.model_weights = model_weights # Model weights
+        self.classes = classes # Classes the model have to detect
+        self.imgsz = imgsz # Image size model expects
+        self.score_thresh = score_thresh # Confidence threshold
+        self.intra_op_threads = intra_op_threads
+        self.device = "cpu" # ONNX Runtime backend runs on the CPU
+        self.session = self.load_model() # Loading the onnx model
+        self.input_name = self.session.get_inputs()[0].name
+
+    # Method to load the onnx session
+    def load_model(self):
+        """
+        Exports the weights to ONNX if needed and loads them in an ONNX Runtime session.
+
+        Returns:
+            object: The ONNX Runtime inference session.
+        """
+        onnx_path = export_onnx(self.model_weights, task="classify", imgsz=self.imgsz)
+        return create_session(onnx_path, intra_op_threads=self.intra_op_threads)
+
+    # Method to resize the image to the model input size
+    def preProcess(self, image):
+        """
+        Resizes and crops the image as the ultralytics ClassificationPredictor does: the shortest
+        edge is resized to the model size (bilinear, with PIL) and the centre is cropped, so
+        non-square images are not stretched. A non-square imgsz is resized to exactly.
+
+        Args:
+            image (array): The input image.
+
+        Returns:
+            array: The image at the model input size.
+        """
+        height, width = self.imgsz[0], self.imgsz[1] # imgsz is (h, w) for ultralytics
+        image_h, image_w = image.shape[:2]
+        if height == width:
+            short, long = min(image_w, image_h), max(image_w, image_h)
+            new_short, new_long = height, int(height * long / short)
+            size = (new_short, new_long) if image_w <= image_h else (new_long, new_short)
+        else:
+            size = (width, height)
+        # The resize does not depend on the channel order, the BGR image is kept as it is
+        resized = np.asarray(Image.fromarray(image).resize(size, Image.BILINEAR))
+        top = int(round((resized.shape[0] - height) / 2.0))
+        left = int(round((resized.shape[1] - width) / 2.0))
+        return resized[top:top + height, left:left + width]
+
+    # Method to pass image through the model
+    def forward(self, input):
+        """
+        Runs the preprocessed image through the model's forward pass.
+
+        Args:
+            input (array): The preprocessed image.
+
+        Returns:
+            array: The class probabilities.
+        """
+        return self.session.run(None, {self.input_name: to_blob([input])})[0][0]
+
+    # Method to pass a list of images through the model in a single call
+    def forward_batch(self, images):
+        """
+        Runs a list of images through the whole pipeline as one batch.
+
+        Args:
+            images (list): The input images.
+
+        Returns:
+            list: Class name with highest confidence and its confidence score for each image.
+        """
+        blob = to_blob([self.preProcess(image=image) for image in images])
+        preds = self.session.run(None, {self.input_name: blob})[0]
+        return [self.postProcess(pred_output=pred_output) for pred_output in preds]
+
+    # Method to postprocess the result in proper format
+    def postProcess(self, pred_output):
+        """
+        Post-processes the model's raw output to get the final results.
+
+        Args:
+            pred_output (array): The class probabilities.
+
+        Returns:
+            tuple: Class name with highest confidence and its confidence score.
+        """
+        class_id = int(pred_output.argmax())
+        return self.classes[class_id], float(pred_output[class_id])
+
+    # Method to put model to specific device
+    def to(self, device="cpu"):
+        """
+        ONNX Runtime backend only runs on the CPU.
+
+        Args:
+            device (str): The device to move the model to.
+        """
+        if device != "cpu":
+            print(f"[INFO] {datetime.datetime.now()} onnxruntime backend runs on cpu, ignoring device {device}")
+
+    # Method to call for direct inferencing
+    def __call__(self, image):
+        """
+        Makes the class callable. Simplifies the process of running an image through the entire pipeline.
+
+        Args:
+            image (array or list): The input image, or a list of images to run as one batch.
+
+        Returns:
+            tuple: Class name with highest confidence and its confidence score,
+                   a list of them when a list of images is passed.
+        """
+        if isinstance(image, list):
+            return self.forward_batch(images=image)
+        input = self.preProcess(image=image)
+        pred_output = self.forward(input=input)
+        class_name, class_conf = self.postProcess(pred_output=pred_output)
+        return class_name, class_conf
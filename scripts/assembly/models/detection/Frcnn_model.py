@@ -115,6 +115,22 @@ class FasterRCNN:
             predictions = self.model([input])[0]
         return predictions
     
+    # Passing a list of images to the model as one batch
+    def forward_batch(self, images):
+        """
+        Runs a list of images through the whole pipeline as one batch.
+
+        Args:
+            images (list): The input images.
+
+        Returns:
+            list: Bounding boxes, class names, and confidence scores for each image.
+        """
+        inputs = [self.preProcess(image=image) for image in images]
+        with torch.no_grad():
+            predictions = self.model(inputs)
+        return [self.postProcess(pred_output=pred_output) for pred_output in predictions]
+    
     # Function to do the postprocessing and return output in proper format
     def postProcess(self, pred_output):
         """
@@ -153,11 +169,14 @@ class FasterRCNN:
         Makes the class callable for easier inference.
 
         Args:
-            image (array): The input image.
+            image (array or list): The input image, or a list of images to run as one batch.
 
         Returns:
-            tuple: Bounding boxes, class names, and confidence scores of detected objects.
+            tuple: Bounding boxes, class names, and confidence scores of detected objects,
+                   a list of them when a list of images is passed.
         """
+        if isinstance(image, list):
+            return self.forward_batch(images=image)
         input = self.preProcess(image=image)
         pred_output = self.forward(input=input)
         result = self.postProcess(pred_output=pred_output)
@@ -19,8 +19,9 @@ class PointRend:
         model (object): The pre-loaded Pointrend model.
         classes (list): The list of classes the model can detect.
         aug (object): The augmentation transform to be applied on input images.
+        return_masks (bool): Whether the mask head is run and the masks are returned.
     """
-    def __init__(self, model_weights, config_path, classes, device="cuda"):
+    def __init__(self, model_weights, config_path, classes, device="cuda", return_masks=False):
         """
         Initializes the FasterRCNN class.
 
@@ -30,12 +31,16 @@ class PointRend:
             classes (list): List of class names the model can detect.
             score_thresh (float): Confidence threshold for inference.
             device (str): Device to run inference ("cuda" or "cpu").
+            return_masks (bool): Opt-in for callers that need the masks. By default the mask head
+                                 (and its point refinement) is skipped as the pipeline only uses boxes.
         """
         print("inside PointRend ")
+        self.return_masks = return_masks
         # Preparing config
         self.cfg = self.editCfg(model_weights=model_weights, config_path=config_path, classes=classes)
         #... Loading model
         self.model = self.load_model()
+        self.setMaskHead(enabled=return_masks)
 
         print(f"check the type od model {type(self.model)}")
         # Putting model to GPU
@@ -90,6 +95,20 @@ class PointRend:
         
         return model
 
+    # Method to switch the mask head on or off
+    def setMaskHead(self, enabled):
+        """
+        Turns the mask head of the ROI heads on or off. When off the model only predicts boxes,
+        no mask is computed, pasted or moved to the cpu.
+
+        Args:
+            enabled (bool): Whether the masks are predicted and returned.
+        """
+        self.return_masks = enabled
+        roi_heads = getattr(self.model, "roi_heads", None)
+        if roi_heads is not None and hasattr(roi_heads, "mask_on"):
+            roi_heads.mask_on = enabled
+
     # Function that does the proper processing 
     # And converting to the proper format for model inferecing
     def preProcess(self, image):
@@ -129,6 +148,22 @@ class PointRend:
             predictions = self.model([input])[0]
         return predictions
     
+    # Passing a list of images to the model as one batch
+    def forward_batch(self, images):
+        """
+        Runs a list of images through the whole pipeline as one batch.
+
+        Args:
+            images (list): The input images.
+
+        Returns:
+            list: Bounding boxes, class names, and confidence scores for each image.
+        """
+        inputs = [self.preProcess(image=image) for image in images]
+        with torch.no_grad():
+            predictions = self.model(inputs)
+        return [self.postProcess(pred_output=pred_output) for pred_output in predictions]
+    
     # Function to do the postprocessing and return output in proper format
     def postProcess(self, pred_output):
         """
@@ -138,18 +173,19 @@ class PointRend:
             pred_output (dict): The model's raw output.
 
         Returns:
-            tuple: Bounding boxes, class names, and confidence scores of detected objects.
+            tuple: Bounding boxes, class names, and confidence scores of detected objects, followed by
+                   the masks (H, W, N) when return_masks is set.
         """
         pred_output = pred_output["instances"]
 
-        mask_array = pred_output.pred_masks.cpu().numpy()
-        mask_array = np.moveaxis(mask_array, 0, -1)
         classes = pred_output.pred_classes.cpu().numpy()
         boxes = pred_output.pred_boxes.tensor.cpu().numpy().astype("int")
         scores = pred_output.scores.cpu().numpy()
-        # Not returning the masks
         class_names = [self.classes[class_ind] for class_ind in classes]
-        
+
+        if self.return_masks:
+            mask_array = np.moveaxis(pred_output.pred_masks.cpu().numpy(), 0, -1)
+            return boxes, class_names, scores, mask_array
         return boxes, class_names, scores
     
     # Method to put model to specific device
@@ -171,11 +207,14 @@ class PointRend:
         Makes the class callable for easier inference.
 
         Args:
-            image (array): The input image.
+            image (array or list): The input image, or a list of images to run as one batch.
 
         Returns:
-            tuple: Bounding boxes, class names, and confidence scores of detected objects.
+            tuple: Bounding boxes, class names, and confidence scores of detected objects (and the masks
+                   when return_masks is set), a list of them when a list of images is passed.
         """
+        if isinstance(image, list):
+            return self.forward_batch(images=image)
         x = time.time()
         input = self.preProcess(image=image)
         print("\n \n \n pointrend taking time for preprocessing", time.time()-x , "\n \n \n " )
@@ -183,8 +222,7 @@ class PointRend:
         print("pointrend taking time for forward processing", time.time()-x)
         result = self.postProcess(pred_output=pred_output)
         print("pointrend taking time for poat processing", time.time()-x)
-        boxes, classses, scores = result
-        return boxes, classses, scores
+        return result
     
 
     def warm_up(self):
@@ -1,6 +1,11 @@
 import os, sys, cv2, torch, datetime
 import numpy as np
 from ultralytics import YOLO
+try:
+    from ultralytics.utils.nms import non_max_suppression
+except ImportError:  # Older ultralytics versions
+    from ultralytics.utils.ops import non_max_suppression
+from assembly.models.onnxUtils import letterbox
 
 
 class YoloV8:
@@ -15,9 +20,10 @@ class YoloV8:
         iou_thresh (float): Intersection-over-Union threshold for non-max suppression.
         device (str): Device to run the inference on ("cuda" or "cpu").
         model (object): The pre-loaded YOLOv8 model.
+        fast_path (bool): If True the underlying nn.Module is run directly instead of model.predict().
     """
 
-    def __init__(self, model_weights, classes, iou_thres=0.3, device="cuda", imgsz=(640, 640)):
+    def __init__(self, model_weights, classes, iou_thres=0.3, device="cuda", imgsz=(640, 640), fast_path=False):
         """
         Initializes the YoloV8 class.
 
@@ -28,6 +34,8 @@ class YoloV8:
             iou_thres (float): IOU threshold for non-max suppression.
             device (str): Device type ("cuda" or "cpu").
             imgsz (tuple): Image size (width, height) the model expects.
+            fast_path (bool): Letterbox the images into a reusable tensor and run the nn.Module directly,
+                              skipping the predictor setup and Results objects of model.predict().
         """
         self.model_weights = model_weights # Model weights
         self.classes = classes # Classes the model have to detect
@@ -35,12 +43,16 @@ class YoloV8:
         self.score_thresh = float(os.getenv("YOLOV8_THRESH")) # Confidence threshold
         self.iou_thresh = iou_thres # IOU threshold
         self.device = device # device to run the inference on 
+        self.fast_path = fast_path
+        self.input_buffer = None # Reusable uint8 tensor the images are letterboxed into (fast path)
         self.model = self.load_model() # Loading the yolo model
         print(f"\n\n\n ----------------------inside yolov8 custom class model.names: {self.model.names}\n\n\n")
         
         if model_weights.endswith('.pt'):
             self.to(device)
         # self.to(device)
+        if self.fast_path:
+            self.loadNetwork()
         self.warm_up()
 
 
@@ -54,6 +66,78 @@ class YoloV8:
         """
         return YOLO(self.model_weights, task='detect') 
 
+    # Method to get the underlying nn.Module for the fast path
+    def loadNetwork(self):
+        """
+        Fuses the underlying nn.Module of the model (as the predictor does) and keeps it in eval mode
+        on the device for the fast path.
+        """
+        self.torch_device = torch.device(self.device)
+        network = self.model.model
+        if hasattr(network, "fuse"):
+            network = network.fuse(verbose=False)
+        self.network = network.to(self.torch_device).eval()
+        self.stride = int(self.network.stride.max()) if hasattr(self.network, "stride") else 32
+
+    # Method to get the reusable input tensor
+    def getInputBuffer(self, batch_size, height, width):
+        """
+        Returns a uint8 (batch_size, height, width, 3) view of the reusable input tensor, it is only
+        reallocated when the batch gets bigger or the letterboxed size changes.
+
+        Args:
+            batch_size (int): Number of images.
+            height (int): Height of the letterboxed images.
+            width (int): Width of the letterboxed images.
+
+        Returns:
+            torch.Tensor: The input tensor on the cpu.
+        """
+        if self.input_buffer is None or self.input_buffer.shape[0] < batch_size or self.input_buffer.shape[1:3] != (height, width):
+            self.input_buffer = torch.empty((batch_size, height, width, 3), dtype=torch.uint8, pin_memory=self.torch_device.type == "cuda")
+        return self.input_buffer[:batch_size]
+
+    # Method to run the images directly through the nn.Module
+    def fastForward(self, images, iou_thresh=None):
+        """
+        Letterboxes the images into the reusable tensor, moves it to the device once, normalises it there,
+        runs the network under inference_mode and applies NMS. The boxes of all the images are scaled back
+        on the device and moved to the cpu in a single transfer.
+
+        Args:
+            images (list): The input images.
+
+        Returns:
+            list: (boxes, scores, classes) numpy arrays for each image.
+        """
+        iou_th = iou_thresh if iou_thresh is not None else self.iou_thresh
+        # Minimum rectangle padding when all the images have the same shape, as the predictor does
+        stride = self.stride if len({image.shape for image in images}) == 1 else None
+        letterboxed = [letterbox(image, new_shape=(self.imgsz[1], self.imgsz[0]), stride=stride) for image in images]
+        height, width = letterboxed[0][0].shape[:2]
+        input_buffer = self.getInputBuffer(len(images), height, width)
+        buffer_array = input_buffer.numpy()
+        for ind, (letterboxed_image, _, _) in enumerate(letterboxed):
+            buffer_array[ind] = letterboxed_image
+
+        with torch.inference_mode():
+            input = input_buffer.to(self.torch_device, non_blocking=True).permute(0, 3, 1, 2).flip(1).float().div_(255)
+            preds = self.network(input)
+            preds = preds[0] if isinstance(preds, (list, tuple)) else preds
+            dets = non_max_suppression(preds, self.score_thresh, iou_th)
+
+            # Scaling the boxes back to the input images: (left, top, gain_x, gain_y, width, height) per detection
+            counts = [len(det) for det in dets]
+            meta = torch.tensor([[left, top, gain[0], gain[1], image.shape[1], image.shape[0]] for image, (_, gain, (left, top)) in zip(images, letterboxed)], dtype=torch.float32, device=self.torch_device)
+            meta = meta.repeat_interleave(torch.tensor(counts, device=self.torch_device), dim=0)
+            det = torch.cat(dets)
+            boxes = det[:, :4]
+            boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - meta[:, [0]]) / meta[:, [2]]).clamp_(min=0).minimum(meta[:, [4]])
+            boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - meta[:, [1]]) / meta[:, [3]]).clamp_(min=0).minimum(meta[:, [5]])
+            det = det.cpu().numpy()
+
+        return [(part[:, :4], part[:, 4], part[:, 5]) for part in np.split(det, np.cumsum(counts)[:-1])]
+
     # Method to preprocess the image -- *nothing to to here
     def preProcess(self, image):
         """
@@ -78,24 +162,50 @@ class YoloV8:
         Returns:
             array: The model's raw output.
         """
+        if self.fast_path:
+            return self.fastForward([input], iou_thresh=iou_thresh)[0]
         iou_th = iou_thresh if iou_thresh is not None else self.iou_thresh
         pred = self.model.predict(device=self.device, source=input, imgsz=self.imgsz, conf=self.score_thresh, iou=iou_th,  verbose=False)
         return pred[0]
 
+    # Method to pass a list of images through the model in a single call
+    def forward_batch(self, images, iou_thresh=None):
+        """
+        Runs a list of images through the whole pipeline as one batch.
+
+        Args:
+            images (list): The input images.
+
+        Returns:
+            list: Bounding boxes, class names, and confidence scores for each image.
+        """
+        inputs = [self.preProcess(image=image) for image in images]
+        if self.fast_path:
+            return [self.postProcess(pred_output=pred_output) for pred_output in self.fastForward(inputs, iou_thresh=iou_thresh)]
+        iou_th = iou_thresh if iou_thresh is not None else self.iou_thresh
+        preds = self.model.predict(device=self.device, source=inputs, imgsz=self.imgsz, conf=self.score_thresh, iou=iou_th,  verbose=False)
+        return [self.postProcess(pred_output=pred_output) for pred_output in preds]
+
     # Method to postprocess the result in proper format
     def postProcess(self, pred_output):
         """
         Post-processes the model's raw output to get the final results.
 
         Args:
-            pred_output (array): The model's raw output.
+            pred_output (array): The model's raw output, (boxes, scores, classes) numpy arrays on the fast path.
 
         Returns:
             tuple: Bounding boxes, class names, and confidence scores of detected objects.
         """
-        pred_boxes_array = [np.array(i).astype(int).tolist() for i in pred_output.boxes.xyxy.cpu()]
-        scores = [float(i) for i in pred_output.boxes.conf.cpu()]
-        classes = [int(i) for i in pred_output.boxes.cls.cpu()]
+        if self.fast_path:
+            boxes, scores, classes = pred_output
+            pred_boxes_array = boxes.astype(int).tolist()
+            scores = scores.tolist()
+            classes = classes.astype(int).tolist()
+        else:
+            pred_boxes_array = [np.array(i).astype(int).tolist() for i in pred_output.boxes.xyxy.cpu()]
+            scores = [float(i) for i in pred_output.boxes.conf.cpu()]
+            classes = [int(i) for i in pred_output.boxes.cls.cpu()]
         print(f"\n\n\n ----------------------inside yolov8 custom class def postProcess(self, pred_output) classes: {classes}\n\n\n")
 
         # Getting class names
@@ -124,11 +234,14 @@ class YoloV8:
         Makes the class callable. Simplifies the process of running an image through the entire pipeline.
 
         Args:
-            image (array): The input image.
+            image (array or list): The input image, or a list of images to run as one batch.
 
         Returns:
-            tuple: Bounding boxes, class names, and confidence scores of detected objects.
+            tuple: Bounding boxes, class names, and confidence scores of detected objects,
+                   a list of them when a list of images is passed.
         """
+        if isinstance(image, list):
+            return self.forward_batch(images=image)
         input = self.preProcess(image=image)
         pred_output = self.forward(input=input)
         result = self.postProcess(pred_output=pred_output)
@@ -0,0 +1,191 @@
+import os, sys, cv2, datetime
+import numpy as np
+from assembly.models.onnxUtils import export_onnx, create_session, letterbox, to_blob, nms
+
+
+class YoloV8Onnx:
+    """
+    This class defines an interface for running object detection with a YOLOv8 model exported
+    to ONNX and run with ONNX Runtime on the CPU. It returns the same outputs as YoloV8.
+
+    Attributes:
+        model_weights (str): Path to the model weights.
+        classes (list): List of classes the model can detect.
+        imgsz (tuple): Tuple representing the image size the model expects.
+        score_thresh (float): Confidence threshold for filtering model predictions.
+        iou_thresh (float): Intersection-over-Union threshold for non-max suppression.
+        max_det (int): Maximum number of detections kept per image.
+        session (object): The ONNX Runtime inference session.
+    """
+
+    def __init__(self, model_weights, classes, iou_thres=0.3, device="cpu", imgsz=(640, 640), intra_op_threads=None, max_det=300):
+        """
+        Initializes the YoloV8Onnx class.
+
+        Args:
+            model_weights (str): Path to the .pt weights (exported to ONNX) or to the .onnx weights.
+            classes (list): List of class names the model can detect.
+            iou_thres (float): IOU threshold for non-max suppression.
+            device (str): Only "cpu" is supported by this backend.
+            imgsz (tuple): Image size (width, height) the model expects.
+            intra_op_threads (int): Number of threads used by ONNX Runtime inside an operator.
+            max_det (int): Maximum number of detections kept per image.
+        """
+        self.model_weights = model_weights # Model weights
+        self.classes = classes # Classes the model have to detect
+        self.imgsz = imgsz # Image size model expects
+        self.score_thresh = float(os.getenv("YOLOV8_THRESH")) # Confidence threshold
+        self.iou_thresh = iou_thres # IOU threshold
+        self.max_det = max_det
+        self.intra_op_threads = intra_op_threads
+        self.device = "cpu" # ONNX Runtime backend runs on the CPU
+        self.session = self.load_model() # Loading the onnx model
+        self.input_name = self.session.get_inputs()[0].name
+        self.warm_up()
+
+    # Method to load the onnx session
+    def load_model(self):
+        """
+        Exports the weights to ONNX if needed and loads them in an ONNX Runtime session.
+
+        Returns:
+            object: The ONNX Runtime inference session.
+        """
+        onnx_path = export_onnx(self.model_weights, task="detect", imgsz=self.imgsz)
+        return create_session(onnx_path, intra_op_threads=self.intra_op_threads)
+
+    # Method to letterbox the image to the model input size
+    def preProcess(self, image):
+        """
+        Letterboxes the image to the size the model expects.
+
+        Args:
+            image (array): The input image.
+
+        Returns:
+            dict: The letterboxed image with the information to scale the boxes back.
+        """
+        letterboxed, gain, pad = letterbox(image, new_shape=(self.imgsz[1], self.imgsz[0]))
+        return {"image": letterboxed, "gain": gain, "pad": pad, "shape": image.shape[:2]}
+
+    # Method to run the letterboxed images through the model as one batch
+    def runSession(self, inputs):
+        """
+        Runs a list of preprocessed inputs through the session in a single call.
+
+        Args:
+            inputs (list): Preprocessed inputs.
+
+        Returns:
+            list: The inputs with their raw prediction (4 + num_classes, num_anchors) added.
+        """
+        preds = self.session.run(None, {self.input_name: to_blob([input["image"] for input in inputs])})[0]
+        return [dict(input, pred=pred) for input, pred in zip(inputs, preds)]
+
+    # Method to pass image through the model
+    def forward(self, input):
+        """
+        Runs the preprocessed image through the model's forward pass.
+
+        Args:
+            input (dict): The preprocessed image.
+
+        Returns:
+            dict: The model's raw output.
+        """
+        return self.runSession([input])[0]
+
+    # Method to pass a list of images through the model in a single call
+    def forward_batch(self, images):
+        """
+        Runs a list of images through the whole pipeline as one batch.
+
+        Args:
+            images (list): The input images.
+
+        Returns:
+            list: Bounding boxes, class names, and confidence scores for each image.
+        """
+        preds = self.runSession([self.preProcess(image=image) for image in images])
+        return [self.postProcess(pred_output=pred_output) for pred_output in preds]
+
+    # Method to postprocess the result in proper format
+    def postProcess(self, pred_output):
+        """
+        Applies the confidence threshold and non max suppression on the model's raw output
+        and scales the boxes back to the input image.
+
+        Args:
+            pred_output (dict): The model's raw output.
+
+        Returns:
+            tuple: Bounding boxes, class names, and confidence scores of detected objects.
+        """
+        pred = pred_output["pred"].T # (num_anchors, 4 + num_classes)
+        class_ids = pred[:, 4:].argmax(axis=1)
+        scores = pred[np.arange(len(pred)), 4 + class_ids]
+        keep = scores >= self.score_thresh
+        pred, class_ids, scores = pred[keep], class_ids[keep], scores[keep]
+
+        # xywh to xyxy
+        boxes = np.empty((len(pred), 4), dtype=np.float32)
+        boxes[:, :2] = pred[:, :2] - pred[:, 2:4] / 2
+        boxes[:, 2:] = pred[:, :2] + pred[:, 2:4] / 2
+
+        # Classwise NMS, boxes of different classes are moved apart so they never overlap
+        keep = nms(boxes + class_ids[:, None] * 7680, scores, self.iou_thresh)[:self.max_det]
+        boxes, class_ids, scores = boxes[keep], class_ids[keep], scores[keep]
+
+        # Scaling the boxes back to the input image
+        left, top = pred_output["pad"]
+        height, width = pred_output["shape"]
+        gain_x, gain_y = pred_output["gain"]
+        boxes -= np.array([left, top, left, top], dtype=np.float32)
+        boxes /= np.array([gain_x, gain_y, gain_x, gain_y], dtype=np.float32)
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+
+        pred_boxes_array = boxes.astype(int).tolist()
+        class_names = [self.classes[class_ind] for class_ind in class_ids]
+        return pred_boxes_array, class_names, scores.astype(float).tolist()
+
+    # Method to put model to specific device
+    def to(self, device="cpu"):
+        """
+        ONNX Runtime backend only runs on the CPU.
+
+        Args:
+            device (str): The device to move the model to.
+        """
+        if device != "cpu":
+            print(f"[INFO] {datetime.datetime.now()} onnxruntime backend runs on cpu, ignoring device {device}")
+
+    # Method to call for direct inferencing
+    def __call__(self, image):
+        """
+        Makes the class callable. Simplifies the process of running an image through the entire pipeline.
+
+        Args:
+            image (array or list): The input image, or a list of images to run as one batch.
+
+        Returns:
+            tuple: Bounding boxes, class names, and confidence scores of detected objects,
+                   a list of them when a list of images is passed.
+        """
+        if isinstance(image, list):
+            return self.forward_batch(images=image)
+        input = self.preProcess(image=image)
+        pred_output = self.forward(input=input)
+        boxes, class_names, scores = self.postProcess(pred_output=pred_output)
+        return boxes, class_names, scores
+
+    def warm_up(self):
+        """
+        Warms up the model by passing a few dummy images through it.
+        """
+        print("Warming up the model...")
+        dummy_image = np.zeros((800, 800, 3), dtype=np.uint8)  # Create a black dummy image of size 800x800
+        for _ in range(2):  # Pass the dummy image twice
+            input = self.preProcess(image=dummy_image)
+            self.forward(input=input)
+        print("Model warm-up completed.")
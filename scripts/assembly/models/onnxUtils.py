@@ -0,0 +1,130 @@
+import os, cv2
+import numpy as np
+
+try:
+    import onnxruntime as ort
+except ImportError:  # Only needed for models using the onnxruntime backend
+    ort = None
+
+
+# Function to get the onnx weights of a yolo model, exporting them if needed
+def export_onnx(model_weights, task, imgsz):
+    """
+    Returns the path of the ONNX weights for the given ultralytics weights. The export
+    is done once and saved next to the weights, it is redone if the weights are newer.
+
+    Args:
+        model_weights (str): Path to the .pt or .onnx weights.
+        task (str): The ultralytics task of the model ("detect" or "classify").
+        imgsz (tuple): Image size the model expects.
+
+    Returns:
+        str: Path to the ONNX weights.
+    """
+    if model_weights.endswith(".onnx"):
+        return model_weights
+    onnx_path = os.path.splitext(model_weights)[0] + ".onnx"
+    if os.path.exists(onnx_path) and os.path.getmtime(onnx_path) >= os.path.getmtime(model_weights):
+        return onnx_path
+    from ultralytics import YOLO
+    print(f"Exporting {model_weights} to ONNX...")
+    return YOLO(model_weights, task=task).export(format="onnx", imgsz=list(imgsz), dynamic=True, simplify=False)
+
+
+# Function to create an onnxruntime session on the CPU
+def create_session(onnx_path, intra_op_threads=None):
+    """
+    Creates an ONNX Runtime inference session running on the CPU.
+
+    Args:
+        onnx_path (str): Path to the ONNX weights.
+        intra_op_threads (int): Number of threads used inside an operator, defaults to
+                                ONNX_INTRA_OP_THREADS env or 0 (onnxruntime default).
+
+    Returns:
+        onnxruntime.InferenceSession: The loaded session.
+    """
+    if ort is None:
+        raise Exception("[INFO] onnxruntime is not installed, it is needed for the onnxruntime backend")
+    intra_op_threads = int(intra_op_threads if intra_op_threads is not None else os.getenv("ONNX_INTRA_OP_THREADS", 0))
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = intra_op_threads
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(onnx_path, sess_options=options, providers=["CPUExecutionProvider"])
+
+
+# Function to resize an image keeping its aspect ratio and padding it to the given shape
+def letterbox(image, new_shape=(640, 640), color=114, stride=None):
+    """
+    Resizes and pads an image to new_shape the same way ultralytics does.
+
+    Args:
+        image (array): The input image (H, W, C).
+        new_shape (tuple): Shape (height, width) of the output image.
+        color (int): Value used for the padding.
+        stride (int): If given, only pads up to a multiple of stride (minimum rectangle)
+                      instead of up to new_shape.
+
+    Returns:
+        tuple: The letterboxed image, the (x, y) resize gains and the (left, top) padding.
+    """
+    height, width = image.shape[:2]
+    gain = min(new_shape[0] / height, new_shape[1] / width)
+    new_width, new_height = int(round(width * gain)), int(round(height * gain))
+    pad_w, pad_h = new_shape[1] - new_width, new_shape[0] - new_height
+    if stride:
+        pad_w, pad_h = pad_w % stride, pad_h % stride
+    pad_w, pad_h = pad_w / 2, pad_h / 2
+    if (new_width, new_height) != (width, height):
+        image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+    left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+    image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(color, color, color))
+    return image, (new_width / width, new_height / height), (left, top)
+
+
+# Function to stack BGR images into a normalised RGB NCHW blob
+def to_blob(images):
+    """
+    Converts a list of BGR uint8 images of the same shape to a float32 RGB NCHW blob in [0, 1].
+
+    Args:
+        images (list): The images (H, W, 3).
+
+    Returns:
+        array: The blob (N, 3, H, W).
+    """
+    stacked = np.stack(images)[..., ::-1].transpose(0, 3, 1, 2)
+    blob = np.empty(stacked.shape, dtype=np.float32)
+    np.multiply(stacked, 1 / 255, out=blob, casting="unsafe")
+    return blob
+
+
+# Function to apply non max suppression on boxes
+def nms(boxes, scores, iou_thresh):
+    """
+    Greedy non max suppression, the overlaps of the kept box with all the remaining boxes
+    are computed at once.
+
+    Args:
+        boxes (array): Boxes (N, 4) as x1, y1, x2, y2.
+        scores (array): Scores (N,).
+        iou_thresh (float): Boxes overlapping a kept box more than this are removed.
+
+    Returns:
+        array: Indices of the kept boxes, by decreasing score.
+    """
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size > 0:
+        ind = order[0]
+        keep.append(ind)
+        rest = order[1:]
+        inter_w = np.clip(np.minimum(x2[ind], x2[rest]) - np.maximum(x1[ind], x1[rest]), 0, None)
+        inter_h = np.clip(np.minimum(y2[ind], y2[rest]) - np.maximum(y1[ind], y1[rest]), 0, None)
+        inter = inter_w * inter_h
+        iou = inter / (areas[ind] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_thresh]
+    return np.array(keep, dtype=int)
@@ -1,10 +1,13 @@
 
+import os
 import numpy as np
 from collections import OrderedDict
+from scipy.optimize import linear_sum_assignment
+from scipy.spatial.distance import cdist
 
 
 class CentroidTracker:
-    def __init__(self, ROI=550, maxDistance=340, movement_direction='left2right'):
+    def __init__(self, ROI=550, maxDistance=340, movement_direction='left2right', matcher=None):
         self.maxDistance = maxDistance
         self.nextObjectID = 0
         self.objects = OrderedDict()
@@ -14,6 +17,16 @@ class CentroidTracker:
         self.roi = ROI
         print("coming to the centroidTracker", self.direction)
 
+        # "assignment" matches all the centroids of a frame at once with an optimal assignment,
+        # the objects are then kept in arrays (objectIDs, objectCentroids) instead of self.objects
+        self.matcher = matcher or os.getenv("CENTROID_MATCHER", "greedy")
+        self.axis = 1 if self.direction in ('down2up', 'up2down') else 0
+        # Sign of the sorting key and of the movement along the axis
+        self.sort_sign = -1 if self.direction in ('up2down', 'right2left') else 1
+        self.move_sign = -1 if self.direction in ('down2up', 'right2left') else 1
+        self.objectIDs = np.empty(0, dtype=int)
+        self.objectCentroids = np.empty((0, 2))
+
     def sorted_boxes(self, bboxes):
         if len(bboxes) == 0:
             return []
@@ -133,8 +146,92 @@ class CentroidTracker:
                 return False
         return True
 
+    def match_assignment(self, objectCentroids, inputCentroids):
+        """
+        Optimal matching of the objects to the input centroids. A pair can only match if the
+        input moved forward along the direction by less than maxDistance (as in match_check),
+        the assignment then minimises the total distance between the centroids.
+
+        Returns:
+            tuple: Matched object rows and input rows.
+        """
+        forward = self.move_sign * (inputCentroids[None, :, self.axis] - objectCentroids[:, None, self.axis])
+        valid = (forward > 0) & (forward < self.maxDistance)
+        if not valid.any():
+            return np.empty(0, dtype=int), np.empty(0, dtype=int)
+        distance = cdist(objectCentroids, inputCentroids)
+        # Invalid pairs cost more than any set of valid ones so the number of matches is maximal
+        cost = np.where(valid, distance, distance[valid].max() * (min(valid.shape) + 1) + 1)
+        rows, cols = linear_sum_assignment(cost)
+        keep = valid[rows, cols]
+        return rows[keep], cols[keep]
+
+    @staticmethod
+    def box_array(bboxes):
+        if len(bboxes) == 0:
+            return np.empty((0, 4))
+        return np.asarray(bboxes, dtype=float).reshape(len(bboxes), -1)
+
+    def run_assignment(self, dets):
+        """
+        Same flow as run with the state in arrays and the matching done by match_assignment.
+        """
+        boxes, prev_boxes = self.box_array(dets), self.box_array(self.prev_boxes)
+        # Nothing moved since the previous frame
+        same_status = len(boxes) == len(prev_boxes) and np.all(
+            np.abs(np.sort(prev_boxes[:, self.axis]) - np.sort(boxes[:, self.axis])) <= 10)
+        if same_status or len(dets) == 0:
+            self.objectIDs = np.empty(0, dtype=int)
+            self.objectCentroids = np.empty((0, 2))
+            self.bboxes = {}
+            self.prev_boxes = dets if same_status else []
+            return self.bboxes
+
+        inputCentroids = (boxes[:, :2] + boxes[:, 2:4]) / 2.0
+        order = np.argsort(self.sort_sign * inputCentroids[:, self.axis], kind="stable")
+        inputCentroids = inputCentroids[order]
+        first_frame = len(self.objectIDs) == 0
+
+        rows, cols = self.match_assignment(self.objectCentroids, inputCentroids)
+        matched = np.zeros(len(self.objectIDs), dtype=bool)
+        matched[rows] = True
+        centroids = self.objectCentroids.copy()
+        centroids[rows] = inputCentroids[cols]
+        inputRows = np.full(len(self.objectIDs), -1)
+        inputRows[rows] = cols
+
+        # Unmatched inputs before the ROI (in the direction of movement) become new objects
+        new = np.ones(len(inputCentroids), dtype=bool)
+        new[cols] = False
+        new &= self.move_sign * (inputCentroids[:, self.axis] - self.roi) < 50
+        newRows = np.flatnonzero(new)
+        newIDs = self.nextObjectID + np.arange(len(newRows))
+        self.nextObjectID += len(newRows)
+
+        self.objectIDs = np.concatenate((self.objectIDs[matched], newIDs))
+        self.objectCentroids = np.concatenate((centroids[matched], inputCentroids[newRows]))
+        inputRows = np.concatenate((inputRows[matched], newRows))
+        self.bboxes = {int(objectID): dets[order[row]] for objectID, row in zip(self.objectIDs, inputRows)}
+        if not first_frame:
+            self.prev_boxes = dets
+        return self.bboxes
+
+    def live_ids(self):
+        if self.matcher == "assignment":
+            return set(self.objectIDs.tolist())
+        return set(self.objects.keys())
+
+    def memory_stats(self):
+        if self.matcher == "assignment":
+            nbytes = self.objectIDs.nbytes + self.objectCentroids.nbytes
+        else:
+            nbytes = np.asarray(list(self.objects.values())).nbytes
+        return {"tracks": len(self.live_ids()), "stored_boxes": len(self.bboxes), "bytes": nbytes, "bbox_entries": len(self.bboxes)}
+
     # Change to dets : [[x1, y1, x2, y2], [x1, y1, x2, y2], ...]
     def run(self, dets, confs, classes):
+        if self.matcher == "assignment":
+            return self.run_assignment(dets)
         same_status = self.check_same(input_boxes=dets)
         print("checking satus" , same_status)
         if same_status:
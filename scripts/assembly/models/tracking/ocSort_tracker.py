@@ -9,7 +9,10 @@ class ocTracker:
         self.direction = movement_direction
         self.ROI = ROI
 
-        self.tracker = OCSort(det_thresh=self.det_thresh, movement_direction=self.direction, ROI=ROI)
+        # "array" keeps the tracks in contiguous arrays and updates them in batch
+        self.track_store = os.getenv("OCSORT_TRACK_STORE", "list")
+
+        self.tracker = OCSort(det_thresh=self.det_thresh, movement_direction=self.direction, ROI=ROI, track_store=self.track_store)
 
     
     def process_output(self, tracker_output):
@@ -26,4 +29,19 @@ class ocTracker:
 
         res = self.process_output(tracker_output=tracker_res)
 
-        return res
\ No newline at end of file
+        return res
+
+    def coast(self):
+        self.tracker.coast()
+
+    def peek(self, steps=1):
+        return self.process_output(tracker_output=self.tracker.peek(steps))
+
+    def tentative_tracks(self):
+        return self.tracker.tentative_tracks()
+
+    def live_ids(self):
+        return self.tracker.live_ids()
+
+    def memory_stats(self):
+        return self.tracker.memory_stats()
@@ -1,6 +1,77 @@
 import os
+import threading
 import numpy as np
 
+# The assignment solver is picked once, lap is faster when it is installed
+try:
+    import lap
+except ImportError:
+    lap = None
+    from scipy.optimize import linear_sum_assignment
+
+# Scratch memory of the cost functions, one per thread as the trackers may run in threads
+_local = threading.local()
+
+
+def _buffers(shape, count):
+    """
+    Returns count scratch arrays of the given (n, m) shape. The same memory is reused by every
+    call of the thread, it only grows when a bigger matrix is needed.
+    """
+    size = count * shape[0] * shape[1]
+    buffer = getattr(_local, "buffer", None)
+    if buffer is None or buffer.size < size:
+        buffer = _local.buffer = np.empty(size)
+    return buffer[:size].reshape((count,) + shape)
+
+
+def _intersection(bboxes1, bboxes2, ws):
+    """
+    Intersection and union areas of every pair of bboxes in the form [x1,y1,x2,y2], written to
+    the scratch arrays ws (4, n, m). Returns the (wh, union) views.
+    """
+    w, h, wh, union = ws[0], ws[1], ws[2], ws[3]
+    np.minimum(bboxes1[..., 2], bboxes2[..., 2], out=w)
+    np.subtract(w, np.maximum(bboxes1[..., 0], bboxes2[..., 0], out=wh), out=w)
+    np.maximum(w, 0., out=w)
+    np.minimum(bboxes1[..., 3], bboxes2[..., 3], out=h)
+    np.subtract(h, np.maximum(bboxes1[..., 1], bboxes2[..., 1], out=wh), out=h)
+    np.maximum(h, 0., out=h)
+    np.multiply(w, h, out=wh)
+    np.add((bboxes1[..., 2] - bboxes1[..., 0]) * (bboxes1[..., 3] - bboxes1[..., 1]),
+        (bboxes2[..., 2] - bboxes2[..., 0]) * (bboxes2[..., 3] - bboxes2[..., 1]), out=union)
+    np.subtract(union, wh, out=union)
+    return wh, union
+
+
+def _squared_extent(min1, min2, max1, max2, out, scratch):
+    """
+    Squared extent (max(max1, max2) - min(min1, min2))**2 of the enclosing box along one axis.
+    """
+    np.maximum(max1, max2, out=out)
+    np.subtract(out, np.minimum(min1, min2, out=scratch), out=out)
+    return np.square(out, out=out)
+
+
+def _center_distance(bboxes1, bboxes2, out, scratch):
+    """
+    Squared distance between the centres of every pair of bboxes.
+    """
+    np.subtract((bboxes1[..., 0] + bboxes1[..., 2]) / 2.0, (bboxes2[..., 0] + bboxes2[..., 2]) / 2.0, out=out)
+    np.square(out, out=out)
+    np.subtract((bboxes1[..., 1] + bboxes1[..., 3]) / 2.0, (bboxes2[..., 1] + bboxes2[..., 3]) / 2.0, out=scratch)
+    np.square(scratch, out=scratch)
+    return np.add(out, scratch, out=out)
+
+
+def _outer_diag(bboxes1, bboxes2, out, scratch1, scratch2):
+    """
+    Squared diagonal of the box enclosing every pair of bboxes.
+    """
+    _squared_extent(bboxes1[..., 0], bboxes2[..., 0], bboxes1[..., 2], bboxes2[..., 2], out, scratch2)
+    _squared_extent(bboxes1[..., 1], bboxes2[..., 1], bboxes1[..., 3], bboxes2[..., 3], scratch1, scratch2)
+    return np.add(out, scratch1, out=out)
+
 
 def iou_batch(bboxes1, bboxes2):
     """
@@ -8,17 +79,9 @@ def iou_batch(bboxes1, bboxes2):
     """
     bboxes2 = np.expand_dims(bboxes2, 0)
     bboxes1 = np.expand_dims(bboxes1, 1)
-    
-    xx1 = np.maximum(bboxes1[..., 0], bboxes2[..., 0])
-    yy1 = np.maximum(bboxes1[..., 1], bboxes2[..., 1])
-    xx2 = np.minimum(bboxes1[..., 2], bboxes2[..., 2])
-    yy2 = np.minimum(bboxes1[..., 3], bboxes2[..., 3])
-    w = np.maximum(0., xx2 - xx1)
-    h = np.maximum(0., yy2 - yy1)
-    wh = w * h
-    o = wh / ((bboxes1[..., 2] - bboxes1[..., 0]) * (bboxes1[..., 3] - bboxes1[..., 1])                                      
-        + (bboxes2[..., 2] - bboxes2[..., 0]) * (bboxes2[..., 3] - bboxes2[..., 1]) - wh)                                              
-    return(o)  
+    ws = _buffers((bboxes1.shape[0], bboxes2.shape[1]), 4)
+    wh, union = _intersection(bboxes1, bboxes2, ws)
+    return wh / union
 
 
 def giou_batch(bboxes1, bboxes2):
@@ -31,27 +94,20 @@ def giou_batch(bboxes1, bboxes2):
     # ensure predict's bbox form
     bboxes2 = np.expand_dims(bboxes2, 0)
     bboxes1 = np.expand_dims(bboxes1, 1)
-
-    xx1 = np.maximum(bboxes1[..., 0], bboxes2[..., 0])
-    yy1 = np.maximum(bboxes1[..., 1], bboxes2[..., 1])
-    xx2 = np.minimum(bboxes1[..., 2], bboxes2[..., 2])
-    yy2 = np.minimum(bboxes1[..., 3], bboxes2[..., 3])
-    w = np.maximum(0., xx2 - xx1)
-    h = np.maximum(0., yy2 - yy1)
-    wh = w * h
-    iou = wh / ((bboxes1[..., 2] - bboxes1[..., 0]) * (bboxes1[..., 3] - bboxes1[..., 1])                                      
-        + (bboxes2[..., 2] - bboxes2[..., 0]) * (bboxes2[..., 3] - bboxes2[..., 1]) - wh)  
-
-    xxc1 = np.minimum(bboxes1[..., 0], bboxes2[..., 0])
-    yyc1 = np.minimum(bboxes1[..., 1], bboxes2[..., 1])
-    xxc2 = np.maximum(bboxes1[..., 2], bboxes2[..., 2])
-    yyc2 = np.maximum(bboxes1[..., 3], bboxes2[..., 3])
-    wc = xxc2 - xxc1 
-    hc = yyc2 - yyc1 
+    ws = _buffers((bboxes1.shape[0], bboxes2.shape[1]), 4)
+    wh, union = _intersection(bboxes1, bboxes2, ws)
+    giou = wh / union
+
+    wc, hc = ws[0], ws[1]
+    np.maximum(bboxes1[..., 2], bboxes2[..., 2], out=wc)
+    np.subtract(wc, np.minimum(bboxes1[..., 0], bboxes2[..., 0], out=ws[3]), out=wc)
+    np.maximum(bboxes1[..., 3], bboxes2[..., 3], out=hc)
+    np.subtract(hc, np.minimum(bboxes1[..., 1], bboxes2[..., 1], out=ws[3]), out=hc)
     assert((wc > 0).all() and (hc > 0).all())
-    area_enclose = wc * hc 
-    giou = iou - (area_enclose - wh) / area_enclose
-    giou = (giou + 1.)/2.0 # resize from (-1,1) to (0,1)
+    area_enclose = np.multiply(wc, hc, out=wc)
+    giou -= np.divide(np.subtract(area_enclose, wh, out=hc), area_enclose, out=hc)
+    giou += 1.
+    giou /= 2.0 # resize from (-1,1) to (0,1)
     return giou
 
 
@@ -65,34 +121,16 @@ def diou_batch(bboxes1, bboxes2):
     # ensure predict's bbox form
     bboxes2 = np.expand_dims(bboxes2, 0)
     bboxes1 = np.expand_dims(bboxes1, 1)
+    ws = _buffers((bboxes1.shape[0], bboxes2.shape[1]), 4)
+    wh, union = _intersection(bboxes1, bboxes2, ws)
+    diou = wh / union
 
-    # calculate the intersection box
-    xx1 = np.maximum(bboxes1[..., 0], bboxes2[..., 0])
-    yy1 = np.maximum(bboxes1[..., 1], bboxes2[..., 1])
-    xx2 = np.minimum(bboxes1[..., 2], bboxes2[..., 2])
-    yy2 = np.minimum(bboxes1[..., 3], bboxes2[..., 3])
-    w = np.maximum(0., xx2 - xx1)
-    h = np.maximum(0., yy2 - yy1)
-    wh = w * h
-    iou = wh / ((bboxes1[..., 2] - bboxes1[..., 0]) * (bboxes1[..., 3] - bboxes1[..., 1])                                      
-        + (bboxes2[..., 2] - bboxes2[..., 0]) * (bboxes2[..., 3] - bboxes2[..., 1]) - wh) 
-
-    centerx1 = (bboxes1[..., 0] + bboxes1[..., 2]) / 2.0
-    centery1 = (bboxes1[..., 1] + bboxes1[..., 3]) / 2.0
-    centerx2 = (bboxes2[..., 0] + bboxes2[..., 2]) / 2.0
-    centery2 = (bboxes2[..., 1] + bboxes2[..., 3]) / 2.0
-
-    inner_diag = (centerx1 - centerx2) ** 2 + (centery1 - centery2) ** 2
-
-    xxc1 = np.minimum(bboxes1[..., 0], bboxes2[..., 0])
-    yyc1 = np.minimum(bboxes1[..., 1], bboxes2[..., 1])
-    xxc2 = np.maximum(bboxes1[..., 2], bboxes2[..., 2])
-    yyc2 = np.maximum(bboxes1[..., 3], bboxes2[..., 3])
-
-    outer_diag = (xxc2 - xxc1) ** 2 + (yyc2 - yyc1) ** 2
-    diou = iou - inner_diag / outer_diag
-
-    return (diou + 1) / 2.0 # resize from (-1,1) to (0,1)
+    inner_diag = _center_distance(bboxes1, bboxes2, ws[0], ws[1])
+    outer_diag = _outer_diag(bboxes1, bboxes2, ws[1], ws[2], ws[3])
+    diou -= np.divide(inner_diag, outer_diag, out=inner_diag)
+    diou += 1
+    diou /= 2.0 # resize from (-1,1) to (0,1)
+    return diou
 
 def ciou_batch(bboxes1, bboxes2):
     """
@@ -104,32 +142,14 @@ def ciou_batch(bboxes1, bboxes2):
     # ensure predict's bbox form
     bboxes2 = np.expand_dims(bboxes2, 0)
     bboxes1 = np.expand_dims(bboxes1, 1)
+    ws = _buffers((bboxes1.shape[0], bboxes2.shape[1]), 4)
+    wh, union = _intersection(bboxes1, bboxes2, ws)
+    ciou = wh / union
 
-    # calculate the intersection box
-    xx1 = np.maximum(bboxes1[..., 0], bboxes2[..., 0])
-    yy1 = np.maximum(bboxes1[..., 1], bboxes2[..., 1])
-    xx2 = np.minimum(bboxes1[..., 2], bboxes2[..., 2])
-    yy2 = np.minimum(bboxes1[..., 3], bboxes2[..., 3])
-    w = np.maximum(0., xx2 - xx1)
-    h = np.maximum(0., yy2 - yy1)
-    wh = w * h
-    iou = wh / ((bboxes1[..., 2] - bboxes1[..., 0]) * (bboxes1[..., 3] - bboxes1[..., 1])                                      
-        + (bboxes2[..., 2] - bboxes2[..., 0]) * (bboxes2[..., 3] - bboxes2[..., 1]) - wh) 
+    inner_diag = _center_distance(bboxes1, bboxes2, ws[0], ws[1])
+    outer_diag = _outer_diag(bboxes1, bboxes2, ws[1], ws[2], ws[3])
+    np.divide(inner_diag, outer_diag, out=inner_diag)
 
-    centerx1 = (bboxes1[..., 0] + bboxes1[..., 2]) / 2.0
-    centery1 = (bboxes1[..., 1] + bboxes1[..., 3]) / 2.0
-    centerx2 = (bboxes2[..., 0] + bboxes2[..., 2]) / 2.0
-    centery2 = (bboxes2[..., 1] + bboxes2[..., 3]) / 2.0
-
-    inner_diag = (centerx1 - centerx2) ** 2 + (centery1 - centery2) ** 2
-
-    xxc1 = np.minimum(bboxes1[..., 0], bboxes2[..., 0])
-    yyc1 = np.minimum(bboxes1[..., 1], bboxes2[..., 1])
-    xxc2 = np.maximum(bboxes1[..., 2], bboxes2[..., 2])
-    yyc2 = np.maximum(bboxes1[..., 3], bboxes2[..., 3])
-
-    outer_diag = (xxc2 - xxc1) ** 2 + (yyc2 - yyc1) ** 2
-    
     w1 = bboxes1[..., 2] - bboxes1[..., 0]
     h1 = bboxes1[..., 3] - bboxes1[..., 1]
     w2 = bboxes2[..., 2] - bboxes2[..., 0]
@@ -138,13 +158,17 @@ def ciou_batch(bboxes1, bboxes2):
     # prevent dividing over zero. add one pixel shift
     h2 = h2 + 1.
     h1 = h1 + 1.
-    arctan = np.arctan(w2/h2) - np.arctan(w1/h1)
-    v = (4 / (np.pi ** 2)) * (arctan ** 2)
-    S = 1 - iou 
-    alpha = v / (S+v)
-    ciou = iou - inner_diag / outer_diag - alpha * v
-    
-    return (ciou + 1) / 2.0 # resize from (-1,1) to (0,1)
+    v = np.subtract(np.arctan(w2/h2), np.arctan(w1/h1), out=ws[1])
+    np.square(v, out=v)
+    np.multiply(4 / (np.pi ** 2), v, out=v)
+    alpha = np.subtract(1, ciou, out=ws[2])
+    np.add(alpha, v, out=alpha)
+    np.divide(v, alpha, out=alpha)
+    ciou -= inner_diag
+    ciou -= np.multiply(alpha, v, out=alpha)
+    ciou += 1
+    ciou /= 2.0 # resize from (-1,1) to (0,1)
+    return ciou
 
 
 def ct_dist(bboxes1, bboxes2):
@@ -185,14 +209,62 @@ def speed_direction_batch(dets, tracks):
 
 
 def linear_assignment(cost_matrix):
-    try:
-        import lap
+    if lap is not None:
         _, x, y = lap.lapjv(cost_matrix, extend_cost=True)
-        return np.array([[y[i],i] for i in x if i >= 0]) #
-    except ImportError:
-        from scipy.optimize import linear_sum_assignment
-        x, y = linear_sum_assignment(cost_matrix)
-        return np.array(list(zip(x, y)))
+        x = x[x >= 0]
+        return np.stack((y[x], x), axis=1)
+    x, y = linear_sum_assignment(cost_matrix)
+    return np.stack((x, y), axis=1)
+
+
+def match_threshold(iou_matrix, iou_threshold, cost_matrix):
+    """
+    Matches directly when every row and column has at most one pair above the threshold,
+    otherwise solves the assignment of the cost matrix (a callable so it is only built when needed).
+    """
+    if min(iou_matrix.shape) > 0:
+        a = iou_matrix > iou_threshold
+        if a.sum(1).max() == 1 and a.sum(0).max() == 1:
+            return np.stack(np.where(a), axis=1)
+        return linear_assignment(cost_matrix())
+    return np.empty((0, 2), dtype=int)
+
+
+def split_matches(matched_indices, iou_matrix, iou_threshold):
+    """
+    Splits the assignment into the matches and the unmatched detections and trackers. The
+    unassigned indices come first in order, then the ones of the matches with a low IOU.
+    """
+    num_dets, num_trks = iou_matrix.shape
+    unmatched_detections = np.ones(num_dets, dtype=bool)
+    unmatched_detections[matched_indices[:, 0]] = False
+    unmatched_trackers = np.ones(num_trks, dtype=bool)
+    unmatched_trackers[matched_indices[:, 1]] = False
+
+    #filter out matched with low IOU
+    low = iou_matrix[matched_indices[:, 0], matched_indices[:, 1]] < iou_threshold
+    unmatched_detections = np.concatenate((np.flatnonzero(unmatched_detections), matched_indices[low, 0]))
+    unmatched_trackers = np.concatenate((np.flatnonzero(unmatched_trackers), matched_indices[low, 1]))
+    return matched_indices[~low], unmatched_detections, unmatched_trackers
+
+
+def angle_diff_cost(detections, velocities, previous_obs, vdc_weight):
+    """
+        Cost from the velocity direction consistency (num_det x num_track)
+    """
+    Y, X = speed_direction_batch(detections, previous_obs)
+    diff_angle_cos = np.multiply(velocities[:, 1:2], X, out=X)
+    diff_angle_cos += np.multiply(velocities[:, 0:1], Y, out=Y)
+    np.clip(diff_angle_cos, -1, 1, out=diff_angle_cos)
+    diff_angle = np.arccos(diff_angle_cos, out=diff_angle_cos)
+    np.abs(diff_angle, out=diff_angle)
+    np.subtract(np.pi /2.0, diff_angle, out=diff_angle)
+    diff_angle /= np.pi
+
+    valid_mask = np.where(previous_obs[:, 4] < 0, 0., 1.)
+    diff_angle *= valid_mask[:, np.newaxis]
+    diff_angle *= vdc_weight
+    return diff_angle.T * detections[:, -1][:, np.newaxis]
 
 
 def associate_detections_to_trackers(detections,trackers,iou_threshold = 0.3):
@@ -204,98 +276,19 @@ def associate_detections_to_trackers(detections,trackers,iou_threshold = 0.3):
         return np.empty((0,2),dtype=int), np.arange(len(detections)), np.empty((0,5),dtype=int)
 
     iou_matrix = iou_batch(detections, trackers)
-
-    if min(iou_matrix.shape) > 0:
-        a = (iou_matrix > iou_threshold).astype(np.int32)
-        if a.sum(1).max() == 1 and a.sum(0).max() == 1:
-            matched_indices = np.stack(np.where(a), axis=1)
-        else:
-            matched_indices = linear_assignment(-iou_matrix)
-    else:
-        matched_indices = np.empty(shape=(0,2))
-
-    unmatched_detections = []
-    for d, det in enumerate(detections):
-        if(d not in matched_indices[:,0]):
-            unmatched_detections.append(d)
-    unmatched_trackers = []
-    for t, trk in enumerate(trackers):
-        if(t not in matched_indices[:,1]):
-            unmatched_trackers.append(t)
-
-    #filter out matched with low IOU
-    matches = []
-    for m in matched_indices:
-        if(iou_matrix[m[0], m[1]]<iou_threshold):
-            unmatched_detections.append(m[0])
-            unmatched_trackers.append(m[1])
-        else:
-            matches.append(m.reshape(1,2))
-    if(len(matches)==0):
-        matches = np.empty((0,2),dtype=int)
-    else:
-        matches = np.concatenate(matches,axis=0)
-
-    return matches, np.array(unmatched_detections), np.array(unmatched_trackers)
+    matched_indices = match_threshold(iou_matrix, iou_threshold, lambda: -iou_matrix)
+    return split_matches(matched_indices, iou_matrix, iou_threshold)
 
 
 def associate(detections, trackers, iou_threshold, velocities, previous_obs, vdc_weight):    
     if(len(trackers)==0):
         return np.empty((0,2),dtype=int), np.arange(len(detections)), np.empty((0,5),dtype=int)
 
-    Y, X = speed_direction_batch(detections, previous_obs)
-    inertia_Y, inertia_X = velocities[:,0], velocities[:,1]
-    inertia_Y = np.repeat(inertia_Y[:, np.newaxis], Y.shape[1], axis=1)
-    inertia_X = np.repeat(inertia_X[:, np.newaxis], X.shape[1], axis=1)
-    diff_angle_cos = inertia_X * X + inertia_Y * Y
-    diff_angle_cos = np.clip(diff_angle_cos, a_min=-1, a_max=1)
-    diff_angle = np.arccos(diff_angle_cos)
-    diff_angle = (np.pi /2.0 - np.abs(diff_angle)) / np.pi
-
-    valid_mask = np.ones(previous_obs.shape[0])
-    valid_mask[np.where(previous_obs[:,4]<0)] = 0
-    
     iou_matrix = iou_batch(detections, trackers)
-    scores = np.repeat(detections[:,-1][:, np.newaxis], trackers.shape[0], axis=1)
     # iou_matrix = iou_matrix * scores # a trick sometiems works, we don't encourage this
-    valid_mask = np.repeat(valid_mask[:, np.newaxis], X.shape[1], axis=1)
-
-    angle_diff_cost = (valid_mask * diff_angle) * vdc_weight
-    angle_diff_cost = angle_diff_cost.T
-    angle_diff_cost = angle_diff_cost * scores
-
-    if min(iou_matrix.shape) > 0:
-        a = (iou_matrix > iou_threshold).astype(np.int32)
-        if a.sum(1).max() == 1 and a.sum(0).max() == 1:
-            matched_indices = np.stack(np.where(a), axis=1)
-        else:
-            matched_indices = linear_assignment(-(iou_matrix+angle_diff_cost))
-    else:
-        matched_indices = np.empty(shape=(0,2))
-
-    unmatched_detections = []
-    for d, det in enumerate(detections):
-        if(d not in matched_indices[:,0]):
-            unmatched_detections.append(d)
-    unmatched_trackers = []
-    for t, trk in enumerate(trackers):
-        if(t not in matched_indices[:,1]):
-            unmatched_trackers.append(t)
-
-    # filter out matched with low IOU
-    matches = []
-    for m in matched_indices:
-        if(iou_matrix[m[0], m[1]]<iou_threshold):
-            unmatched_detections.append(m[0])
-            unmatched_trackers.append(m[1])
-        else:
-            matches.append(m.reshape(1,2))
-    if(len(matches)==0):
-        matches = np.empty((0,2),dtype=int)
-    else:
-        matches = np.concatenate(matches,axis=0)
-
-    return matches, np.array(unmatched_detections), np.array(unmatched_trackers)
+    matched_indices = match_threshold(iou_matrix, iou_threshold,
+        lambda: -(iou_matrix + angle_diff_cost(detections, velocities, previous_obs, vdc_weight)))
+    return split_matches(matched_indices, iou_matrix, iou_threshold)
 
 
 def associate_kitti(detections, trackers, det_cates, iou_threshold, 
@@ -303,75 +296,17 @@ def associate_kitti(detections, trackers, det_cates, iou_threshold,
     if(len(trackers)==0):
         return np.empty((0,2),dtype=int), np.arange(len(detections)), np.empty((0,5),dtype=int)
 
-    """
-        Cost from the velocity direction consistency
-    """
-    Y, X = speed_direction_batch(detections, previous_obs)
-    inertia_Y, inertia_X = velocities[:,0], velocities[:,1]
-    inertia_Y = np.repeat(inertia_Y[:, np.newaxis], Y.shape[1], axis=1)
-    inertia_X = np.repeat(inertia_X[:, np.newaxis], X.shape[1], axis=1)
-    diff_angle_cos = inertia_X * X + inertia_Y * Y
-    diff_angle_cos = np.clip(diff_angle_cos, a_min=-1, a_max=1)
-    diff_angle = np.arccos(diff_angle_cos)
-    diff_angle = (np.pi /2.0 - np.abs(diff_angle)) / np.pi
-
-    valid_mask = np.ones(previous_obs.shape[0])
-    valid_mask[np.where(previous_obs[:,4]<0)]=0  
-    valid_mask = np.repeat(valid_mask[:, np.newaxis], X.shape[1], axis=1)
-
-    scores = np.repeat(detections[:,-1][:, np.newaxis], trackers.shape[0], axis=1)
-    angle_diff_cost = (valid_mask * diff_angle) * vdc_weight
-    angle_diff_cost = angle_diff_cost.T
-    angle_diff_cost = angle_diff_cost * scores
-
     """
         Cost from IoU
     """
     iou_matrix = iou_batch(detections, trackers)
-    
 
-    """
-        With multiple categories, generate the cost for catgory mismatch
-    """
-    num_dets = detections.shape[0]
-    num_trk = trackers.shape[0]
-    cate_matrix = np.zeros((num_dets, num_trk))
-    for i in range(num_dets):
-            for j in range(num_trk):
-                if det_cates[i] != trackers[j, 4]:
-                        cate_matrix[i][j] = -1e6
-    
-    cost_matrix = - iou_matrix -angle_diff_cost - cate_matrix
+    def cost_matrix():
+        """
+            With multiple categories, generate the cost for catgory mismatch
+        """
+        cate_matrix = np.where(np.asarray(det_cates)[:, np.newaxis] != trackers[np.newaxis, :, 4], -1e6, 0.)
+        return - iou_matrix - angle_diff_cost(detections, velocities, previous_obs, vdc_weight) - cate_matrix
 
-    if min(iou_matrix.shape) > 0:
-        a = (iou_matrix > iou_threshold).astype(np.int32)
-        if a.sum(1).max() == 1 and a.sum(0).max() == 1:
-            matched_indices = np.stack(np.where(a), axis=1)
-        else:
-            matched_indices = linear_assignment(cost_matrix)
-    else:
-        matched_indices = np.empty(shape=(0,2))
-
-    unmatched_detections = []
-    for d, det in enumerate(detections):
-        if(d not in matched_indices[:,0]):
-            unmatched_detections.append(d)
-    unmatched_trackers = []
-    for t, trk in enumerate(trackers):
-        if(t not in matched_indices[:,1]):
-            unmatched_trackers.append(t)
-
-    #filter out matched with low IOU
-    matches = []
-    for m in matched_indices:
-        if(iou_matrix[m[0], m[1]]<iou_threshold):
-            unmatched_detections.append(m[0])
-            unmatched_trackers.append(m[1])
-        else:
-            matches.append(m.reshape(1,2))
-    if(len(matches)==0):
-        matches = np.empty((0,2),dtype=int)
-    else:
-        matches = np.concatenate(matches,axis=0)
-
-    return matches, np.array(unmatched_detections), np.array(unmatched_trackers)
\ No newline at end of file
+    matched_indices = match_threshold(iou_matrix, iou_threshold, cost_matrix)
+    return split_matches(matched_indices, iou_matrix, iou_threshold)
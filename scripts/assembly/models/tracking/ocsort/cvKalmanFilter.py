@@ -0,0 +1,151 @@
+"""
+    Constant velocity Kalman filter specialised for the OC-SORT box model: the state is
+    [x, y, s, r, vx, vy, vs], the measurement is [x, y, s, r]. It gives the same results
+    as KalmanFilterNew set up by KalmanBoxTracker, including the online smoothing of a
+    track that is found again (freeze/unfreeze), without the generic matrix code.
+"""
+import numpy as np
+
+# Same noise as KalmanBoxTracker sets on KalmanFilterNew, all diagonal
+P0 = (10., 10., 10., 10., 10000., 10000., 10000.)
+Q = (1., 1., 1., 1., 0.01, 0.01, 0.0001)
+R = (1., 1., 10., 10.)
+
+
+def predict_pair(a, b, c, q_pos, q_vel):
+    """
+    Predict of the covariance [[a, b], [b, c]] of a position and its velocity.
+    """
+    return a + 2. * b + c + q_pos, b + c, c + q_vel
+
+
+def update_pair(a, b, c, r, y):
+    """
+    Joseph form update of the covariance [[a, b], [b, c]] of a position and its velocity
+    with the residual y of the position measurement (noise r).
+
+    Returns:
+        tuple: Position and velocity corrections and the updated a, b, c.
+    """
+    S = a + r
+    k1, k2 = a / S, b / S
+    j = 1. - k1
+    return k1 * y, k2 * y, j * j * a + k1 * k1 * r, j * (b - k2 * a) + k1 * k2 * r, k2 * k2 * (a + r) - 2. * k2 * b + c
+
+
+class ConstantVelocityKalmanFilter(object):
+    """
+    P0, Q and R are diagonal and F only adds each velocity to its position, so the covariance
+    stays block diagonal: one 2x2 block for each of x, y, s with its velocity and the variance
+    of r. Predict and update are done in closed form on these 10 numbers.
+
+    Attributes:
+        x (array): State (7, 1).
+        cov (list): [a, b, c] of the x, y and s blocks and the variance of r.
+        observed (bool): Whether the last update had a measurement.
+    """
+    __slots__ = ("x", "cov", "observed", "frozen", "frozen_x", "frozen_cov", "steps", "z_last", "z_step")
+
+    def __init__(self):
+        self.x = np.zeros((7, 1))
+        self.cov = [P0[0], 0., P0[4], P0[1], 0., P0[5], P0[2], 0., P0[6], P0[3]]
+
+        self.observed = False
+        # Online smoothing: parameters frozen at the first missed step, last measurement and its step
+        self.frozen = False
+        self.frozen_x = np.zeros((7, 1))
+        self.frozen_cov = None
+        self.steps = 0
+        self.z_last = None
+        self.z_step = -1
+
+    @property
+    def P(self):
+        """
+        State covariance (7, 7).
+        """
+        cov = self.cov
+        P = np.zeros((7, 7))
+        for i in range(3):
+            a, b, c = cov[3 * i:3 * i + 3]
+            P[i, i], P[i, i + 4], P[i + 4, i], P[i + 4, i + 4] = a, b, b, c
+        P[3, 3] = cov[9]
+        return P
+
+    def predict(self):
+        """
+        x = Fx, P = FPF' + Q
+        """
+        x = self.x
+        x[:3] += x[4:]
+        cov = self.cov
+        cov[0:3] = predict_pair(cov[0], cov[1], cov[2], Q[0], Q[4])
+        cov[3:6] = predict_pair(cov[3], cov[4], cov[5], Q[1], Q[5])
+        cov[6:9] = predict_pair(cov[6], cov[7], cov[8], Q[2], Q[6])
+        cov[9] += Q[3]
+
+    def _update(self, z):
+        """
+        Kalman update with the measurement z [x, y, s, r].
+        """
+        x0, x1, x2, x3, x4, x5, x6 = self.x[:, 0].tolist()
+        cov = self.cov
+        dx0, dx4, cov[0], cov[1], cov[2] = update_pair(cov[0], cov[1], cov[2], R[0], z[0] - x0)
+        dx1, dx5, cov[3], cov[4], cov[5] = update_pair(cov[3], cov[4], cov[5], R[1], z[1] - x1)
+        dx2, dx6, cov[6], cov[7], cov[8] = update_pair(cov[6], cov[7], cov[8], R[2], z[2] - x2)
+        p = cov[9]
+        k = p / (p + R[3])
+        dx3 = k * (z[3] - x3)
+        cov[9] = (1. - k) * (1. - k) * p + k * k * R[3]
+        self.x[:, 0] = (x0 + dx0, x1 + dx1, x2 + dx2, x3 + dx3, x4 + dx4, x5 + dx5, x6 + dx6)
+
+    def update(self, z):
+        """
+        Updates the filter with the measurement z (4, 1). If z is None the parameters are frozen
+        (on the first missed step) and nothing is computed. When a measurement comes after missed
+        steps the frozen parameters are re-updated with a virtual trajectory first.
+        """
+        if z is None:
+            if self.observed:
+                self.frozen_x[:] = self.x
+                self.frozen_cov = list(self.cov)
+                self.frozen = True
+            self.observed = False
+            self.steps += 1
+            return
+
+        z = z[:, 0].tolist()
+        z_last = z
+        if not self.observed and self.frozen:
+            z_last = self.unfreeze(z)
+        self.observed = True
+        self._update(z)
+
+        self.z_last = z_last
+        self.z_step = self.steps
+        self.steps += 1
+
+    def unfreeze(self, z):
+        """
+        Restores the frozen parameters and re-updates them with virtual measurements moving
+        linearly from the last measurement to z, one per missed step.
+
+        Returns:
+            list: The last virtual measurement, it replaces z as the last measurement.
+        """
+        self.x[:] = self.frozen_x
+        self.cov = self.frozen_cov
+        self.frozen = False
+        x1, y1, s1, r1 = self.z_last
+        w1, h1 = np.sqrt(s1 * r1), np.sqrt(s1 / r1)
+        x2, y2, s2, r2 = z
+        w2, h2 = np.sqrt(s2 * r2), np.sqrt(s2 / r2)
+        time_gap = self.steps - self.z_step
+        dx, dy, dw, dh = (x2-x1)/time_gap, (y2-y1)/time_gap, (w2-w1)/time_gap, (h2-h1)/time_gap
+        for i in range(time_gap):
+            w, h = w1 + (i+1) * dw, h1 + (i+1) * dh
+            new_z = [x1 + (i+1) * dx, y1 + (i+1) * dy, w * h, w / h]
+            self._update(new_z)
+            if not i == (time_gap-1):
+                self.predict()
+        return new_z
@@ -5,9 +5,46 @@ from __future__ import print_function
 
 import numpy as np
 from assembly.models.tracking.ocsort.association import *
-from collections import OrderedDict
+from assembly.models.tracking.ocsort.trackStore import TrackStore, convert_x_to_bboxes
+from collections import OrderedDict, deque
 # from yolov5.utils.general import xywh2xyxy
 # import torch
+
+
+class ObservationBuffer(object):
+    """
+    Observations of a track keyed by age like a dict, but only the last `size` ages are kept
+    (slot age % size) as only the observations delta_t steps back are ever looked up.
+    """
+    __slots__ = ("size", "ages", "boxes")
+
+    def __init__(self, size):
+        self.size = size
+        self.ages = [None] * size
+        self.boxes = [None] * size
+
+    def __setitem__(self, age, bbox):
+        self.ages[age % self.size] = age
+        self.boxes[age % self.size] = bbox
+
+    def __contains__(self, age):
+        return self.ages[age % self.size] == age
+
+    def __getitem__(self, age):
+        if age not in self:
+            raise KeyError(age)
+        return self.boxes[age % self.size]
+
+    def __len__(self):
+        return self.size - self.ages.count(None)
+
+    def keys(self):
+        return [age for age in self.ages if age is not None]
+
+    def values(self):
+        return [bbox for bbox in self.boxes if bbox is not None]
+
+
 def k_previous_obs(observations, cur_age, k):
     if len(observations) == 0:
         return [-1, -1, -1, -1, -1]
@@ -68,30 +105,33 @@ class KalmanBoxTracker(object):
         """
         # define constant velocity model
         if not orig:
-          from .kalmanfilter import KalmanFilterNew as KalmanFilter
-          self.kf = KalmanFilter(dim_x=7, dim_z=4)
+          # F, H and the noise below are built in the specialised filter
+          from .cvKalmanFilter import ConstantVelocityKalmanFilter
+          self.kf = ConstantVelocityKalmanFilter()
         else:
           from filterpy.kalman import KalmanFilter
           self.kf = KalmanFilter(dim_x=7, dim_z=4)
-        self.kf.F = np.array([[1, 0, 0, 0, 1, 0, 0], [0, 1, 0, 0, 0, 1, 0], [0, 0, 1, 0, 0, 0, 1], [
-                            0, 0, 0, 1, 0, 0, 0],  [0, 0, 0, 0, 1, 0, 0], [0, 0, 0, 0, 0, 1, 0], [0, 0, 0, 0, 0, 0, 1]])
-        self.kf.H = np.array([[1, 0, 0, 0, 0, 0, 0], [0, 1, 0, 0, 0, 0, 0],
-                            [0, 0, 1, 0, 0, 0, 0], [0, 0, 0, 1, 0, 0, 0]])
+          self.kf.F = np.array([[1, 0, 0, 0, 1, 0, 0], [0, 1, 0, 0, 0, 1, 0], [0, 0, 1, 0, 0, 0, 1], [
+                              0, 0, 0, 1, 0, 0, 0],  [0, 0, 0, 0, 1, 0, 0], [0, 0, 0, 0, 0, 1, 0], [0, 0, 0, 0, 0, 0, 1]])
+          self.kf.H = np.array([[1, 0, 0, 0, 0, 0, 0], [0, 1, 0, 0, 0, 0, 0],
+                              [0, 0, 1, 0, 0, 0, 0], [0, 0, 0, 1, 0, 0, 0]])
 
-        self.kf.R[2:, 2:] *= 10.
-        self.kf.P[4:, 4:] *= 1000.  # give high uncertainty to the unobservable initial velocities
-        self.kf.P *= 10.
-        self.kf.Q[-1, -1] *= 0.01
-        self.kf.Q[4:, 4:] *= 0.01
+          self.kf.R[2:, 2:] *= 10.
+          self.kf.P[4:, 4:] *= 1000.  # give high uncertainty to the unobservable initial velocities
+          self.kf.P *= 10.
+          self.kf.Q[-1, -1] *= 0.01
+          self.kf.Q[4:, 4:] *= 0.01
 
         self.kf.x[:4] = convert_bbox_to_z(bbox)
         self.time_since_update = 0
+        self.coasted = 0 # Frames coasted since the last update, counted towards max_age
         # self.id = KalmanBoxTracker.count
         # KalmanBoxTracker.count += 1
         ##### Custom
         self.id = id
         ###### 
-        self.history = []
+        # Predictions since the last update, only the last delta_t are kept
+        self.history = deque(maxlen=delta_t)
         self.hits = 0
         self.hit_streak = 0
         self.age = 0
@@ -103,8 +143,9 @@ class KalmanBoxTracker(object):
         fast and unified way, which you would see below k_observations = np.array([k_previous_obs(...]]), let's bear it for now.
         """
         self.last_observation = np.array([-1, -1, -1, -1, -1])  # placeholder
-        self.observations = dict()
-        self.history_observations = []
+        # Bounded by delta_t so that long lived tracks (jams) use a fixed amount of memory
+        self.observations = ObservationBuffer(delta_t)
+        self.history_observations = deque(maxlen=delta_t)
         self.velocity = None
         self.delta_t = delta_t
 
@@ -138,7 +179,8 @@ class KalmanBoxTracker(object):
             self.history_observations.append(bbox)
 
             self.time_since_update = 0
-            self.history = []
+            self.coasted = 0
+            self.history.clear()
             self.hits += 1
             self.hit_streak += 1
             self.kf.update(convert_bbox_to_z(bbox))
@@ -160,12 +202,36 @@ class KalmanBoxTracker(object):
         self.history.append(convert_x_to_bbox(self.kf.x))
         return self.history[-1]
 
+    def coast(self):
+        """
+        Advances the state vector on a frame where the detection was skipped. The filter steps
+        without a measurement (as for a missed frame, so the next update re-smooths the gap). The
+        hit streak is kept, but the frame counts towards max_age through coasted, so a track is
+        removed after the same number of frames whether they were detected or coasted.
+        Returns the predicted bounding box estimate.
+        """
+        if((self.kf.x[6]+self.kf.x[2]) <= 0):
+            self.kf.x[6] *= 0.0
+
+        self.kf.predict()
+        self.kf.update(None)
+        self.age += 1
+        self.coasted += 1
+        self.history.append(convert_x_to_bbox(self.kf.x))
+        return self.history[-1]
+
     def get_state(self):
         """
         Returns the current bounding box estimate.
         """
         return convert_x_to_bbox(self.kf.x)
 
+    def stored_boxes(self):
+        """
+        Returns the observations and predictions kept by the track.
+        """
+        return list(self.observations.values()) + list(self.history) + list(self.history_observations)
+
 
 """
     We support multiple ways for association cost calculation, by default
@@ -182,9 +248,11 @@ ASSO_FUNCS = {  "iou": iou_batch,
 
 class OCSort(object):
     def __init__(self, det_thresh, movement_direction="left2right", ROI=300, max_age=5, min_hits=1, 
-        iou_threshold=0.3, delta_t=3, asso_func="iou", inertia=0.2, use_byte=False):
+        iou_threshold=0.3, delta_t=3, asso_func="iou", inertia=0.2, use_byte=False, track_store="list"):
         """
         Sets key parameters for SORT
+        track_store: "list" keeps a KalmanBoxTracker per track, "array" keeps all the tracks
+                     in a TrackStore and predicts/updates them in batch
         """
         self.max_age = max_age
         self.min_hits = min_hits
@@ -200,6 +268,7 @@ class OCSort(object):
         self.use_byte = use_byte 
         # KalmanBoxTracker.count = 0
         self.count = 0 ##### Created a new count attribute
+        self.store = TrackStore(delta_t=delta_t) if track_store == "array" else None
 
         ################## custom #################3
 
@@ -214,6 +283,8 @@ class OCSort(object):
         Returns the a similar array, where the last column is the object ID.
         NOTE: The number of objects returned may differ from the number of detections provided.
         """
+        if self.store is not None:
+            return self.update_store(dets, confs, classes)
         self.frame_count += 1
 
         # print(f'dets-------------------------{torch.numel(dets)}')
@@ -324,40 +395,12 @@ class OCSort(object):
                 - if the dir is right2left, create ID onlyif bag centroid x > ROIX
                 """
                 startX, startY, endX, endY, _ = dets[i, :5]
-                cX = int((startX + endX) / 2.0)
-
-                cY = int((startY + endY) / 2.0)
-
-                # if not roiCrossedCheck(movement_direction, cX, ROIX):
                 if self.count>=5000:
                     self.count = 0
-                #     trk = KalmanBoxTracker(dets[i, :5], dets[i, 5], delta_t=self.delta_t, id=self.count) ######
-                #     self.trackers.append(trk)
-                #     self.count+=1 #### INcreamenting the id
-                
-                if self.movement_direction == "left2right":
-                    if cX < self.ROI:
-                        trk = KalmanBoxTracker(dets[i, :5], dets[i, 5], delta_t=self.delta_t, id=self.count) ######
-                        self.trackers.append(trk)
-                        self.count+=1 #### INcreamenting the id
-                elif self.movement_direction == "down2up":
-                    if cX < self.ROI:
-                        trk = KalmanBoxTracker(dets[i, :5], dets[i, 5], delta_t=self.delta_t, id=self.count) ######
-                        self.trackers.append(trk)
-                        self.count+=1 #### INcreamenting the id
-
-                elif self.movement_direction == "up2down": ### movement is right2left
-                    if cY < self.ROI:
-                        trk = KalmanBoxTracker(dets[i, :5], dets[i, 5], delta_t=self.delta_t, id=self.count) ######
-                        self.trackers.append(trk)
-                        self.count+=1 #### INcreamenting the id
-
-                elif self.movement_direction == "right2left": ### movement is right2left
-                    if cX > self.ROI:
-                        trk = KalmanBoxTracker(dets[i, :5], dets[i, 5], delta_t=self.delta_t, id=self.count) ######
-                        self.trackers.append(trk)
-                        self.count+=1 #### INcreamenting the id
-                
+                if self.can_create_track(startX, startY, endX, endY):
+                    trk = KalmanBoxTracker(dets[i, :5], dets[i, 5], delta_t=self.delta_t, id=self.count) ######
+                    self.trackers.append(trk)
+                    self.count+=1 #### INcreamenting the id
 
          ##############################################################################
 
@@ -378,31 +421,203 @@ class OCSort(object):
                     ret.append(np.concatenate((d, [trk.id+1], [trk.cls])).reshape(1, -1))
                 i -= 1
                 # remove dead tracklet
-                if(trk.time_since_update > self.max_age):
+                if(trk.time_since_update + trk.coasted > self.max_age):
                     self.trackers.pop(i)
             if(len(ret) > 0): 
-    #################################### custom ######################################################
-                final_ret = np.concatenate(ret)
-                # print(f'bbox--------before updation-------{self.BBox}')
-                # avail_ids = [i[4] for i in final_ret] #### extracting ids from finalrect
-                # remove_ids = [i for i in list(self.BBox.keys()) if i not in avail_ids] 
-                # print(f'remove_ids...................{remove_ids}')
-                # if len(remove_ids) !=0:
-                #     for ri in remove_ids:
-                #         del self.BBox[ri]
-                trackableids = list(self.BBox.keys())
-                # print(f"ilist(self.BBox.keys()) ---before----{list(self.BBox.keys()) }")
-                ### we are deleting first 5 bboxes after  more than 20 bboxes are stored bbox dict  ################
-                if len(trackableids) >20:
-                    for ri in trackableids[:5]:
-                        del self.BBox[ri]
-                # print(f"ilist(self.BBox.keys()) ---after----{list(self.BBox.keys()) }")
-                
-                ###### updating bboxes with new detection in curr frame
-                for (i, (startX, startY, endX, endY, idx, class_name)) in enumerate(final_ret):
-
-                    self.BBox[int(idx)] = (int(startX), int(startY), int(endX), int(endY))
-
-                # print(f'bbox--------after updation-------{self.BBox}')
-                return final_ret
-        return np.empty((0, 5)) #############  send empty when no detections ##########################
\ No newline at end of file
+                return self.update_bboxes(np.concatenate(ret))
+        return np.empty((0, 5)) #############  send empty when no detections ##########################
+
+    def can_create_track(self, startX, startY, endX, endY):
+        """
+        - we are generating new IDs according to the direction and position
+        - if the dir is left2right, create ID onlyif bag centroid x < ROIX
+        - if the dir is right2left, create ID onlyif bag centroid x > ROIX
+        """
+        cX = int((startX + endX) / 2.0)
+        cY = int((startY + endY) / 2.0)
+        if self.movement_direction in ("left2right", "down2up"):
+            return cX < self.ROI
+        elif self.movement_direction == "up2down":
+            return cY < self.ROI
+        elif self.movement_direction == "right2left": ### movement is right2left
+            return cX > self.ROI
+        return False
+
+    def update_bboxes(self, final_ret):
+        """
+        Keeps the last bboxes of the returned ids in self.BBox and returns final_ret.
+        """
+        ###### updating bboxes with new detection in curr frame
+        for (i, (startX, startY, endX, endY, idx, class_name)) in enumerate(final_ret):
+
+            self.BBox[int(idx)] = (int(startX), int(startY), int(endX), int(endY))
+
+        ### only the ids of the live tracks are kept so the dict does not grow with the uptime
+        live_ids = self.live_ids()
+        for idx in [idx for idx in self.BBox if idx not in live_ids]:
+            del self.BBox[idx]
+
+        return final_ret
+
+    def coast(self):
+        """
+        Advances all the tracks on a frame where the detection was skipped, see KalmanBoxTracker.coast.
+        """
+        self.frame_count += 1
+        if self.store is not None:
+            self.store.coast()
+        else:
+            for trk in self.trackers:
+                trk.coast()
+
+    def peek(self, steps=1):
+        """
+        Predicted boxes of the live tracks `steps` frames ahead, without changing their state.
+        Returns rows [x1,y1,x2,y2,ID,class] like update.
+        """
+        if self.store is not None:
+            n = self.store.n
+            x = self.store.x[:n].copy()
+            ids, cls = self.store.ids[:n], self.store.cls[:n]
+        else:
+            x = np.array([trk.kf.x[:, 0] for trk in self.trackers], dtype=float).reshape(-1, 7)
+            ids = np.array([trk.id for trk in self.trackers])
+            cls = np.array([trk.cls for trk in self.trackers], dtype=float)
+        x[:, :3] += steps * x[:, 4:]
+        with np.errstate(invalid="ignore"):
+            boxes = convert_x_to_bboxes(x)
+        ret = np.column_stack((boxes, ids + 1, cls)).reshape(-1, 6)
+        return ret[~np.isnan(ret[:, :4]).any(axis=1)]
+
+    def tentative_tracks(self, min_hits=1):
+        """
+        Number of live tracks matched less than min_hits times, their velocity is not known yet.
+        """
+        if self.store is not None:
+            return int((self.store.hits[:self.store.n] < min_hits).sum())
+        return sum(trk.hits < min_hits for trk in self.trackers)
+
+    def live_ids(self):
+        """
+        Ids (as returned by update) of the tracks that are alive, returned or not in this frame.
+        """
+        if self.store is not None:
+            return set((self.store.ids[:self.store.n] + 1).tolist())
+        return {trk.id + 1 for trk in self.trackers}
+
+    def memory_stats(self):
+        """
+        Returns the number of live tracks, the observations/predictions they keep, an estimate of
+        the bytes used by them and the number of entries in self.BBox.
+        """
+        if self.store is not None:
+            stored_boxes = self.store.stored_observations()
+            nbytes = self.store.nbytes()
+        else:
+            boxes = [bbox for trk in self.trackers for bbox in trk.stored_boxes()]
+            stored_boxes = len(boxes)
+            nbytes = sum(np.asarray(bbox).nbytes for bbox in boxes)
+        return {"tracks": len(self.live_ids()), "stored_boxes": stored_boxes, "bytes": nbytes, "bbox_entries": len(self.BBox)}
+
+    def update_store(self, dets, confs, classes):
+        """
+        Same as update but with the tracks kept in self.store, the predict and the updates of
+        all the tracks are done in batch instead of looping over KalmanBoxTracker objects.
+        """
+        self.frame_count += 1
+        store = self.store
+
+        if dets is not None and len(dets):
+            output_results = np.column_stack((dets, confs, classes))
+
+            inds_low = confs > 0.1
+            inds_high = confs < self.det_thresh
+            inds_second = np.logical_and(inds_low, inds_high)  # self.det_thresh > score > 0.1, for second matching
+            dets_second = output_results[inds_second]  # detections for second matching
+            remain_inds = confs > self.det_thresh
+            dets = output_results[remain_inds]
+
+            # get predicted locations from existing trackers, dropping the ones that diverged
+            pos = store.predict()
+            valid = np.where(~np.isnan(pos).any(axis=1))[0]
+            if len(valid) < store.n:
+                store.keep(valid)
+                pos = pos[valid]
+            trks = np.column_stack((pos, np.zeros(store.n)))
+
+            n = store.n
+            velocities = store.velocity[:n].copy()
+            last_boxes = store.last_observation[:n].copy()
+            k_observations = store.previous_obs(np.arange(n), self.delta_t)
+
+            """
+                First round of association
+            """
+            matched, unmatched_dets, unmatched_trks = associate(
+                dets, trks, self.iou_threshold, velocities, k_observations, self.inertia)
+            update_rows = [m[1] for m in matched]
+            update_dets = [dets[m[0]] for m in matched]
+
+            """
+                Second round of associaton by OCR
+            """
+            # BYTE association
+            if self.use_byte and len(dets_second) > 0 and unmatched_trks.shape[0] > 0:
+                u_trks = trks[unmatched_trks]
+                iou_left = np.array(self.asso_func(dets_second, u_trks))          # iou between low score detections and unmatched tracks
+                if iou_left.max() > self.iou_threshold:
+                    matched_indices = linear_assignment(-iou_left)
+                    to_remove_trk_indices = []
+                    for m in matched_indices:
+                        det_ind, trk_ind = m[0], unmatched_trks[m[1]]
+                        if iou_left[m[0], m[1]] < self.iou_threshold:
+                            continue
+                        update_rows.append(trk_ind)
+                        update_dets.append(dets_second[det_ind])
+                        to_remove_trk_indices.append(trk_ind)
+                    unmatched_trks = np.setdiff1d(unmatched_trks, np.array(to_remove_trk_indices))
+
+            if unmatched_dets.shape[0] > 0 and unmatched_trks.shape[0] > 0:
+                left_dets = dets[unmatched_dets]
+                left_trks = last_boxes[unmatched_trks]
+                iou_left = np.array(self.asso_func(left_dets, left_trks))
+                if iou_left.max() > self.iou_threshold:
+                    rematched_indices = linear_assignment(-iou_left)
+                    to_remove_det_indices = []
+                    to_remove_trk_indices = []
+                    for m in rematched_indices:
+                        det_ind, trk_ind = unmatched_dets[m[0]], unmatched_trks[m[1]]
+                        if iou_left[m[0], m[1]] < self.iou_threshold:
+                            continue
+                        update_rows.append(trk_ind)
+                        update_dets.append(dets[det_ind])
+                        to_remove_det_indices.append(det_ind)
+                        to_remove_trk_indices.append(trk_ind)
+                    unmatched_dets = np.setdiff1d(unmatched_dets, np.array(to_remove_det_indices))
+                    unmatched_trks = np.setdiff1d(unmatched_trks, np.array(to_remove_trk_indices))
+
+            # The association only uses the state from before the updates, so they are all done at once
+            store.update(update_rows, update_dets)
+            store.miss(unmatched_trks)
+
+            # create and initialise new trackers for unmatched detections
+            for i in unmatched_dets:
+                startX, startY, endX, endY, _ = dets[i, :5]
+                if self.count>=5000:
+                    self.count = 0
+                if self.can_create_track(startX, startY, endX, endY):
+                    store.add(dets[i, :5], dets[i, 5], id=self.count)
+                    self.count+=1 #### INcreamenting the id
+
+            n = store.n
+            rows = np.arange(n)[::-1] # Same order as iterating the trackers list in reverse
+            d = np.where((store.last_observation[:n].sum(axis=1) < 0)[:, None],
+                         store.get_states(), store.last_observation[:n, :4])
+            returned = (store.time_since_update[:n] < 1) & ((store.hit_streak[:n] >= self.min_hits) | (self.frame_count <= self.min_hits))
+            rows = rows[returned[rows]]
+            ret = np.column_stack((d[rows], store.ids[rows]+1, store.cls[rows]))
+            # remove dead tracklet
+            store.keep(np.where(store.time_since_update[:n] + store.coasted[:n] <= self.max_age)[0])
+            if(len(ret) > 0):
+                return self.update_bboxes(ret)
+        return np.empty((0, 5)) #############  send empty when no detections ##########################
@@ -0,0 +1,299 @@
+"""
+    Array backed store of the OC-SORT tracks. It keeps the same constant velocity model,
+    observation history and online smoothing (freeze/unfreeze) as KalmanBoxTracker with
+    KalmanFilterNew, but every track lives in a row of contiguous numpy arrays so the
+    predict and update of all the tracks of a frame are batched.
+"""
+import numpy as np
+
+
+def convert_bboxes_to_z(bboxes):
+    """
+    Takes bounding boxes (N, 4+) in the form [x1,y1,x2,y2] and returns z (N, 4) in the form
+      [x,y,s,r] where x,y is the centre of the box and s is the scale/area and r is
+      the aspect ratio
+    """
+    w = bboxes[:, 2] - bboxes[:, 0]
+    h = bboxes[:, 3] - bboxes[:, 1]
+    return np.stack((bboxes[:, 0] + w/2., bboxes[:, 1] + h/2., w * h, w / (h+1e-6)), axis=1)
+
+
+def convert_x_to_bboxes(x):
+    """
+    Takes states (N, 4+) in the centre form [x,y,s,r] and returns boxes (N, 4) in the form
+      [x1,y1,x2,y2] where x1,y1 is the top left and x2,y2 is the bottom right
+    """
+    w = np.sqrt(x[:, 2] * x[:, 3])
+    h = x[:, 2] / w
+    return np.stack((x[:, 0]-w/2., x[:, 1]-h/2., x[:, 0]+w/2., x[:, 1]+h/2.), axis=1)
+
+
+def speed_directions(bboxes1, bboxes2):
+    """
+    Normalised (dy, dx) direction between the centres of two sets of boxes.
+    """
+    cx1, cy1 = (bboxes1[:, 0]+bboxes1[:, 2]) / 2.0, (bboxes1[:, 1]+bboxes1[:, 3])/2.0
+    cx2, cy2 = (bboxes2[:, 0]+bboxes2[:, 2]) / 2.0, (bboxes2[:, 1]+bboxes2[:, 3])/2.0
+    speed = np.stack((cy2-cy1, cx2-cx1), axis=1)
+    norm = np.sqrt((cy2-cy1)**2 + (cx2-cx1)**2) + 1e-6
+    return speed / norm[:, None]
+
+
+class TrackStore(object):
+    """
+    Contiguous arrays holding the state of all the tracks, row i is one track.
+
+    Attributes:
+        n (int): Number of live tracks (the first n rows).
+        x (array): Kalman states (n, 7) as [x, y, s, r, vx, vy, vs].
+        P (array): Kalman covariances (n, 7, 7).
+        last_observation (array): Last observed box and score (n, 5), -1 when never observed.
+        velocity (array): Observation direction (n, 2) used by the OCM cost.
+        ids, cls, age, time_since_update, hits, hit_streak (array): Per track counters.
+        coasted (array): Frames coasted since the last update, counted towards max_age.
+    """
+    # Same noise as KalmanBoxTracker sets up for every track
+    R = np.diag([1., 1., 10., 10.])
+    Q = np.diag([1., 1., 1., 1., 0.01, 0.01, 0.0001])
+    P0 = np.diag([10., 10., 10., 10., 10000., 10000., 10000.])
+    fields = ("x", "P", "last_observation", "velocity", "ids", "cls", "age", "time_since_update", "coasted",
+              "hits", "hit_streak", "obs_boxes", "obs_ages", "observed", "frozen", "frozen_x", "frozen_P", "steps",
+              "z_last", "z_step")
+
+    def __init__(self, delta_t=3, capacity=64):
+        self.delta_t = delta_t
+        self.n = 0
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        """
+        (Re)allocates the arrays for the given number of tracks, keeping the live rows.
+        """
+        n = self.n
+        arrays = {
+            "x": np.zeros((capacity, 7)),
+            "P": np.zeros((capacity, 7, 7)),
+            "last_observation": np.full((capacity, 5), -1.),
+            "velocity": np.zeros((capacity, 2)),
+            "ids": np.zeros(capacity, dtype=int),
+            "cls": np.zeros(capacity),
+            "age": np.zeros(capacity, dtype=int),
+            "time_since_update": np.zeros(capacity, dtype=int),
+            "coasted": np.zeros(capacity, dtype=int),
+            "hits": np.zeros(capacity, dtype=int),
+            "hit_streak": np.zeros(capacity, dtype=int),
+            # Observations of the last delta_t ages, slot age % delta_t
+            "obs_boxes": np.zeros((capacity, self.delta_t, 5)),
+            "obs_ages": np.full((capacity, self.delta_t), np.iinfo(int).min),
+            # Online smoothing: filter history and the parameters frozen at the first missed frame
+            "observed": np.zeros(capacity, dtype=bool),
+            "frozen": np.zeros(capacity, dtype=bool),
+            "frozen_x": np.zeros((capacity, 7)),
+            "frozen_P": np.zeros((capacity, 7, 7)),
+            "steps": np.zeros(capacity, dtype=int),
+            "z_last": np.zeros((capacity, 4)),
+            "z_step": np.full(capacity, -1),
+        }
+        for name, array in arrays.items():
+            if n:
+                array[:n] = getattr(self, name)[:n]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def nbytes(self):
+        """
+        Memory used by the arrays, it only changes when the capacity grows.
+        """
+        return sum(getattr(self, name).nbytes for name in self.fields)
+
+    def stored_observations(self):
+        """
+        Number of observations kept in the delta_t ring of the live tracks.
+        """
+        return int((self.obs_ages[:self.n] != np.iinfo(int).min).sum())
+
+    def keep(self, rows):
+        """
+        Keeps only the given rows (in that order) of the live tracks.
+        """
+        rows = np.asarray(rows, dtype=int)
+        for name in self.fields:
+            array = getattr(self, name)
+            array[:len(rows)] = array[rows]
+        self.n = len(rows)
+
+    def add(self, bbox, cls, id):
+        """
+        Creates a track from an unmatched detection [x1,y1,x2,y2,score].
+        """
+        if self.n == self.capacity:
+            self.allocate(self.capacity * 2)
+        i = self.n
+        self.x[i] = 0.
+        self.x[i, :4] = convert_bboxes_to_z(np.asarray(bbox, dtype=float)[None])[0]
+        self.P[i] = self.P0
+        self.last_observation[i] = -1.
+        self.velocity[i] = 0.
+        self.ids[i] = id
+        self.cls[i] = cls
+        self.age[i] = self.time_since_update[i] = self.coasted[i] = self.hits[i] = self.hit_streak[i] = 0
+        self.obs_ages[i] = np.iinfo(int).min
+        self.observed[i] = self.frozen[i] = False
+        self.steps[i] = 0
+        self.z_step[i] = -1
+        self.n += 1
+
+    @staticmethod
+    def kf_predict(x, P):
+        """
+        Constant velocity predict of states (m, 7) and covariances (m, 7, 7), F only adds the
+        velocities to x, y and s so FPF' is done with slices.
+        """
+        x[:, :3] += x[:, 4:]
+        FP = P.copy()
+        FP[:, :3] += P[:, 4:]
+        P[:] = FP
+        P[:, :, :3] += FP[:, :, 4:]
+        P += TrackStore.Q
+
+    @staticmethod
+    def kf_update(x, P, z):
+        """
+        Kalman update of states (m, 7) and covariances (m, 7, 7) with measurements z (m, 4),
+        H only selects the first 4 states.
+        """
+        y = z - x[:, :4]
+        PHT = P[:, :, :4]
+        S = PHT[:, :4] + TrackStore.R
+        K = np.matmul(PHT, np.linalg.inv(S))
+        x += np.matmul(K, y[:, :, None])[:, :, 0]
+        I_KH = np.broadcast_to(np.eye(7), P.shape).copy()
+        I_KH[:, :, :4] -= K
+        P[:] = np.matmul(np.matmul(I_KH, P), I_KH.transpose(0, 2, 1)) + np.matmul(np.matmul(K, TrackStore.R), K.transpose(0, 2, 1))
+
+    def predict(self):
+        """
+        Advances all the tracks and returns their predicted boxes (n, 4).
+        """
+        n = self.n
+        x = self.x[:n]
+        x[x[:, 6] + x[:, 2] <= 0, 6] *= 0.0
+        self.kf_predict(x, self.P[:n])
+        self.age[:n] += 1
+        self.hit_streak[:n][self.time_since_update[:n] > 0] = 0
+        self.time_since_update[:n] += 1
+        return convert_x_to_bboxes(x)
+
+    def coast(self):
+        """
+        Advances all the tracks on a frame without detection: the filters step without a
+        measurement, the hit streaks are kept and the frame counts towards max_age.
+        """
+        n = self.n
+        x = self.x[:n]
+        x[x[:, 6] + x[:, 2] <= 0, 6] *= 0.0
+        self.kf_predict(x, self.P[:n])
+        self.age[:n] += 1
+        self.coasted[:n] += 1
+        self.miss(np.arange(n))
+
+    def previous_obs(self, rows, k):
+        """
+        Observation k ages before the current age of each track (or the closest newer one),
+        the last observation if there is none, as k_previous_obs does.
+        """
+        rows = np.asarray(rows, dtype=int)
+        wanted = self.age[rows][:, None] - np.arange(k, 0, -1)[None, :]
+        slots = wanted % self.delta_t
+        found = self.obs_ages[rows[:, None], slots] == wanted
+        result = self.last_observation[rows].copy()
+        has = found.any(axis=1)
+        first = found.argmax(axis=1)[has]
+        result[has] = self.obs_boxes[rows[has], slots[has, first]]
+        return result
+
+    def update(self, rows, dets):
+        """
+        Updates the matched tracks with their detections [x1,y1,x2,y2,score,cls].
+        """
+        rows = np.asarray(rows, dtype=int)
+        if len(rows) == 0:
+            return
+        dets = np.asarray(dets, dtype=float)
+        bboxes = dets[:, :5]
+        self.cls[rows] = dets[:, 5]
+
+        # Direction from the observation delta_t steps away
+        has_previous = self.last_observation[rows].sum(axis=1) >= 0
+        if has_previous.any():
+            previous = self.previous_obs(rows[has_previous], self.delta_t)
+            self.velocity[rows[has_previous]] = speed_directions(previous, bboxes[has_previous])
+
+        self.last_observation[rows] = bboxes
+        slots = self.age[rows] % self.delta_t
+        self.obs_boxes[rows, slots] = bboxes
+        self.obs_ages[rows, slots] = self.age[rows]
+        self.time_since_update[rows] = 0
+        self.coasted[rows] = 0
+        self.hits[rows] += 1
+        self.hit_streak[rows] += 1
+
+        # Re-update through the virtual trajectory the tracks that were lost and found again
+        z = convert_bboxes_to_z(bboxes)
+        z_last = z.copy()
+        for j in np.where(~self.observed[rows] & self.frozen[rows])[0]:
+            z_last[j] = self.unfreeze(rows[j], z[j])
+        x, P = self.x[rows], self.P[rows]
+        self.kf_update(x, P, z)
+        self.x[rows], self.P[rows] = x, P
+
+        self.z_last[rows] = z_last
+        self.z_step[rows] = self.steps[rows]
+        self.steps[rows] += 1
+        self.observed[rows] = True
+
+    def unfreeze(self, row, z):
+        """
+        Restores the parameters frozen when the track was lost and re-updates them with
+        virtual observations moving linearly from the last observation to z.
+
+        Returns:
+            array: The last virtual observation, which replaces z in the filter history.
+        """
+        x, P = self.frozen_x[row:row+1].copy(), self.frozen_P[row:row+1].copy()
+        x1, y1, s1, r1 = self.z_last[row]
+        w1, h1 = np.sqrt(s1 * r1), np.sqrt(s1 / r1)
+        x2, y2, s2, r2 = z
+        w2, h2 = np.sqrt(s2 * r2), np.sqrt(s2 / r2)
+        time_gap = self.steps[row] - self.z_step[row]
+        dx, dy, dw, dh = (x2-x1)/time_gap, (y2-y1)/time_gap, (w2-w1)/time_gap, (h2-h1)/time_gap
+        for i in range(time_gap):
+            w, h = w1 + (i+1) * dw, h1 + (i+1) * dh
+            new_z = np.array([[x1 + (i+1) * dx, y1 + (i+1) * dy, w * h, w / float(h)]])
+            self.kf_update(x, P, new_z)
+            if not i == (time_gap-1):
+                self.kf_predict(x, P)
+        self.x[row], self.P[row] = x[0], P[0]
+        self.frozen[row] = False
+        return new_z[0]
+
+    def miss(self, rows):
+        """
+        Marks the unmatched tracks as not observed, the parameters of the tracks that were
+        observed until now are frozen for the online smoothing.
+        """
+        rows = np.asarray(rows, dtype=int)
+        if len(rows) == 0:
+            return
+        freeze = rows[self.observed[rows]]
+        self.frozen_x[freeze] = self.x[freeze]
+        self.frozen_P[freeze] = self.P[freeze]
+        self.frozen[freeze] = True
+        self.observed[rows] = False
+        self.steps[rows] += 1
+
+    def get_states(self):
+        """
+        Returns the current box estimates (n, 4).
+        """
+        return convert_x_to_bboxes(self.x[:self.n])
@@ -15,8 +15,11 @@ import redis
 import json
 
 class HardwareTriggerTransmitter:
-    def __init__(self, shared_queue, camera_ip, transmitter_config, transmitter_id, transmitterlog):
+    def __init__(self, shared_queue, camera_ip, transmitter_config, transmitter_id, transmitterlog, frame_buffer=None):
         self.queue = shared_queue
+        self.frame_buffer = frame_buffer # Shared memory slots for the frames, None to put the image on the queue
+        self.dropped_frames = 0 # Frames dropped because the MainProcessor had no free slot
+        self.slot = None # Slot the last frame was grabbed into
         self.camera_ip = camera_ip
         self.transmitter_config = transmitter_config
         self.cam = None
@@ -174,23 +177,47 @@ class HardwareTriggerTransmitter:
                 self.configure(config)
         return configure_flag
 
+    def grab_frame(self, nMsec):
+        """Grab a frame, straight into a free shared memory slot when a frame buffer is used.
+        Without a free slot the frame is grabbed into pData and dropped, MV_E_BUFOVER is returned."""
+        if self.frame_buffer is None:
+            return self.cam.MV_CC_GetOneFrameTimeout(byref(self.pData), self.nPayloadSize, self.stFrameInfo, nMsec)
+        self.slot = self.frame_buffer.acquire()
+        if self.slot is None:
+            # MainProcessor is behind, the frame is still taken from the camera so the next grab gets a new one
+            ret = self.cam.MV_CC_GetOneFrameTimeout(byref(self.pData), self.nPayloadSize, self.stFrameInfo, nMsec)
+            if ret != 0:
+                return ret
+            self.dropped_frames += 1
+            self.logger.info(f"No free frame slot for {self.camera_ip}, dropped frame ({self.dropped_frames} dropped)")
+            return MV_E_BUFOVER
+        ret = self.cam.MV_CC_GetOneFrameTimeout(self.frame_buffer.slot_pointer(self.slot), self.nPayloadSize, self.stFrameInfo, nMsec)
+        if ret != 0:
+            self.frame_buffer.discard(self.slot)
+            self.slot = None
+        return ret
+
     def process_frame(self, configId):
         self.frame_count += 1
-        numpy_array = np.array(self.pData, dtype=np.uint8)
-        image = numpy_array.reshape(self.stFrameInfo.nHeight, self.stFrameInfo.nWidth)
         id = str(uuid.uuid4())
         frame_info = {
             "id": id,
             "beltId": self.transmitter_config["camera_id"],
             "camera_ip": self.camera_ip,
             "configId" : configId,
-            "image": image,
             "frame_count": self.frame_count,
             "iterator" : 0,
             "groupId": 122,
             "groupLimit": 1,
-            "extraInfo": ""
+            "extraInfo": "",
+            "timestamp": time.time()
         }
+        shape = (self.stFrameInfo.nHeight, self.stFrameInfo.nWidth)
+        if self.frame_buffer is not None:
+            # The frame was grabbed straight into a shared memory slot, only the header goes on the queue
+            frame_info.update(self.frame_buffer.header(self.slot, shape))
+        else:
+            frame_info["image"] = np.array(self.pData, dtype=np.uint8).reshape(shape)
         self.queue.put(frame_info)
         self.logger.info("Captured Frame")
     
@@ -281,6 +308,8 @@ class HardwareTriggerTransmitter:
                     continue
                 print("camera configuration completed")
                 self.pData = (c_ubyte * self.nPayloadSize)()
+                if self.frame_buffer is not None:
+                    self.frame_buffer.allocate(self.nPayloadSize)
                 self.stFrameInfo = MV_FRAME_OUT_INFO_EX()
                 memset(byref(self.stFrameInfo), 0, sizeof(self.stFrameInfo))
 
@@ -293,7 +322,10 @@ class HardwareTriggerTransmitter:
                 while not stop_event.is_set():
                     if not self.redis_queue.empty():
                         self.update_config()
-                    ret = self.cam.MV_CC_GetOneFrameTimeout(byref(self.pData), self.nPayloadSize, self.stFrameInfo, 1000)
+                    ret = self.grab_frame(1000)
+                    if ret == MV_E_BUFOVER:
+                        # Frame dropped for lack of a free slot, grabbing the next one right away
+                        continue
                     if ret != 0:
                         self.logger.info(f"failed to capture {ret}")
                     if ret == 0:
@@ -317,3 +349,5 @@ class HardwareTriggerTransmitter:
             self.cam.MV_CC_StopGrabbing()
             self.cam.MV_CC_CloseDevice()
             self.cam.MV_CC_DestroyHandle()
+        if self.frame_buffer is not None:
+            self.frame_buffer.close()
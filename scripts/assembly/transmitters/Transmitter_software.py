@@ -16,7 +16,7 @@ import redis
 import json
 from queue import Queue
 class SoftwareTriggerTransmitter:
-    def __init__(self, shared_queue, camera_ip, transmitter_config, transmitter_id, transmitterlog, stop_event):
+    def __init__(self, shared_queue, camera_ip, transmitter_config, transmitter_id, transmitterlog, stop_event, frame_buffer=None):
 
         # self.redis_queue = mp.Queue()
 
@@ -26,6 +26,9 @@ class SoftwareTriggerTransmitter:
 
 
         self.queue = shared_queue
+        self.frame_buffer = frame_buffer # Shared memory slots for the frames, None to put the image on the queue
+        self.dropped_frames = 0 # Frames dropped because the MainProcessor had no free slot
+        self.slot = None # Slot the last frame was grabbed into
         self.camera_ip = camera_ip
         self.transmitter_id = transmitter_id
         self.transmitter_config = transmitter_config
@@ -186,10 +189,28 @@ class SoftwareTriggerTransmitter:
         self.logger.info(f"what is configure flag {configure_flag}")
         return configure_flag
 
+    def grab_frame(self, nMsec):
+        """Grab a frame, straight into a free shared memory slot when a frame buffer is used.
+        Without a free slot the frame is grabbed into pData and dropped, MV_E_BUFOVER is returned."""
+        if self.frame_buffer is None:
+            return self.cam.MV_CC_GetOneFrameTimeout(byref(self.pData), self.nPayloadSize, self.stFrameInfo, nMsec)
+        self.slot = self.frame_buffer.acquire()
+        if self.slot is None:
+            # MainProcessor is behind, the frame is still taken from the camera so the next grab gets a new one
+            ret = self.cam.MV_CC_GetOneFrameTimeout(byref(self.pData), self.nPayloadSize, self.stFrameInfo, nMsec)
+            if ret != 0:
+                return ret
+            self.dropped_frames += 1
+            self.logger.info(f"No free frame slot for {self.camera_ip}, dropped frame ({self.dropped_frames} dropped)")
+            return MV_E_BUFOVER
+        ret = self.cam.MV_CC_GetOneFrameTimeout(self.frame_buffer.slot_pointer(self.slot), self.nPayloadSize, self.stFrameInfo, nMsec)
+        if ret != 0:
+            self.frame_buffer.discard(self.slot)
+            self.slot = None
+        return ret
+
     def process_frame(self, configId):
         self.frame_count += 1  # Increment the frame counter
-        numpy_array = np.array(self.pData, dtype=np.uint8)
-        image = numpy_array.reshape(self.stFrameInfo.nHeight, self.stFrameInfo.nWidth)
         id = str(uuid.uuid4())
         self.logger.info(f"")
         frame_info = {
@@ -197,13 +218,19 @@ class SoftwareTriggerTransmitter:
             "beltId": self.transmitter_config["camera_id"],
             "camera_ip": self.camera_ip,
             "configId" : configId,
-            "image": image,
             "frame_count": self.frame_count,  # Add the frame counter to frame_info
             "iterator" : 0,
             "groupId": 122,
             "groupLimit": 1,
-            "extraInfo": ""
+            "extraInfo": "",
+            "timestamp": time.time()
         }
+        shape = (self.stFrameInfo.nHeight, self.stFrameInfo.nWidth)
+        if self.frame_buffer is not None:
+            # The frame was grabbed straight into a shared memory slot, only the header goes on the queue
+            frame_info.update(self.frame_buffer.header(self.slot, shape))
+        else:
+            frame_info["image"] = np.array(self.pData, dtype=np.uint8).reshape(shape)
         self.queue.put(frame_info)
         self.logger.info("Captured Frame")
         # save_in = os.getenv("SAVE_DIR")
@@ -330,6 +357,8 @@ class SoftwareTriggerTransmitter:
                     continue
                 self.logger.info(f"Camera configuration completed for {self.transmitter_id}")
                 self.pData = (c_ubyte * self.nPayloadSize)()
+                if self.frame_buffer is not None:
+                    self.frame_buffer.allocate(self.nPayloadSize)
                 self.stFrameInfo = MV_FRAME_OUT_INFO_EX()
                 memset(byref(self.stFrameInfo), 0, sizeof(self.stFrameInfo))
                 ret = self.cam.MV_CC_StartGrabbing()
@@ -352,7 +381,10 @@ class SoftwareTriggerTransmitter:
                         if ret!=0:
                             self.logger.info("Loosing the last trigger ---> command value error[0x%x]" % ret)
                             break
-                        ret = self.cam.MV_CC_GetOneFrameTimeout(byref(self.pData), self.nPayloadSize, self.stFrameInfo, 20000)
+                        ret = self.grab_frame(20000)
+                        if ret == MV_E_BUFOVER:
+                            # Frame dropped for lack of a free slot, the trigger was served
+                            continue
                         if ret != 0:
                             self.logger.info(f"Loosing the last trigger --->failed to capture {ret} ")
                             break
@@ -380,6 +412,8 @@ class SoftwareTriggerTransmitter:
             self.cam.MV_CC_DestroyHandle()
             x = time.time() - t 
             self.logger.info(f"DestroyHandle, and time taken --> {x}")
+        if self.frame_buffer is not None:
+            self.frame_buffer.close()
         x = time.time() - t 
         self.logger.info(f"Total stopping time taken --> {x}")
 
@@ -0,0 +1,50 @@
+"""
+    Benchmark of the OC-SORT association over realistic detection counts: the cost functions
+    and the full first round association (associate) on tracks with noisy detections.
+
+    Run from the scripts directory:
+        python -m benchmarks.associationBenchmark
+"""
+import os
+import time
+import numpy as np
+from assembly.models.tracking.ocsort import association
+
+COUNTS = [int(n) for n in os.getenv("BENCHMARK_COUNTS", "5,20,50,100,200").split(",")]
+REPEAT = int(os.getenv("BENCHMARK_REPEAT", 200))
+
+
+def make_frame(rng, n):
+    # n tracks and n detections, most of them close to a track so the assignment is solved
+    xy = rng.uniform(0, 1500, (n, 2))
+    wh = rng.uniform(30, 120, (n, 2))
+    trackers = np.concatenate((xy, xy + wh, np.zeros((n, 1))), axis=1)
+    detections = trackers + rng.normal(0, 10, trackers.shape)
+    detections[:, 4] = rng.uniform(0.5, 1, n)
+    previous_obs = trackers + rng.normal(0, 5, trackers.shape)
+    previous_obs[rng.random(n) < 0.2, 4] = -1
+    velocities = rng.normal(0, 1, (n, 2))
+    return detections, trackers, velocities, previous_obs
+
+
+def time_call(function, *args):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        function(*args)
+    return (time.perf_counter() - start) / REPEAT * 1e6
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print("solver:", "lap" if association.lap is not None else "scipy")
+    print(f"{'n':>5} {'iou_batch':>12} {'giou_batch':>12} {'ciou_batch':>12} {'associate':>12}  (us)")
+    for n in COUNTS:
+        detections, trackers, velocities, previous_obs = make_frame(rng, n)
+        print(f"{n:>5} {time_call(association.iou_batch, detections, trackers):12.1f}"
+              f" {time_call(association.giou_batch, detections, trackers):12.1f}"
+              f" {time_call(association.ciou_batch, detections, trackers):12.1f}"
+              f" {time_call(association.associate, detections, trackers, 0.3, velocities, previous_obs, 0.2):12.1f}")
+
+
+if __name__ == "__main__":
+    main()
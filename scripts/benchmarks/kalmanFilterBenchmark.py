@@ -0,0 +1,68 @@
+"""
+    Micro benchmark of the OC-SORT Kalman filters: KalmanFilterNew set up as KalmanBoxTracker
+    did against the specialised ConstantVelocityKalmanFilter, then the OCSort update latency.
+
+    Run from the scripts directory:
+        python -m benchmarks.kalmanFilterBenchmark
+"""
+import os
+import time
+import numpy as np
+from assembly.models.tracking.ocsort.cvKalmanFilter import ConstantVelocityKalmanFilter
+from assembly.models.tracking.ocsort.kalmanfilter import KalmanFilterNew
+from assembly.models.tracking.ocsort.ocsort import OCSort
+
+STEPS = int(os.getenv("BENCHMARK_STEPS", 5000))
+OBJECTS = int(os.getenv("BENCHMARK_OBJECTS", 50))
+FRAMES = int(os.getenv("BENCHMARK_FRAMES", 200))
+
+
+def generic_filter():
+    kf = KalmanFilterNew(dim_x=7, dim_z=4)
+    kf.F = np.array([[1, 0, 0, 0, 1, 0, 0], [0, 1, 0, 0, 0, 1, 0], [0, 0, 1, 0, 0, 0, 1], [
+                    0, 0, 0, 1, 0, 0, 0],  [0, 0, 0, 0, 1, 0, 0], [0, 0, 0, 0, 0, 1, 0], [0, 0, 0, 0, 0, 0, 1]])
+    kf.H = np.array([[1, 0, 0, 0, 0, 0, 0], [0, 1, 0, 0, 0, 0, 0],
+                    [0, 0, 1, 0, 0, 0, 0], [0, 0, 0, 1, 0, 0, 0]])
+    kf.R[2:, 2:] *= 10.
+    kf.P[4:, 4:] *= 1000.
+    kf.P *= 10.
+    kf.Q[-1, -1] *= 0.01
+    kf.Q[4:, 4:] *= 0.01
+    return kf
+
+
+def time_filter(kf, measurements):
+    kf.x[:4] = measurements[0]
+    start = time.perf_counter()
+    for z in measurements[1:]:
+        kf.predict()
+        kf.update(z)
+    return (time.perf_counter() - start) / (len(measurements) - 1) * 1e6
+
+
+def time_tracker(make_tracker):
+    tracker = make_tracker()
+    start = time.perf_counter()
+    for f in range(FRAMES):
+        dets = np.array([[10 + 3 * f, 30 * i, 50 + 3 * f, 30 * i + 25] for i in range(OBJECTS)], dtype=float)
+        tracker.update(dets, np.full(OBJECTS, 0.9), np.zeros(OBJECTS))
+    return (time.perf_counter() - start) / FRAMES * 1e3
+
+
+def main():
+    t = np.arange(STEPS + 1)
+    measurements = [np.array([[100. + 5 * i], [200. + 2 * i], [1600. + 10 * i], [1.]]) for i in t]
+
+    generic = time_filter(generic_filter(), measurements)
+    specialised = time_filter(ConstantVelocityKalmanFilter(), measurements)
+    print(f"KalmanFilterNew predict+update:              {generic:8.2f} us")
+    print(f"ConstantVelocityKalmanFilter predict+update: {specialised:8.2f} us ({generic / specialised:.1f}x)")
+
+    list_ms = time_tracker(lambda: OCSort(det_thresh=0.5, ROI=100000))
+    array_ms = time_tracker(lambda: OCSort(det_thresh=0.5, ROI=100000, track_store="array"))
+    print(f"OCSort update, {OBJECTS} objects, list store:  {list_ms:8.2f} ms")
+    print(f"OCSort update, {OBJECTS} objects, array store: {array_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
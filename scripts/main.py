@@ -9,6 +9,7 @@ from assembly.model_utils.initialize import  GlobalParameters, extractFrameVCO,
 from assembly.model_utils.initiate_loggers import InitLoggers 
 from assembly.model_utils.Visualisor import VisualizeResults
 from assembly.components.FileVideoStream import NodeCommServer, varientchange_server
+from assembly.components.resultPublisher import ResultPublisher
 from assembly.analysis.analysis_logic import AnalysisLogic
 from assembly.interfaces.InterfaceCreation import InterfaceCreation
 from assembly.input_validation.validation import validateInput
@@ -152,7 +153,10 @@ transmitterlog = loggerObj.transmitter_logging()
 #
 try:
     # ImageQserver Starting
-    output_sender = NodeCommServer(exchange_publish_name=GP.EXCHANGE_PUBLISH, publishing_queue=GP.QUEUE_PUBLISH, consuming_queue=consuming_queue, host=pika_host, loggerObj=loggerObj)
+    # Results are published from a background thread, the main loop only enqueues them. They are
+    # spooled to disk while the broker is unreachable
+    spool_path = os.getenv("PUBLISH_SPOOL_PATH", os.path.join(LOGS_DIR, "result_spool.db"))
+    output_sender = ResultPublisher(exchange_publish_name=GP.EXCHANGE_PUBLISH, publishing_queue=GP.QUEUE_PUBLISH, host=pika_host, loggerObj=loggerObj, spool_path=spool_path)
     output_sender.start()
 
     varientchangeServer = varientchange_server(exchange_publish_name= "update_config", publishing_queue = dockerid, consuming_queue= dockerid, host=pika_host, loggerObj=loggerObj)
@@ -119,6 +119,37 @@ def test_create_res_json():
 
     assert result_json == expected_json
 
+def test_forward_batch():
+    mock_model = MagicMock()
+    mock_model.forward_batch.return_value = [(["bbox1", "bbox2"], ["class1", "class2"], [0.9, 0.6]), ([], [], [])]
+
+    interface = AssemblyInterface(model=mock_model, threshold=0.75)
+    results = interface.forward_batch(["image1", "image2"])
+
+    # A single model call, thresholds applied per image
+    mock_model.forward_batch.assert_called_once_with(["image1", "image2"])
+    assert results == [(["bbox1"], ["class1"], [0.9]), ([], [], [])]
+
+def test_forward_batch_without_model_support():
+    mock_model = MagicMock(spec=["preProcess", "forward", "postProcess"])
+    mock_model.postProcess.return_value = (["bbox1"], ["class1"], [0.9])
+
+    interface = AssemblyInterface(model=mock_model, threshold=0.75)
+    results = interface.forward_batch(["image1", "image2"])
+
+    # Falls back to one call per image
+    assert mock_model.forward.call_count == 2
+    assert results == [(["bbox1"], ["class1"], [0.9]), (["bbox1"], ["class1"], [0.9])]
+
+def test_call_with_list():
+    mock_model = MagicMock()
+    mock_model.forward_batch.return_value = [(["bbox1"], ["class1"], [0.9])]
+
+    interface = AssemblyInterface(model=mock_model, threshold=0.75)
+
+    assert interface(["image1"]) == [(["bbox1"], ["class1"], [0.9])]
+    mock_model.forward_batch.assert_called_once_with(["image1"])
+
 # Run the tests
 if __name__ == "__main__":
     pytest.main()
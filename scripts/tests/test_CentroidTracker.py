@@ -90,3 +90,44 @@ def test_run_match_and_update(centroid_tracker):
     assert result[0] == (7, 7, 17, 17)
     assert result[1] == (22, 22, 32, 32)
 
+
+@pytest.fixture
+def assignment_tracker():
+    return CentroidTracker(ROI=100, maxDistance=50, movement_direction='left2right', matcher="assignment")
+
+def test_assignment_matcher_from_env(monkeypatch):
+    monkeypatch.setenv("CENTROID_MATCHER", "assignment")
+    assert CentroidTracker(ROI=100).matcher == "assignment"
+    monkeypatch.delenv("CENTROID_MATCHER")
+    assert CentroidTracker(ROI=100).matcher == "greedy"
+
+def test_assignment_run_match_and_update(centroid_tracker, assignment_tracker):
+    frames = [[(5, 5, 15, 15), (20, 20, 30, 30)], [(22, 22, 32, 32), (7, 7, 17, 17)], [(40, 24, 50, 34), (24, 7, 34, 17)], [], [(60, 5, 70, 15)]]
+    for dets in frames:
+        expected = centroid_tracker.run(dets, [], [])
+        result = assignment_tracker.run(dets, [], [])
+        assert result == expected
+        assert list(result) == list(expected)
+
+def test_assignment_run_deregister(assignment_tracker):
+    assignment_tracker.run([(5, 5, 15, 15), (20, 20, 30, 30)], [], [])
+    assert assignment_tracker.run([], [], []) == {}
+    assert len(assignment_tracker.objectIDs) == 0
+    assert assignment_tracker.prev_boxes == []
+
+def test_assignment_is_optimal(centroid_tracker, assignment_tracker):
+    # Two lanes: the greedy matching gives object 0 to the first box that moved forward (x=35,
+    # in the lane of object 1), the assignment keeps each object in its lane
+    frames = [[(0, 0, 20, 20), (20, 90, 40, 110)], [(25, 90, 45, 110), (45, 0, 65, 20)]]
+    for dets in frames:
+        greedy = centroid_tracker.run(dets, [], [])
+        result = assignment_tracker.run(dets, [], [])
+    assert greedy == {0: (25, 90, 45, 110), 1: (45, 0, 65, 20)}
+    assert result == {0: (45, 0, 65, 20), 1: (25, 90, 45, 110)}
+
+def test_assignment_many_objects():
+    tracker = CentroidTracker(ROI=10000, maxDistance=60, matcher="assignment")
+    for f in range(5):
+        dets = [(20 * f + (i % 7) * 70, 30 * i, 20 * f + (i % 7) * 70 + 40, 30 * i + 25) for i in range(150)]
+        result = tracker.run(dets, [], [])
+    assert sorted(result) == list(range(150))
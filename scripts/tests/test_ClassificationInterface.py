@@ -0,0 +1,41 @@
+import pytest
+from unittest.mock import MagicMock
+
+# Import the ClassificationInterface class
+from assembly.interfaces.classifitcaionInterface import ClassificationInterface
+
+def test_call():
+    mock_model = MagicMock()
+    mock_model.preProcess.return_value = "preprocessed_image"
+    mock_model.forward.return_value = "pred_output"
+    mock_model.postProcess.return_value = ("class1", 0.9)
+
+    interface = ClassificationInterface(model=mock_model, threshold=0.5, loggerObj=None)
+    class_name, class_conf = interface("image")
+
+    mock_model.preProcess.assert_called_once_with("image")
+    mock_model.forward.assert_called_once_with("preprocessed_image")
+    mock_model.postProcess.assert_called_once_with("pred_output")
+    assert (class_name, class_conf) == ("class1", 0.9)
+
+def test_forward_batch():
+    mock_model = MagicMock()
+    mock_model.forward_batch.return_value = [("class1", 0.9), ("class2", 0.8)]
+
+    interface = ClassificationInterface(model=mock_model, threshold=0.5, loggerObj=None)
+    results = interface(["image1", "image2"])
+
+    # A single model call for all the images
+    mock_model.forward_batch.assert_called_once_with(["image1", "image2"])
+    assert results == [("class1", 0.9), ("class2", 0.8)]
+
+def test_forward_batch_without_model_support():
+    mock_model = MagicMock(spec=["preProcess", "forward", "postProcess"])
+    mock_model.postProcess.return_value = ("class1", 0.9)
+
+    interface = ClassificationInterface(model=mock_model, threshold=0.5, loggerObj=None)
+    results = interface.forward_batch(["image1", "image2"])
+
+    # Falls back to one call per image
+    assert mock_model.forward.call_count == 2
+    assert results == [("class1", 0.9), ("class1", 0.9)]
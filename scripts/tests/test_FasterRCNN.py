@@ -102,3 +102,22 @@ def test_warm_up(faster_rcnn_instance):
     with patch.object(faster_rcnn_instance, 'forward', return_value=None) as mock_forward:
         faster_rcnn_instance.warm_up()
         assert mock_forward.call_count == 2  # Because warm_up calls forward twice
+
+@patch('assembly.models.detection.Frcnn_model.FasterRCNN.preProcess', side_effect=lambda image: {"image": image})
+def test_forward_batch(faster_rcnn_preprocess, faster_rcnn_instance):
+    # Mock the model to return one output per input
+    mock_output = {
+        "instances": MagicMock(
+            pred_boxes=MagicMock(tensor=torch.tensor([[10, 10, 50, 50]])),
+            pred_classes=torch.tensor([1]),
+            scores=torch.tensor([0.99])
+        )
+    }
+    faster_rcnn_instance.model = MagicMock(return_value=[mock_output, mock_output])
+
+    results = faster_rcnn_instance(["image1", "image2"])
+
+    # A single model call with all the inputs
+    faster_rcnn_instance.model.assert_called_once_with([{"image": "image1"}, {"image": "image2"}])
+    assert len(results) == 2
+    assert list(results[0][1]) == ["class2"]
@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 from unittest.mock import MagicMock, patch
 
 # Import the Interface class and dependencies to be mocked
@@ -107,6 +108,151 @@ def test_interface(mock_assembly, mock_inference, mock_tracker):
     assert 'cropping' in result
     assert object_count == 1
 
+@patch('assembly.interfaces.interface.TrackerInterface', autospec=True)
+@patch('assembly.interfaces.interface.inferenceInterface', autospec=True)
+@patch('assembly.interfaces.interface.AssemblyInterface', autospec=True)
+def test_interface_with_batched_detections(mock_assembly, mock_inference, mock_tracker):
+    mock_tracker_instance = mock_tracker.return_value
+    mock_tracker_instance.run.return_value = ({}, 0)
+
+    interface = Interface(group_info=group_info_mock, ModelDict=ModelDict_mock, TrackerDict=TrackerDict_mock, camera_id="camera1")
+    assert interface.tracker_model_id == "tracker_model_id"
+
+    mock_image = MagicMock()
+    result, object_count = interface.run(mock_image, detections=(["bboxes"], ["classes"], ["scores"]))
+
+    # The tracker model is not run again when the detections are given
+    mock_assembly.return_value.assert_not_called()
+    mock_tracker_instance.run.assert_called_once_with([mock_image], ["bboxes"], ["classes"], ["scores"])
+    assert object_count == 0
+
+@patch('assembly.interfaces.interface.TrackerInterface', autospec=True)
+@patch('assembly.interfaces.interface.inferenceInterface', autospec=True)
+@patch('assembly.interfaces.interface.AssemblyInterface', autospec=True)
+def test_interface_detect_every(mock_assembly, mock_inference, mock_tracker):
+    mock_tracker_instance = mock_tracker.return_value
+    mock_tracker_instance.run.return_value = ({}, 0)
+    mock_tracker_instance.coast.return_value = ({}, 0)
+    mock_tracker_instance.canPredict.return_value = True
+    mock_tracker_instance.hasTentativeTracks.return_value = False
+    mock_tracker_instance.approachingRoi.return_value = False
+    mock_assembly.return_value.return_value = ([], [], [])
+    group_info = dict(group_info_mock, tracker=dict(group_info_mock["tracker"], detect_every=3, roi_guard=10))
+
+    interface = Interface(group_info=group_info, ModelDict=ModelDict_mock, TrackerDict=TrackerDict_mock, camera_id="camera1")
+    assert (interface.detect_every, interface.roi_guard) == (3, 10)
+    for _ in range(6):
+        interface.run(MagicMock())
+    # Detection on frames 0 and 3, the other frames are coasted
+    assert mock_assembly.return_value.call_count == 2
+    assert mock_tracker_instance.coast.call_count == 4
+    mock_tracker_instance.approachingRoi.assert_called_with(steps=1, guard=10)
+
+    # An object about to cross the ROI forces the detection
+    mock_tracker_instance.approachingRoi.return_value = True
+    interface.run(MagicMock())
+    assert mock_assembly.return_value.call_count == 3
+    assert interface.frames_since_detection == 0
+
+def test_interface_detection_band():
+    tracker_model = MagicMock()
+    tracker_model.forward_batch = None
+    group_info = {"steps": ["tracker"], "tracker": {"model_id": "tracker_model_id", "roi": {"line": 300, "direction": "left2right"}, "detection_band": 100}, "cropping": {}}
+    tracker = MagicMock()
+    tracker.run.return_value = {}
+    interface = Interface(group_info=group_info, ModelDict={"tracker_model_id": tracker_model}, TrackerDict={"camera1": tracker}, camera_id="camera1")
+
+    image = np.zeros((200, 1000, 3), dtype=np.uint8)
+    band, offset = interface.bandImage(image)
+    assert band.shape == (200, 200, 3) and offset == (200, 0)
+    assert interface.remapDetections(([[10, 20, 30, 40]], ["part"], [0.9]), (200, 0, 1., 1.)) == ([[210, 20, 230, 40]], ["part"], [0.9])
+
+    # Fraction of the frame, clipped to the frame
+    interface.detection_band = 0.5
+    band, offset = interface.bandImage(image)
+    assert band.shape == (200, 800, 3) and offset == (0, 0)
+
+    # The tracker model only sees the band, the tracker gets frame coordinates
+    interface.detection_band = 100
+    tracker_model.preProcess.return_value = "input"
+    tracker_model.postProcess.return_value = ([[10, 20, 30, 40]], ["part"], [0.9])
+    interface.run(image)
+    assert tracker_model.preProcess.call_args.args[0].shape == (200, 200, 3)
+    assert tracker.run.call_args.args[0] == [[210, 20, 230, 40]]
+
+def test_interface_tracker_scale():
+    tracker_model = MagicMock()
+    group_info = {"steps": ["tracker"], "tracker": {"model_id": "tracker_model_id", "roi": {"line": 300, "direction": "up2down"}, "detection_band": 100, "tracker_scale": 0.25}, "cropping": {}}
+    tracker = MagicMock()
+    interface = Interface(group_info=group_info, ModelDict={"tracker_model_id": tracker_model}, TrackerDict={"camera1": tracker}, camera_id="camera1")
+
+    image = np.zeros((1000, 800, 3), dtype=np.uint8)
+    tracker_input, transform = interface.trackerInput(image)
+    assert tracker_input.shape == (50, 200, 3)
+    assert transform == (0, 200, 0.25, 0.25)
+    assert interface.remapDetections(([[10, 5, 30, 45]], ["part"], [0.9]), transform)[0] == [[40, 220, 120, 380]]
+
+    # Crossing boxes are cropped from the full resolution frame
+    tracker_model.forward_batch = None
+    tracker_model.preProcess.return_value = "input"
+    tracker_model.postProcess.return_value = ([[10, 5, 30, 45]], ["part"], [0.9])
+    tracker.run.return_value = {1: [40, 220, 120, 380]}
+    result, _ = interface.run(image)
+    assert tracker_model.preProcess.call_args.args[0].shape == (50, 200, 3)
+    assert tracker.run.call_args.args[0] == [[40, 220, 120, 380]]
+    assert result["tracker"] == [[40, 220, 120, 380]]
+
+def test_interface_visualization_policy(monkeypatch):
+    group_info = {"steps": [], "cropping": {}}
+    assert Interface(group_info=group_info, ModelDict={}, TrackerDict={}, camera_id="camera1").visualization == "always"
+    monkeypatch.setenv("VISUALIZATION_MODE", "never")
+    assert Interface(group_info=group_info, ModelDict={}, TrackerDict={}, camera_id="camera1").visualization == "never"
+    group_info["visualization"] = "on_fail"
+    assert Interface(group_info=group_info, ModelDict={}, TrackerDict={}, camera_id="camera1").visualization == "on_fail"
+    group_info["visualization"] = "sometimes"
+    with pytest.raises(ValueError):
+        Interface(group_info=group_info, ModelDict={}, TrackerDict={}, camera_id="camera1")
+
+def test_interface_shared_model_batching():
+    # Two rois using the same model with different thresholds and one roi with its own model
+    def roi_info(model_id, score_thresh, roi):
+        return {"ground_truth": {}, "model_1": [{"model_id": model_id, "threshold": {"score_thresh": score_thresh}, "type": "detection"}], "model_2": [], "roi": roi}
+    group_info = {
+        "steps": ["cropping"],
+        "cropping": {
+            "roi_id_1": roi_info("shared_model_id", 0.5, [0, 0, 50, 50]),
+            "roi_id_2": roi_info("other_model_id", 0.5, [0, 0, 100, 100]),
+            "roi_id_3": roi_info("shared_model_id", 0.9, [50, 50, 100, 100])
+        }
+    }
+    shared_model = MagicMock()
+    shared_model.forward_batch.return_value = [
+        ([[0, 0, 10, 10]], ["part"], [0.8]),
+        ([[1, 1, 5, 5], [2, 2, 6, 6]], ["part", "part"], [0.8, 0.95])
+    ]
+    other_model = MagicMock()
+    other_model.preProcess.return_value = "input"
+    other_model.postProcess.return_value = ([[20, 20, 30, 30]], ["part"], [0.6])
+    ModelDict = {"shared_model_id": shared_model, "other_model_id": other_model}
+
+    interface = Interface(group_info=group_info, ModelDict=ModelDict, TrackerDict={}, camera_id="camera1")
+    assert interface.shared_models == {"shared_model_id": ["roi_id_1", "roi_id_3"], "other_model_id": ["roi_id_2"]}
+
+    image = np.zeros((100, 100, 3), dtype=np.uint8)
+    result, object_count = interface.run(image)
+
+    # One batched call for the two rois sharing the model
+    shared_model.forward_batch.assert_called_once()
+    crops = shared_model.forward_batch.call_args.args[0]
+    assert [crop.shape for crop in crops] == [(50, 50, 3), (50, 50, 3)]
+
+    # Threshold and retrace offsets of each roi, order of the rois kept
+    roi_res = result["cropping"][0]
+    assert list(roi_res.keys()) == ["roi_id_1", "roi_id_2", "roi_id_3"]
+    assert [det["box"] for det in roi_res["roi_id_1"]["detection"]["part"]] == [[0, 0, 10, 10]]
+    assert [det["box"] for det in roi_res["roi_id_2"]["detection"]["part"]] == [[20, 20, 30, 30]]
+    assert [det["box"] for det in roi_res["roi_id_3"]["detection"]["part"]] == [[52, 52, 56, 56]]
+
 # Run the test
 if __name__ == "__main__":
     pytest.main()
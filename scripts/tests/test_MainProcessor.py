@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, patch
 import numpy as np
 from collections import OrderedDict
 import cv2
+import queue
 from assembly.components.mainProcessor import MainProcessor
 
 @pytest.fixture
@@ -59,7 +60,6 @@ def test_extract_frame_from_queue(setup_processor):
     processor, mocks = setup_processor
 
     # Mock the shared queue to return a frame
-    mocks['shared_queue_mock'].empty.return_value = False
     mock_image = np.zeros((100, 100), dtype=np.uint8)
     frame_info = {
         "beltId": "camera_1",
@@ -77,6 +77,88 @@ def test_extract_frame_from_queue(setup_processor):
 
 
 
+def test_extract_frame_from_shared_memory(setup_processor):
+    processor, mocks = setup_processor
+
+    # Mock the shared queue to return a frame header without the image
+    mock_image = np.full((100, 100), 3, dtype=np.uint8)
+    frame_info = {
+        "beltId": "camera_1",
+        "transmitter_id": "transmitter1",
+        "slot": 0,
+        "frame_count": 1
+    }
+    mocks['shared_queue_mock'].get.return_value = frame_info
+    frame_buffer_mock = MagicMock()
+    frame_buffer_mock.read.return_value = mock_image
+    mocks['transmitter_manager_mock'].frame_buffers = {"transmitter1": frame_buffer_mock}
+
+    # Call the method
+    img_master = processor.extract_frame_from_queue()
+
+    # The pixels are read from the slot and the slot is given back
+    frame_buffer_mock.read.assert_called_once_with(frame_info)
+    frame_buffer_mock.release.assert_called_once_with(frame_info)
+    assert np.array_equal(img_master["camera_1"]["image"], cv2.merge([mock_image, mock_image, mock_image]))
+
+
+def test_extract_frame_releases_slot_on_error(setup_processor):
+    processor, mocks = setup_processor
+
+    frame_info = {"beltId": "camera_1", "transmitter_id": "transmitter1", "slot": 0, "frame_count": 1}
+    mocks['shared_queue_mock'].get.return_value = frame_info
+    frame_buffer_mock = MagicMock()
+    mocks['transmitter_manager_mock'].frame_buffers = {"transmitter1": frame_buffer_mock}
+
+    # The merge fails, the slot is still given back
+    with patch("assembly.components.mainProcessor.cv2.merge", side_effect=cv2.error("merge failed")):
+        with pytest.raises(cv2.error):
+            processor.extract_frame_from_queue()
+    frame_buffer_mock.release.assert_called_once_with(frame_info)
+
+
+def test_extract_frame_from_empty_queue(setup_processor):
+    processor, mocks = setup_processor
+
+    # Nothing arrives within the timeout
+    mocks['shared_queue_mock'].get.side_effect = queue.Empty
+
+    assert processor.extract_frame_from_queue(timeout=0.1) == {}
+    mocks['shared_queue_mock'].get.assert_called_once_with(timeout=0.1)
+
+
+def test_variant_change_only_when_signalled(setup_processor):
+    processor, mocks = setup_processor
+
+    mocks['shared_queue_mock'].get.side_effect = [queue.Empty, queue.Empty]  # Stops at the third read
+    mocks['varientchangeServer_mock'].message_event.is_set.return_value = False
+
+    processor.run()
+
+    # The broker is never polled from the main loop
+    mocks['varientchangeServer_mock'].start_consumer.assert_called_once()
+    mocks['varientchangeServer_mock'].get_message.assert_not_called()
+    mocks['varientchangeServer_mock'].read.assert_not_called()
+
+
+def test_extract_batch_from_queue(setup_processor):
+    processor, mocks = setup_processor
+
+    processor.batchScheduler.max_batch = 3
+    frames = [{"beltId": "camera_1", "image": np.zeros((10, 10), dtype=np.uint8), "frame_count": count} for count in range(3)]
+    mocks['shared_queue_mock'].get.side_effect = frames + [queue.Empty]
+
+    batch = processor.extract_batch_from_queue()
+
+    # Stops at the maximum batch size
+    assert [camera_id for camera_id, _ in batch] == ["camera_1"] * 3
+    assert [input_data["frame_count"] for _, input_data in batch] == [0, 1, 2]
+
+    # Stops when no more frames arrive within the wait
+    mocks['shared_queue_mock'].get.side_effect = frames[:1] + [queue.Empty]
+    assert len(processor.extract_batch_from_queue()) == 1
+
+
 def test_analyse(setup_processor):
     processor, mocks = setup_processor
 
@@ -103,7 +185,6 @@ def test_run(setup_processor):
     processor, mocks = setup_processor
 
     # Mock shared_queue to return frames
-    mocks['shared_queue_mock'].empty.side_effect = [False, True]  # Process once then stop
     mock_image = np.zeros((100, 100), dtype=np.uint8)
     frame_info = {
         "beltId": "camera_1",
@@ -112,20 +193,24 @@ def test_run(setup_processor):
         "groupId": "group_1",
         "iterator": 0
     }
-    mocks['shared_queue_mock'].get.return_value = frame_info
+    mocks['shared_queue_mock'].get.side_effect = [frame_info]  # Process once then stop
 
     # Mock analysis logic to return some fake results
     mocks['analysisLogic_mock'].return_value = ({"roi": [(0, 0, 50, 50)], "direction": "horizontal", "result": "some_result"}, 1)
 
     # Mock output preparation
-    mocks['outputprepObj_mock'].run.return_value = {"final_result": "some_output"}
-    mocks['outputprepObj_mock'].final_prep.return_value = {"final_result": "some_output"}
+    mocks['outputprepObj_mock'].run.return_value = {"isPathUsed": True, "result": [], "cameraId": "camera_1"}
+    mocks['outputprepObj_mock'].final_prep.return_value = {"isPathUsed": True, "result": [], "cameraId": "camera_1"}
 
     # Mock visualisation to return an image
     mocks['visualisor_mock'].draw.return_value = mock_image
 
     # Mock variant change handling to prevent test interference
-    mocks['varientchangeServer_mock'].read.return_value = None
+    mocks['varientchangeServer_mock'].get_message.return_value = None
+
+    # Single frame batches, the interface has no tracker
+    processor.batchScheduler.max_batch = 1
+    mocks['GP_mock'].interfaceObjs["camera_1"][0].tracker_status = False
 
     # Run the processor for a short duration to test
     with patch('time.sleep', return_value=None):  # Speed up the loop
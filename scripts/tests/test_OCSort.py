@@ -17,6 +17,7 @@ def mock_kalman_box_tracker():
         instance.predict.return_value = [np.array([10, 10, 20, 20])]
         instance.update.return_value = None
         instance.time_since_update = 0
+        instance.coasted = 0
         instance.hit_streak = 0
         instance.hits = 0
         instance.age = 0
@@ -139,3 +140,122 @@ def test_kalman_filter_get_state(mock_kalman_box_tracker):
     state = tracker.get_state()
     assert state.shape == (1, 4)
 
+
+def moving_boxes(frames, n_obj=6, drop=None):
+    # n_obj boxes moving right by 5 px per frame, object `drop` is missing on frames 4 and 5
+    sequence = []
+    for f in range(frames):
+        boxes = np.array([[10 + 5 * f, 60 * i, 50 + 5 * f, 60 * i + 40] for i in range(n_obj) if not (i == drop and f in (4, 5))], dtype=float)
+        sequence.append((boxes, np.full(len(boxes), 0.9), np.arange(len(boxes), dtype=float)))
+    return sequence
+
+def test_array_track_store_matches_list_store():
+    list_sort = OCSort(det_thresh=0.5, ROI=300)
+    array_sort = OCSort(det_thresh=0.5, ROI=300, track_store="array")
+    for dets, confs, classes in moving_boxes(frames=12):
+        list_res = list_sort.update(dets, confs, classes)
+        array_res = array_sort.update(dets, confs, classes)
+        assert np.allclose(list_res, array_res)
+    assert array_sort.store.n == len(list_sort.trackers)
+    assert np.allclose(array_sort.store.x[:array_sort.store.n], np.array([trk.kf.x[:, 0] for trk in list_sort.trackers]))
+    assert array_sort.BBox == list_sort.BBox
+
+def test_array_track_store_refinds_lost_track():
+    array_sort = OCSort(det_thresh=0.5, ROI=300, track_store="array")
+    for f, (dets, confs, classes) in enumerate(moving_boxes(frames=10, drop=2)):
+        result = array_sort.update(dets, confs, classes)
+    # The track missed for two frames keeps its id after the online smoothing
+    assert sorted(result[:, 4].astype(int).tolist()) == [1, 2, 3, 4, 5, 6]
+    assert not array_sort.store.frozen[:array_sort.store.n].any()
+
+def test_list_track_store_refinds_lost_track():
+    list_sort = OCSort(det_thresh=0.5, ROI=300)
+    array_sort = OCSort(det_thresh=0.5, ROI=300, track_store="array")
+    for dets, confs, classes in moving_boxes(frames=10, drop=2):
+        list_res = list_sort.update(dets, confs, classes)
+        array_res = array_sort.update(dets, confs, classes)
+        assert np.allclose(list_res, array_res)
+    assert sorted(list_res[:, 4].astype(int).tolist()) == [1, 2, 3, 4, 5, 6]
+
+def test_observation_buffer_keeps_last_ages():
+    from assembly.models.tracking.ocsort.ocsort import ObservationBuffer, k_previous_obs
+    observations = ObservationBuffer(3)
+    for age in (0, 1, 2, 4, 5):
+        observations[age] = np.full(5, age)
+    assert len(observations) == 3
+    # Slot age % 3: ages 4 and 5 replaced 1 and 2
+    assert sorted(observations.keys()) == [0, 4, 5]
+    assert 2 not in observations and 4 in observations
+    assert observations[4][0] == 4
+    # Same lookups as with the unbounded dict
+    assert k_previous_obs(observations, 7, 3)[0] == 4
+    assert k_previous_obs(observations, 10, 3)[0] == 5
+
+@pytest.mark.parametrize("track_store", ["list", "array"])
+def test_memory_stays_bounded(track_store):
+    tracker = OCSort(det_thresh=0.5, ROI=300, track_store=track_store)
+    stats = []
+    for f, (dets, confs, classes) in enumerate(moving_boxes(frames=60)):
+        # Slow moving objects stay tracked for the whole run
+        dets[:, [0, 2]] -= 4.9 * f
+        tracker.update(dets, confs, classes)
+        stats.append(tracker.memory_stats())
+    assert stats[-1]["tracks"] == 6
+    assert stats[-1]["bbox_entries"] == 6
+    assert stats[-1]["stored_boxes"] == stats[20]["stored_boxes"]
+    assert stats[-1]["bytes"] == stats[20]["bytes"]
+
+def test_bboxes_only_keep_live_tracks():
+    tracker = OCSort(det_thresh=0.5, ROI=300, max_age=1)
+    for dets, confs, classes in moving_boxes(frames=5):
+        tracker.update(dets, confs, classes)
+    # Objects 0-2 leave, their tracks die after max_age frames
+    for dets, confs, classes in moving_boxes(frames=10)[5:]:
+        tracker.update(dets[3:], confs[3:], classes[3:])
+    assert set(tracker.BBox) == tracker.live_ids() == {4, 5, 6}
+
+@pytest.mark.parametrize("track_store", ["list", "array"])
+def test_coast_and_peek(track_store):
+    tracker = OCSort(det_thresh=0.5, ROI=300, track_store=track_store)
+    for dets, confs, classes in moving_boxes(frames=6):
+        tracker.update(dets, confs, classes)
+    assert tracker.tentative_tracks() == 0
+    ahead = tracker.peek(steps=2)
+    # Peek does not change the tracks, two coasted frames end up at the peeked boxes
+    assert np.allclose(tracker.peek(steps=2), ahead)
+    tracker.coast()
+    tracker.coast()
+    assert np.allclose(tracker.peek(steps=0), ahead)
+    assert np.allclose(ahead[:, 0], 10 + 5 * 7, atol=0.5)
+    # Tracks are found again after the coasted frames
+    dets, confs, classes = moving_boxes(frames=9)[8]
+    res = tracker.update(dets, confs, classes)
+    assert sorted(res[:, 4].astype(int).tolist()) == [1, 2, 3, 4, 5, 6]
+
+@pytest.mark.parametrize("track_store", ["list", "array"])
+def test_coasted_frames_count_towards_max_age(track_store):
+    tracker = OCSort(det_thresh=0.5, ROI=300, max_age=5, track_store=track_store)
+    for dets, confs, classes in moving_boxes(frames=5):
+        tracker.update(dets, confs, classes)
+    # Objects 0-2 leave, detection runs every third frame
+    for f, (dets, confs, classes) in enumerate(moving_boxes(frames=17)[5:]):
+        if f % 3:
+            tracker.coast()
+        else:
+            tracker.update(dets[3:], confs[3:], classes[3:])
+        if f == 3:
+            # 4 frames since the last update, still alive
+            assert tracker.live_ids() == {1, 2, 3, 4, 5, 6}
+    # Removed after max_age frames, not max_age detected frames
+    assert tracker.live_ids() == {4, 5, 6}
+
+def test_coast_matches_between_stores():
+    list_sort = OCSort(det_thresh=0.5, ROI=300)
+    array_sort = OCSort(det_thresh=0.5, ROI=300, track_store="array")
+    for f, (dets, confs, classes) in enumerate(moving_boxes(frames=15)):
+        if f > 3 and f % 3:
+            list_sort.coast()
+            array_sort.coast()
+            assert np.allclose(list_sort.peek(), array_sort.peek())
+            continue
+        assert np.allclose(list_sort.update(dets, confs, classes), array_sort.update(dets, confs, classes))
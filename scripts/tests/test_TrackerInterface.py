@@ -81,6 +81,58 @@ def test_draw_roi_method():
     # We should visually inspect the frame or analyze the pixel values in a more advanced test
     assert frame_with_roi is not None
 
+def test_queue_follows_live_ids():
+    mock_tracker = MagicMock()
+    mock_tracker.run.return_value = {1: (100, 100, 200, 200), 2: (100, 300, 200, 400)}
+    mock_tracker.live_ids.return_value = {1, 2, 3}
+    tracker_interface = TrackerInterface(tracker=mock_tracker, roi=150, dir="up2down")
+    tracker_interface.run(None, [], [], [])
+    assert list(tracker_interface.queue) == [1, 2]
+
+    # Object 2 is no longer tracked, object 1 is still tracked but not returned in this frame
+    mock_tracker.run.return_value = {}
+    mock_tracker.live_ids.return_value = {1}
+    tracker_interface.run(None, [], [], [])
+    assert list(tracker_interface.queue) == [1]
+    assert tracker_interface.queue.maxlen == 25
+
+    # An id reused by the tracker is analysed again
+    mock_tracker.run.return_value = {2: (100, 300, 200, 400)}
+    mock_tracker.live_ids.return_value = {1, 2}
+    result, object_count = tracker_interface.run(None, [], [], [])
+    assert result == {2: (100, 300, 200, 400)}
+    assert object_count == 3
+
+def test_memory_stats():
+    mock_tracker = MagicMock()
+    mock_tracker.memory_stats.return_value = {"tracks": 2}
+    tracker_interface = TrackerInterface(tracker=mock_tracker, roi=150, dir="up2down")
+    tracker_interface.queue.append(0)
+    assert tracker_interface.memory_stats() == {"tracks": 2, "analysed_ids": 1}
+
+def test_approaching_roi():
+    mock_tracker = MagicMock()
+    mock_tracker.peek.return_value = {1: (100, 100, 200, 140), 2: (100, 10, 200, 50)}
+    tracker_interface = TrackerInterface(tracker=mock_tracker, roi=150, dir="up2down")
+    assert tracker_interface.canPredict()
+    # Centre of object 1 is predicted at 120, before the ROI
+    assert not tracker_interface.approachingRoi(steps=3)
+    mock_tracker.peek.assert_called_with(3)
+    assert tracker_interface.approachingRoi(steps=3, guard=30)
+    # Analysed objects are not counted again
+    mock_tracker.peek.return_value = {1: (100, 140, 200, 180)}
+    assert tracker_interface.approachingRoi(steps=3)
+    tracker_interface.queue.append(1)
+    assert not tracker_interface.approachingRoi(steps=3)
+
+def test_coast():
+    mock_tracker = MagicMock()
+    tracker_interface = TrackerInterface(tracker=mock_tracker, roi=150, dir="down2up")
+    tracker_interface.object_count = 4
+    assert tracker_interface.coast() == ({}, 4)
+    mock_tracker.coast.assert_called_once()
+    assert not TrackerInterface(tracker=object(), roi=150, dir="down2up").canPredict()
+
 # Run the test
 if __name__ == "__main__":
     pytest.main()
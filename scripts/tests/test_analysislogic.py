@@ -58,6 +58,24 @@ def test_analysis_success(analysis_logic_instance, mock_gp):
     mock_gp.interfaceObjs[camera_id][int(input_data["iterator"])].run.assert_called_once_with(image=input_data["image"])
     analysis_logic_instance.loggerObj.loop_logger.info.assert_called_with("[INFO] Image Analysis Done again!")
 
+def test_analysis_with_detections(analysis_logic_instance, mock_gp):
+    """Test that detections computed by the batch scheduler are passed to the interface."""
+    input_data = {
+        "image": MagicMock(),
+        "beltId": 1,
+        "groupId": 123,
+        "iterator": 0,
+        "configId": "config123",
+        "groupLimit": 5,
+        "extraInfo": "extra_info"
+    }
+    detections = (["bbox"], ["class"], [0.9])
+
+    result, object_count = analysis_logic_instance(mock_gp, input_data, 1, detections=detections)
+
+    assert object_count == 5
+    mock_gp.interfaceObjs[1][0].run.assert_called_once_with(image=input_data["image"], detections=detections)
+
 def test_analysis_exception_handling(analysis_logic_instance, mock_gp, mock_logger):
     """Test the __call__ method for handling exceptions during image analysis."""
     # Mock input data
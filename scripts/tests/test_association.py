@@ -0,0 +1,50 @@
+import numpy as np
+from assembly.models.tracking.ocsort.association import (iou_batch, giou_batch, diou_batch, ciou_batch,
+    linear_assignment, associate, associate_detections_to_trackers)
+
+
+def test_iou_batch():
+    bboxes1 = np.array([[0, 0, 10, 10], [20, 20, 30, 30]], dtype=float)
+    bboxes2 = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [100, 100, 110, 110]], dtype=float)
+    iou = iou_batch(bboxes1, bboxes2)
+    assert np.allclose(iou, [[1, 50 / 150, 0], [0, 0, 0]])
+    # The result is not one of the reused buffers
+    assert not np.shares_memory(iou, iou_batch(bboxes2, bboxes1))
+
+
+def test_cost_functions_in_range():
+    bboxes1 = np.array([[0, 0, 10, 10], [20, 20, 30, 40]], dtype=float)
+    bboxes2 = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [100, 100, 110, 110]], dtype=float)
+    for function in (giou_batch, diou_batch):
+        cost = function(bboxes1, bboxes2)
+        assert cost.shape == (2, 3)
+        assert np.isclose(cost[0, 0], 1) and np.all((cost >= 0) & (cost <= 1))
+    # CIOU is undefined (0/0) for identical boxes
+    cost = ciou_batch(bboxes1 + 1, bboxes2)
+    assert cost.shape == (2, 3) and np.all((cost >= 0) & (cost <= 1))
+
+
+def test_linear_assignment():
+    cost = np.array([[4., 1., 3.], [2., 0., 5.]])
+    assert linear_assignment(cost).tolist() == [[0, 1], [1, 0]]
+    assert linear_assignment(np.empty((0, 3))).shape == (0, 2)
+
+
+def test_unmatched_indices_order():
+    trackers = np.array([[0, 0, 10, 10, 0], [50, 50, 60, 60, 0], [100, 100, 110, 110, 0]], dtype=float)
+    detections = np.array([[200, 200, 210, 210, 0.9], [101, 101, 111, 111, 0.9], [0, 0, 10, 10, 0.9]])
+    matches, unmatched_dets, unmatched_trks = associate_detections_to_trackers(detections, trackers, 0.3)
+    assert matches.tolist() == [[1, 2], [2, 0]]
+    assert unmatched_dets.tolist() == [0]
+    assert unmatched_trks.tolist() == [1]
+
+
+def test_associate_filters_low_iou():
+    trackers = np.array([[0, 0, 10, 10, 0], [8, 0, 18, 10, 0]], dtype=float)
+    detections = np.array([[1, 0, 11, 10, 0.9], [9, 0, 19, 10, 0.9]])
+    velocities = np.zeros((2, 2))
+    matches, unmatched_dets, unmatched_trks = associate(detections, trackers, 0.9, velocities, trackers, 0.2)
+    # Both pairs are assigned but below the threshold
+    assert matches.shape == (0, 2)
+    assert sorted(unmatched_dets.tolist()) == [0, 1]
+    assert sorted(unmatched_trks.tolist()) == [0, 1]
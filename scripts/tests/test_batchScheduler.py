@@ -0,0 +1,79 @@
+import pytest
+from unittest.mock import MagicMock
+from assembly.components.batchScheduler import BatchScheduler
+
+
+def make_interface(tracker_status, model_id=None):
+    interface = MagicMock()
+    interface.tracker_status = tracker_status
+    interface.tracker_model_id = model_id
+    interface.trackerInput.side_effect = lambda image: (image, (0, 0, 1., 1.))
+    interface.remapDetections.side_effect = lambda detections, transform: detections
+    return interface
+
+
+@pytest.fixture
+def scheduler():
+    GP_mock = MagicMock()
+    GP_mock.interfaceObjs = {
+        "camera_1": [make_interface(True, "model_a")],
+        "camera_2": [make_interface(True, "model_a"), make_interface(True, "model_b")],
+        "camera_3": [make_interface(False)]
+    }
+    return BatchScheduler(GP=GP_mock, loggerObj=MagicMock(), max_batch=8, max_wait_ms=10)
+
+
+def frame(image, iterator=0):
+    return {"image": image, "iterator": iterator}
+
+
+def test_init_from_env(monkeypatch):
+    monkeypatch.setenv("BATCH_MAX_SIZE", "6")
+    monkeypatch.setenv("BATCH_MAX_WAIT_MS", "20")
+    scheduler = BatchScheduler(GP=MagicMock(), loggerObj=MagicMock())
+    assert scheduler.max_batch == 6
+    assert scheduler.max_wait == 0.02
+
+
+def test_group_by_tracker_model(scheduler):
+    batch = [("camera_1", frame("img1")), ("camera_3", frame("img3")), ("camera_2", frame("img2", 1)), ("camera_2", frame("img4"))]
+
+    groups = scheduler.group(batch)
+
+    # Frames without tracker are left out
+    assert groups == {"model_a": [0, 3], "model_b": [2]}
+
+
+def test_group_skips_coasted_frames(scheduler):
+    scheduler.GP.interfaceObjs["camera_2"][1].needsDetection.return_value = False
+    batch = [("camera_1", frame("img1")), ("camera_2", frame("img2", 1)), ("camera_2", frame("img4"))]
+
+    # Frame of camera_2 served by the tracker prediction is not detected
+    assert scheduler.group(batch) == {"model_a": [0, 2]}
+
+
+def test_run_scatters_detections(scheduler):
+    interfaces = scheduler.GP.interfaceObjs
+    interfaces["camera_1"][0].tracker_model.forward_batch.return_value = [(["box1"], ["class1"], [0.9]), (["box4"], ["class4"], [0.8])]
+    interfaces["camera_2"][1].tracker_model.forward_batch.return_value = [(["box2"], ["class2"], [0.7])]
+    batch = [("camera_1", frame("img1")), ("camera_3", frame("img3")), ("camera_2", frame("img2", 1)), ("camera_2", frame("img4"))]
+
+    detections = scheduler.run(batch)
+
+    # One batched call per model
+    interfaces["camera_1"][0].tracker_model.forward_batch.assert_called_once_with(images=["img1", "img4"])
+    interfaces["camera_2"][1].tracker_model.forward_batch.assert_called_once_with(images=["img2"])
+    interfaces["camera_2"][0].tracker_model.forward_batch.assert_not_called()
+    assert detections == [(["box1"], ["class1"], [0.9]), None, (["box2"], ["class2"], [0.7]), (["box4"], ["class4"], [0.8])]
+
+
+def test_run_on_tracker_inputs(scheduler):
+    interface = scheduler.GP.interfaceObjs["camera_1"][0]
+    interface.trackerInput.side_effect = lambda image: ("band_" + image, (0, 100, 0.5, 0.5))
+    interface.remapDetections.side_effect = lambda detections, transform: (transform, detections)
+    interface.tracker_model.forward_batch.return_value = [(["box1"], ["class1"], [0.9])]
+
+    detections = scheduler.run([("camera_1", frame("img1"))])
+
+    interface.tracker_model.forward_batch.assert_called_once_with(images=["band_img1"])
+    assert detections == [((0, 100, 0.5, 0.5), (["box1"], ["class1"], [0.9]))]
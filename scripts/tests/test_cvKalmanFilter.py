@@ -0,0 +1,67 @@
+import numpy as np
+from assembly.models.tracking.ocsort.cvKalmanFilter import ConstantVelocityKalmanFilter
+from assembly.models.tracking.ocsort.kalmanfilter import KalmanFilterNew
+
+
+def generic_filter():
+    # KalmanFilterNew set up as KalmanBoxTracker used to do it
+    kf = KalmanFilterNew(dim_x=7, dim_z=4)
+    kf.F = np.array([[1, 0, 0, 0, 1, 0, 0], [0, 1, 0, 0, 0, 1, 0], [0, 0, 1, 0, 0, 0, 1], [
+                    0, 0, 0, 1, 0, 0, 0],  [0, 0, 0, 0, 1, 0, 0], [0, 0, 0, 0, 0, 1, 0], [0, 0, 0, 0, 0, 0, 1]])
+    kf.H = np.array([[1, 0, 0, 0, 0, 0, 0], [0, 1, 0, 0, 0, 0, 0],
+                    [0, 0, 1, 0, 0, 0, 0], [0, 0, 0, 1, 0, 0, 0]])
+    kf.R[2:, 2:] *= 10.
+    kf.P[4:, 4:] *= 1000.
+    kf.P *= 10.
+    kf.Q[-1, -1] *= 0.01
+    kf.Q[4:, 4:] *= 0.01
+    return kf
+
+
+def measurement(t):
+    return np.array([[100. + 5 * t], [200. + 2 * t], [1600. + 10 * t], [1. + 0.001 * t]])
+
+
+def test_matches_generic_filter():
+    generic, specialised = generic_filter(), ConstantVelocityKalmanFilter()
+    generic.x[:4] = specialised.x[:4] = measurement(0)
+    for t in range(1, 30):
+        generic.predict()
+        specialised.predict()
+        generic.update(measurement(t))
+        specialised.update(measurement(t))
+        assert np.allclose(generic.x, specialised.x)
+        assert np.allclose(generic.P, specialised.P)
+
+
+def test_freezes_and_unfreezes():
+    kf = ConstantVelocityKalmanFilter()
+    kf.x[:4] = measurement(0)
+    for t in range(1, 4):
+        kf.predict()
+        kf.update(measurement(t))
+    # The parameters are frozen after the predict of the first missed step
+    kf.predict()
+    frozen_x = kf.x.copy()
+    kf.update(None)
+    kf.predict()
+    kf.update(None)
+    assert kf.frozen and not kf.observed
+    assert np.array_equal(kf.frozen_x, frozen_x)
+    kf.predict()
+    kf.update(measurement(6))
+    assert kf.observed and not kf.frozen
+    # The virtual trajectory keeps the estimate on the linear motion
+    assert np.allclose(kf.x[:2, 0], measurement(6)[:2, 0], atol=1.)
+
+
+def test_updates_state_in_place():
+    kf = ConstantVelocityKalmanFilter()
+    x, cov = kf.x, kf.cov
+    kf.predict()
+    kf.update(measurement(1))
+    assert kf.x is x and kf.cov is cov
+    # Only the position/velocity blocks of the covariance are used
+    P = kf.P
+    assert np.allclose(P, P.T)
+    assert P[0, 1] == P[0, 5] == P[2, 3] == 0
@@ -0,0 +1,110 @@
+import time
+import pytest
+import ctypes
+import multiprocessing
+import numpy as np
+from assembly.components.frameBuffer import FrameRingBuffer
+
+
+@pytest.fixture
+def frame_buffer():
+    buffer = FrameRingBuffer("04c952fc-953d-4edb-9088-08f3782bf4bc", num_slots=2)
+    yield buffer
+    buffer.detach()
+    buffer.close()
+
+
+def write_frames(frame_buffer, shared_queue, count):
+    # Runs in the transmitter process
+    frame_buffer.allocate(6 * 4)
+    for frame_count in range(1, count + 1):
+        slot = frame_buffer.acquire(timeout=5)
+        image = frame_buffer.slot_array(slot, (6, 4))
+        image[:] = frame_count
+        frame_info = {"beltId": "camera_1", "frame_count": frame_count}
+        frame_info.update(frame_buffer.header(slot, (6, 4)))
+        shared_queue.put(frame_info)
+    # Waiting for all slots to be given back before removing the shared memory
+    for _ in range(frame_buffer.num_slots):
+        frame_buffer.acquire(timeout=5)
+    frame_buffer.close()
+
+
+def test_allocate_and_acquire(frame_buffer):
+    frame_buffer.allocate(100)
+    assert frame_buffer.acquire(timeout=1) == 0
+    assert frame_buffer.acquire(timeout=1) == 1
+    # All slots are in use
+    assert frame_buffer.acquire(timeout=0.1) is None
+
+
+def test_read_and_release(frame_buffer):
+    frame_buffer.allocate(12)
+    slot = frame_buffer.acquire(timeout=1)
+    frame_buffer.slot_array(slot, (3, 4))[:] = 7
+    header = frame_buffer.header(slot, (3, 4))
+
+    image = frame_buffer.read(header)
+    assert image.shape == (3, 4)
+    assert np.all(image == 7)
+
+    del image
+    frame_buffer.release(header)
+    assert frame_buffer.acquire(timeout=1) is not None
+
+
+def test_reallocate_drops_old_slots(frame_buffer):
+    frame_buffer.allocate(12)
+    slot = frame_buffer.acquire(timeout=1)
+    header = frame_buffer.header(slot, (3, 4))
+    frame_buffer.allocate(24)
+    frame_buffer.acquire(timeout=1)
+    frame_buffer.acquire(timeout=1)
+    # Slot from the old allocation is not handed out again
+    frame_buffer.release(header)
+    assert frame_buffer.acquire(timeout=0.1) is None
+
+
+def test_frames_across_processes(frame_buffer):
+    shared_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=write_frames, args=(frame_buffer, shared_queue, 5))
+    process.start()
+
+    for frame_count in range(1, 6):
+        frame_info = shared_queue.get(timeout=10)
+        assert "image" not in frame_info
+        image = frame_buffer.read(frame_info).copy()
+        frame_buffer.release(frame_info)
+        assert frame_info["frame_count"] == frame_count
+        assert np.all(image == frame_count)
+
+    process.join(timeout=10)
+    assert process.exitcode == 0
+
+
+def test_slot_pointer_and_discard(frame_buffer):
+    frame_buffer.allocate(12)
+    slot = frame_buffer.acquire(timeout=1)
+    # Writing through the pointer like the camera SDK does
+    ctypes.memset(frame_buffer.slot_pointer(slot), 9, 12)
+    assert np.all(frame_buffer.slot_array(slot, (3, 4)) == 9)
+
+    frame_buffer.acquire(timeout=1)
+    frame_buffer.discard(slot)
+    assert frame_buffer.acquire(timeout=1) == slot
+
+
+def test_acquire_does_not_stall_the_transmitter(frame_buffer, monkeypatch):
+    monkeypatch.setenv("FRAME_SLOT_WAIT_MS", "20")
+    assert FrameRingBuffer("04c952fc", num_slots=1).acquire_timeout == 0.02
+    frame_buffer.allocate(12)
+    slot = frame_buffer.acquire(timeout=1)
+    frame_buffer.acquire(timeout=1)
+    # No free slot, the default wait is short
+    start = time.time()
+    assert frame_buffer.acquire() is None
+    assert time.time() - start < 0.5
+    # A slot already free is taken without waiting
+    frame_buffer.discard(slot)
+    time.sleep(0.1)
+    assert frame_buffer.acquire(timeout=0) == slot
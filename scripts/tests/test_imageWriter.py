@@ -0,0 +1,96 @@
+import os, threading
+import pytest
+import numpy as np
+import cv2
+from unittest.mock import MagicMock, patch
+from assembly.components.imageWriter import ImageWriter
+
+
+def make_writer(**kwargs):
+    params = dict(workers=2, max_queue=4, quality=90, policy="drop_oldest", late_ms=1000)
+    params.update(kwargs)
+    return ImageWriter(loggerObj=MagicMock(), **params)
+
+
+def test_init_from_env(monkeypatch):
+    monkeypatch.setenv("IMAGE_WRITER_WORKERS", "3")
+    monkeypatch.setenv("IMAGE_WRITER_QUEUE", "8")
+    monkeypatch.setenv("IMAGE_JPEG_QUALITY", "80")
+    monkeypatch.setenv("IMAGE_WRITER_POLICY", "skip")
+    writer = ImageWriter(loggerObj=MagicMock())
+    assert (writer.workers, writer.max_queue, writer.quality, writer.policy) == (3, 8, 80, "skip")
+    with pytest.raises(ValueError):
+        ImageWriter(loggerObj=MagicMock(), policy="block")
+    # Skipping by default, so isPathUsed is only set for images that are written
+    monkeypatch.delenv("IMAGE_WRITER_POLICY")
+    assert ImageWriter(loggerObj=MagicMock()).policy == "skip"
+
+
+def test_writes_in_background(tmp_path):
+    writer = make_writer()
+    writer.start()
+    image = np.random.randint(0, 255, (64, 64, 3), dtype=np.uint8)
+    paths = [str(tmp_path / f"{i}.jpg") for i in range(3)]
+    for path in paths:
+        assert writer.write(path, image)
+    assert writer.flush()
+    writer.stop()
+
+    assert all(os.path.exists(path) for path in paths)
+    assert cv2.imread(paths[0]).shape == (64, 64, 3)
+    assert writer.stats() == {"queued": 3, "written": 3, "dropped": 0, "late": 0, "failed": 0, "pending": 0}
+
+
+def test_jpeg_quality(tmp_path):
+    image = np.random.randint(0, 255, (64, 64, 3), dtype=np.uint8)
+    sizes = []
+    for quality in (30, 95):
+        writer = make_writer(quality=quality)
+        writer.start()
+        writer.write(str(tmp_path / f"{quality}.jpg"), image)
+        writer.stop()
+        sizes.append(os.path.getsize(tmp_path / f"{quality}.jpg"))
+    assert sizes[0] < sizes[1]
+
+
+@pytest.mark.parametrize("policy, kept", [("drop_oldest", ["2.jpg", "3.jpg"]), ("skip", ["0.jpg", "1.jpg"])])
+def test_full_queue_policy(policy, kept):
+    # Threads not started, the queue fills up
+    writer = make_writer(max_queue=2, policy=policy)
+    results = [writer.write(f"{i}.jpg", None) for i in range(4)]
+    assert [path for path, _, _, _ in writer.images] == kept
+    assert results == ([True] * 4 if policy == "drop_oldest" else [True, True, False, False])
+    assert writer.stats()["dropped"] == 2
+
+
+def test_failed_and_late_writes():
+    release = threading.Event()
+    def imwrite(path, image, params):
+        release.wait(timeout=1)
+        return path != "fail.jpg"
+    writer = make_writer(workers=1, late_ms=10)
+    with patch('assembly.components.imageWriter.cv2.imwrite', side_effect=imwrite):
+        writer.start()
+        writer.write("late.jpg", None)
+        writer.write("fail.jpg", None)
+        threading.Timer(0.05, release.set).start()
+        assert writer.flush()
+        writer.stop()
+    stats = writer.stats()
+    assert (stats["written"], stats["late"], stats["failed"]) == (1, 1, 1)
+
+
+def test_sidecar_only_exists_with_its_image(tmp_path):
+    image = np.zeros((8, 8, 3), dtype=np.uint8)
+    sidecar = lambda name: (str(tmp_path / f"{name}.json"), b'{"results":[]}')
+    # Dropped from the full queue along with its image
+    writer = make_writer(max_queue=1)
+    writer.write(str(tmp_path / "dropped.jpg"), image, sidecar=sidecar("dropped"))
+    writer.write(str(tmp_path / "kept.jpg"), image, sidecar=sidecar("kept"))
+    writer.start()
+    # Removed when the image cannot be written
+    writer.write(str(tmp_path / "missing" / "failed.jpg"), image, sidecar=sidecar("failed"))
+    assert writer.flush()
+    writer.stop()
+    assert sorted(os.listdir(tmp_path)) == ["kept.jpg", "kept.json"]
+    assert writer.stats()["failed"] == 1
@@ -69,7 +69,7 @@ def test_run_detection(mock_classification, mock_assembly):
 
     # Step 2: Mock the classification model output
     mock_classification_instance = mock_classification.return_value
-    mock_classification_instance.return_value = ("class_name_1", 0.85)  # Mock classification output
+    mock_classification_instance.forward_batch.side_effect = lambda images: [("class_name_1", 0.85)] * len(images)  # Mock classification output
 
     # Step 3: Initialize inferenceInterface with mocks
     interface = inferenceInterface(interface_info=interface_info_mock, ModelDict=ModelDict_mock)
@@ -95,6 +95,31 @@ def test_run_detection(mock_classification, mock_assembly):
     assert "class_name" in detection_result
     assert detection_result["class_name"] == "class_name_1"
     assert detection_result["class_score"] == 0.85
+
+    # All the objects are classified in one batch
+    mock_classification_instance.forward_batch.assert_called_once()
+    assert len(mock_classification_instance.forward_batch.call_args.kwargs["images"]) == 3
+    mock_classification_instance.assert_not_called()
+@patch('assembly.interfaces.inferenceInterface.AssemblyInterface', autospec=True)
+@patch('assembly.interfaces.inferenceInterface.ClassificationInterface', autospec=True)
+def test_run_detection_batches_classification_per_class(mock_classification, mock_assembly):
+    # Objects of a class with a second stage model mixed with a class without one
+    mock_assembly.return_value.return_value = (
+        [[0, 0, 10, 10], [10, 10, 30, 30], [20, 20, 25, 25]],
+        ['4f1a9b88-2d13-4db8-94b4-87d3e7991mo2', 'other_class', '4f1a9b88-2d13-4db8-94b4-87d3e7991mo2'],
+        [0.9, 0.8, 0.7]
+    )
+    # Classification result depends on the crop size to check it is written back to the right object
+    mock_classification.return_value.forward_batch.side_effect = lambda images: [(f"size_{image.shape[0]}", 0.9) for image in images]
+
+    interface = inferenceInterface(interface_info=interface_info_mock, ModelDict=ModelDict_mock)
+    result = interface.run(np.zeros((100, 100, 3), dtype=np.uint8))
+
+    classified = result["detection"]["4f1a9b88-2d13-4db8-94b4-87d3e7991mo2"]
+    assert [det_res["class_name"] for det_res in classified] == ["size_10", "size_5"]
+    assert "class_name" not in result["detection"]["other_class"][0]
+    mock_classification.return_value.forward_batch.assert_called_once()
+
 def test_retrace():
     # Initialize inferenceInterface with mocks
     interface = inferenceInterface(interface_info=interface_info_mock, ModelDict=ModelDict_mock)
@@ -94,3 +94,48 @@ def test_warm_up(point_rend_instance):
     with patch.object(point_rend_instance, 'forward', return_value=None) as mock_forward:
         point_rend_instance.warm_up()
         assert mock_forward.call_count == 4  # Because warm_up calls forward four times
+
+@patch('assembly.models.detection.Pointrend.PointRend.preProcess', side_effect=lambda image: {"image": image})
+def test_forward_batch(point_rend_preprocess, point_rend_instance):
+    # Mock the model to return one output per input
+    mock_output = {
+        "instances": MagicMock(
+            pred_masks=torch.zeros((1, 100, 100)),
+            pred_boxes=MagicMock(tensor=torch.tensor([[10, 10, 50, 50]])),
+            pred_classes=torch.tensor([1]),
+            scores=torch.tensor([0.99])
+        )
+    }
+    point_rend_instance.model = MagicMock(return_value=[mock_output, mock_output])
+
+    results = point_rend_instance(["image1", "image2"])
+
+    # A single model call with all the inputs
+    point_rend_instance.model.assert_called_once_with([{"image": "image1"}, {"image": "image2"}])
+    assert len(results) == 2
+    assert list(results[0][1]) == ["class2"]
+
+def test_mask_head_disabled_by_default(point_rend_instance):
+    # The pipeline only uses boxes, so the mask head is off unless asked for
+    assert point_rend_instance.return_masks is False
+    point_rend_instance.model = MagicMock()
+    point_rend_instance.model.roi_heads.mask_on = True
+    point_rend_instance.setMaskHead(enabled=False)
+    assert point_rend_instance.model.roi_heads.mask_on is False
+
+def test_postprocess_with_masks(point_rend_instance):
+    point_rend_instance.model = MagicMock()
+    point_rend_instance.setMaskHead(enabled=True)
+    assert point_rend_instance.model.roi_heads.mask_on is True
+    mock_pred_output = {
+        "instances": MagicMock(
+            pred_masks=torch.zeros((2, 100, 120), dtype=torch.bool),
+            pred_classes=torch.tensor([0, 1]),
+            pred_boxes=MagicMock(tensor=torch.tensor([[10, 10, 50, 50], [0, 0, 5, 5]])),
+            scores=torch.tensor([0.99, 0.5])
+        )
+    }
+    boxes, class_names, scores, masks = point_rend_instance.postProcess(mock_pred_output)
+
+    assert class_names == ["class1", "class2"]
+    assert masks.shape == (100, 120, 2)
@@ -78,3 +78,24 @@ def test_load_models_without_active_models(setup):
 
     # Check that no models were loaded
     assert len(model_dict) == 0
+
+@patch('assembly.models.ModelManager.YoloV8ClassificationOnnx')
+@patch('assembly.models.ModelManager.YoloV8Onnx')
+@patch('assembly.models.ModelManager.YoloV8')
+def test_load_models_onnxruntime_backend(MockYoloV8, MockYoloV8Onnx, MockYoloV8ClassificationOnnx):
+    model_params = {
+        'det': {'model_path': 'det/best.pt', 'model_properties': {'modelKey': 0, 'type': 'tracker', 'backend': 'onnxruntime', 'intraOpThreads': 2, 'params': {'classes': ['a']}}},
+        'cls': {'model_path': 'cls/best.pt', 'model_properties': {'modelKey': 3, 'type': 'classification', 'backend': 'onnxruntime', 'params': {'classes': ['b']}}},
+        'gpu': {'model_path': 'gpu/best.pt', 'model_properties': {'modelKey': 0, 'type': 'tracker', 'params': {'classes': ['a']}}},
+        'fast': {'model_path': 'fast/best.pt', 'model_properties': {'modelKey': 0, 'type': 'tracker', 'backend': 'torch', 'params': {'classes': ['a']}}},
+    }
+    model_manager = modelManager(model_params=model_params, loggerObj=Mock(), MODELS_DIR="models")
+    model_dict = model_manager.load_models(model_dict={}, active_models=list(model_params.keys()), device="cuda:0")
+
+    # The onnxruntime backend is used only where asked for, the rest stays on the given device
+    MockYoloV8Onnx.assert_called_once_with(model_weights=os.path.join("models", "det/best.pt"), classes=['a'], intra_op_threads=2)
+    MockYoloV8ClassificationOnnx.assert_called_once_with(model_weights=os.path.join("models", "cls/best.pt"), classes=['b'], intra_op_threads=None)
+    MockYoloV8.assert_any_call(model_weights=os.path.join("models", "gpu/best.pt"), classes=['a'], device="cuda:0")
+    MockYoloV8.assert_any_call(model_weights=os.path.join("models", "fast/best.pt"), classes=['a'], device="cuda:0", fast_path=True)
+    assert model_dict['det'] is MockYoloV8Onnx.return_value
+    assert model_dict['cls'] is MockYoloV8ClassificationOnnx.return_value
@@ -0,0 +1,59 @@
+import os, threading, urllib.request
+import pytest
+import numpy as np
+import cv2
+from http.server import ThreadingHTTPServer
+from assembly.model_utils.Visualisor import VisualizeResults
+from assembly.model_utils.renderer import render_eagerly, deferred_sidecar, render, sidecar_path, RenderHandler
+
+uuid_class_map = {"uuid_1": "Tag"}
+passed = [{"uuid_1": {"pass": True, "boxes": [[400, 800, 1200, 1600]], "fail_boxes": []}}]
+failed = [{"uuid_1": {"pass": False, "boxes": [], "fail_boxes": [[400, 800, 1200, 1600]]}}]
+
+
+@pytest.mark.parametrize("policy, results, expected", [
+    ("always", passed, True), ("on_fail", passed, False), ("on_fail", failed, True), ("never", failed, False)
+])
+def test_render_eagerly(policy, results, expected):
+    assert render_eagerly(policy, results) == expected
+
+
+def save_frame(tmp_path, results):
+    # Raw frame saved at the resolution of the annotated images, as MainProcessor does
+    frame = np.full((2048, 3072, 3), 60, dtype=np.uint8)
+    visualisor = VisualizeResults(uuid_class_map=uuid_class_map)
+    image_path = str(tmp_path / "1_frame.png")
+    cv2.imwrite(image_path, visualisor.resize_image(original_image=frame))
+    path, sidecar = deferred_sidecar(image_path, results=results, object_count=3, roi=2000, direction="left2right", source_width=3072, uuid_class_map=uuid_class_map)
+    with open(path, "wb") as outfile:
+        outfile.write(sidecar)
+    eager = visualisor.draw(image=frame, results={"result": results}, object_count=3, roi=2000, direction="left2right")
+    return image_path, eager
+
+
+def test_render_matches_eager_drawing(tmp_path):
+    image_path, eager = save_frame(tmp_path, failed)
+    assert os.path.exists(sidecar_path(image_path))
+    rendered = render(image_path)
+    assert rendered.shape == eager.shape == (512, 768, 3)
+    assert np.array_equal(rendered, eager)
+    # Images rendered eagerly have no sidecar and are returned as saved
+    os.remove(sidecar_path(image_path))
+    assert np.array_equal(render(image_path), cv2.imread(image_path))
+    assert render(str(tmp_path / "missing.png")) is None
+
+
+def test_render_endpoint(tmp_path):
+    save_frame(tmp_path, passed)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), type("Handler", (RenderHandler,), {"save_dir": str(tmp_path)}))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/render/"
+        with urllib.request.urlopen(url + "1_frame.png") as response:
+            assert response.headers["Content-Type"] == "image/jpeg"
+            image = cv2.imdecode(np.frombuffer(response.read(), dtype=np.uint8), cv2.IMREAD_COLOR)
+        assert image.shape == (512, 768, 3)
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(url + "missing.png")
+    finally:
+        server.shutdown()
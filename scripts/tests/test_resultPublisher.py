@@ -0,0 +1,185 @@
+import json, time
+import pytest
+from unittest.mock import MagicMock, patch
+from assembly.components.resultPublisher import ResultPublisher
+from assembly.components.resultSpool import ResultSpool
+
+
+def make_publisher(**kwargs):
+    params = dict(max_queue=10, batch_size=1, flush_ms=0, confirm=True, backoff_max=0.01, spool_path="")
+    params.update(kwargs)
+    return ResultPublisher(exchange_publish_name="test_exchange", publishing_queue="test_publish_queue", host="localhost", loggerObj=MagicMock(), **params)
+
+
+def wait_for(condition, timeout=2):
+    end = time.time() + timeout
+    while time.time() < end:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def published(connection):
+    return [json.loads(call.kwargs["body"]) for call in connection.channel.return_value.basic_publish.call_args_list]
+
+
+def test_init_from_env(monkeypatch):
+    monkeypatch.setenv("PUBLISH_MAX_QUEUE", "50")
+    monkeypatch.setenv("PUBLISH_BATCH_SIZE", "8")
+    monkeypatch.setenv("PUBLISH_FLUSH_MS", "20")
+    monkeypatch.setenv("PUBLISH_CONFIRM", "false")
+    publisher = ResultPublisher(exchange_publish_name="ex", publishing_queue="q", host="localhost", loggerObj=MagicMock())
+    assert (publisher.max_queue, publisher.batch_size, publisher.flush_interval, publisher.confirm) == (50, 8, 0.02, False)
+
+
+def test_send_drops_oldest_when_full():
+    publisher = make_publisher(max_queue=2)
+    for i in range(3):
+        publisher.send({"cameraId": "camera_1", "frame": i})
+    assert [json.loads(body)["frame"] for body in publisher.messages] == [1, 2]
+    assert publisher.stats() == {"queued": 3, "sent": 0, "dropped": 1, "failed": 0, "reconnects": 0, "spooled": 0, "replayed": 0, "pending": 2, "pending_spool": 0}
+
+
+@patch('assembly.components.resultPublisher.pika.BlockingConnection')
+def test_publishes_in_background(mock_blocking_connection):
+    publisher = make_publisher()
+    publisher.start()
+    for i in range(3):
+        publisher.send({"cameraId": "camera_1", "frame": i})
+    assert wait_for(lambda: publisher.stats()["sent"] == 3)
+    publisher.stop()
+
+    connection = mock_blocking_connection.return_value
+    connection.channel.return_value.confirm_delivery.assert_called_once()
+    assert published(connection) == [{"cameraId": "camera_1", "frame": i} for i in range(3)]
+    assert publisher.stats()["pending"] == 0
+
+
+@patch('assembly.components.resultPublisher.pika.BlockingConnection')
+def test_micro_batching(mock_blocking_connection):
+    publisher = make_publisher(batch_size=3, flush_ms=200)
+    for i in range(4):
+        publisher.send({"cameraId": "camera_1", "frame": i})
+    publisher.start()
+    assert wait_for(lambda: publisher.stats()["sent"] == 4)
+    publisher.stop()
+
+    # Full batch as one JSON list, the rest as a list of one after the flush interval
+    batches = published(mock_blocking_connection.return_value)
+    assert mock_blocking_connection.return_value.channel.return_value.basic_publish.call_args.kwargs["properties"].content_type == "application/json"
+    assert batches == [[{"cameraId": "camera_1", "frame": i} for i in range(3)], [{"cameraId": "camera_1", "frame": 3}]]
+
+
+@patch('assembly.components.resultPublisher.pika.BlockingConnection')
+def test_reconnects_with_backoff(mock_blocking_connection):
+    connection = MagicMock()
+    mock_blocking_connection.side_effect = [Exception("Connection failed"), Exception("Connection failed"), connection, connection]
+    connection.channel.return_value.basic_publish.side_effect = [Exception("Message was nacked"), None]
+    publisher = make_publisher()
+    publisher.send({"cameraId": "camera_1"})
+    publisher.start()
+    assert wait_for(lambda: publisher.stats()["sent"] == 1)
+    publisher.stop()
+
+    # The message is kept until it is confirmed
+    assert published(connection) == [{"cameraId": "camera_1"}, {"cameraId": "camera_1"}]
+    stats = publisher.stats()
+    assert (stats["failed"], stats["reconnects"], stats["dropped"]) == (3, 3, 0)
+
+
+def test_backoff_is_exponential():
+    publisher = make_publisher(backoff_max=5)
+    delays = []
+    for publisher.failures in range(1, 6):
+        delays.append(publisher.backoff())
+    assert delays == [0.5, 1, 2, 4, 5]
+
+
+def test_spool_keeps_order(tmp_path):
+    spool = ResultSpool(str(tmp_path / "spool.db"))
+    spool.append([b'{"frame":0}', b'{"frame":1}'])
+    spool.append([b'{"frame":2}'])
+    assert spool.connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    last_id, messages = spool.peek(2)
+    assert messages == [b'{"frame":0}', b'{"frame":1}']
+    spool.remove(last_id)
+    assert spool.count() == 1
+    spool.close()
+
+    # Spooled results survive a restart
+    spool = ResultSpool(str(tmp_path / "spool.db"))
+    assert spool.peek(10)[1] == [b'{"frame":2}']
+    spool.close()
+
+
+@patch('assembly.components.resultPublisher.pika.BlockingConnection')
+def test_outage_is_spooled_and_replayed(mock_blocking_connection, tmp_path):
+    connection = MagicMock()
+    outage = [True]
+    def connect(parameters):
+        if outage[0]:
+            raise Exception("Connection refused")
+        return connection
+    mock_blocking_connection.side_effect = connect
+    publisher = make_publisher(max_queue=2, spool_path=str(tmp_path / "spool.db"), replay_rate=1000)
+    publisher.start()
+
+    # More results than the in-memory queue holds during the outage
+    for i in range(6):
+        publisher.send({"cameraId": "camera_1", "frame": i})
+        time.sleep(0.03)
+    assert wait_for(lambda: publisher.stats()["pending_spool"] == 6)
+    outage[0] = False
+    assert wait_for(lambda: publisher.stats()["sent"] == 6)
+    publisher.send({"cameraId": "camera_1", "frame": 6})
+    assert wait_for(lambda: publisher.stats()["sent"] == 7)
+    publisher.stop()
+
+    assert [message["frame"] for message in published(connection)] == list(range(7))
+    stats = publisher.stats()
+    assert (stats["dropped"], stats["spooled"], stats["replayed"], stats["pending_spool"]) == (0, 6, 6, 0)
+
+
+@patch('assembly.components.resultPublisher.pika.BlockingConnection')
+def test_stop_spools_pending_results(mock_blocking_connection, tmp_path):
+    mock_blocking_connection.side_effect = Exception("Connection refused")
+    publisher = make_publisher(backoff_max=10, spool_path=str(tmp_path / "spool.db"))
+    publisher.start()
+    publisher.send({"cameraId": "camera_1"})
+    publisher.stop()
+
+    # Replayed first by the next run
+    publisher = make_publisher(spool_path=str(tmp_path / "spool.db"))
+    assert publisher.stats()["pending_spool"] == 1
+    publisher.spool.close()
+
+
+@patch('assembly.components.resultPublisher.pika.BlockingConnection')
+def test_serialized_body_is_reused(mock_blocking_connection):
+    publisher = make_publisher()
+    body = b'{"cameraId":"camera_1","frame":0}'
+    publisher.send({"cameraId": "camera_1", "frame": 0}, body=body)
+    assert publisher.messages[0] is body
+    publisher.start()
+    assert wait_for(lambda: publisher.stats()["sent"] == 1)
+    publisher.stop()
+    assert mock_blocking_connection.return_value.channel.return_value.basic_publish.call_args.kwargs["body"] is body
+
+
+def test_spool_appends_in_one_transaction(tmp_path):
+    spool = ResultSpool(str(tmp_path / "spool.db"))
+    statements = []
+    spool.connection.set_trace_callback(statements.append)
+    spool.append([b'{"frame":0}', b'{"frame":1}', b'{"frame":2}'])
+    assert statements[0] == "BEGIN" and statements[-1] == "COMMIT"
+    # A failing batch leaves nothing behind
+    with pytest.raises(Exception):
+        spool.append([b'{"frame":3}', None])
+    assert spool.count() == 3
+    last_id, _ = spool.peek(2)
+    statements.clear()
+    spool.remove(last_id)
+    assert statements[0] == "BEGIN" and statements[-1] == "COMMIT"
+    assert spool.count() == 1
+    spool.close()
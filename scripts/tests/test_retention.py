@@ -0,0 +1,66 @@
+import os
+import pytest
+from unittest.mock import MagicMock
+from assembly.components.retention import RetentionPolicy, SaveDirRotator
+
+
+def final_result(passed, camera_id="camera_1"):
+    return {"cameraId": camera_id, "isPathUsed": True, "result": [{"pass": True, "info": {}}, {"pass": passed, "info": {}}]}
+
+
+def test_init_from_env(monkeypatch):
+    monkeypatch.setenv("RETENTION_MODE", "sample")
+    monkeypatch.setenv("RETENTION_EVERY_N", "5")
+    monkeypatch.setenv("RETENTION_PER_MINUTE", "30")
+    policy = RetentionPolicy()
+    assert (policy.mode, policy.every_n, policy.per_minute) == ("sample", 5, 30)
+    with pytest.raises(ValueError):
+        RetentionPolicy(mode="never")
+
+
+def test_all_and_fail_modes():
+    assert RetentionPolicy(mode="all").keep(final_result(True))
+    policy = RetentionPolicy(mode="fail")
+    assert not policy.keep(final_result(True))
+    assert policy.keep(final_result(False))
+    # Frames without objects have nothing that failed
+    assert not policy.keep({"cameraId": "camera_1", "result": []})
+
+
+def test_sample_mode_keeps_failures_and_one_in_n_passes():
+    policy = RetentionPolicy(mode="sample", every_n=3)
+    kept = [policy.keep(final_result(True)) for _ in range(7)]
+    assert kept == [True, False, False, True, False, False, True]
+    assert policy.keep(final_result(False))
+    # Counted for each camera
+    assert policy.keep(final_result(True, camera_id="camera_2"))
+
+
+def test_rate_mode_caps_frames_per_minute():
+    policy = RetentionPolicy(mode="rate", per_minute=2)
+    kept = [policy.keep(final_result(False), now=t) for t in (0, 10, 20, 59)]
+    assert kept == [True, True, False, False]
+    assert policy.keep(final_result(True, camera_id="camera_2"), now=20)
+    # The first frame left the window
+    assert policy.keep(final_result(True), now=60)
+    assert not policy.keep(final_result(True), now=65)
+
+
+def test_rotation_deletes_oldest_files(tmp_path):
+    for i in range(10):
+        path = tmp_path / f"{i}.jpg"
+        path.write_bytes(b"0" * 100 * 1024)
+        os.utime(path, (i, i))
+    rotator = SaveDirRotator(save_dir=str(tmp_path), loggerObj=MagicMock(), max_mb=0.5, low_water=0.9)
+    assert rotator.rotate() == 6
+    assert sorted(os.listdir(tmp_path)) == ["6.jpg", "7.jpg", "8.jpg", "9.jpg"]
+    # Under the cap, nothing to do
+    assert rotator.rotate() == 0
+
+
+def test_rotation_disabled_without_cap(tmp_path, monkeypatch):
+    monkeypatch.delenv("SAVE_DIR_MAX_MB", raising=False)
+    rotator = SaveDirRotator(save_dir=str(tmp_path), loggerObj=MagicMock())
+    rotator.start()
+    assert rotator.thread is None
+    rotator.stop()
@@ -0,0 +1,46 @@
+import json
+import pytest
+import numpy as np
+from unittest.mock import patch
+from assembly.components import serializer
+from assembly.components.serializer import dumps, encode, join, check_content_type
+
+
+def numpy_result():
+    return {"cameraId": "camera_1", "count": np.int64(3), "score": np.float32(0.5), "pass": np.bool_(True),
+            "box": np.array([[1, 2, 3, 4]], dtype=np.int32), "roi": np.arange(4)[::2], 1: [np.uint8(7)]}
+
+
+EXPECTED = {"cameraId": "camera_1", "count": 3, "score": 0.5, "pass": True, "box": [[1, 2, 3, 4]], "roi": [0, 2], "1": [7]}
+
+
+def test_dumps_handles_numpy():
+    assert json.loads(dumps(numpy_result())) == EXPECTED
+
+
+def test_dumps_without_orjson():
+    with patch.object(serializer, "orjson", None):
+        assert json.loads(dumps(numpy_result())) == EXPECTED
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
+
+
+def test_join_json_bodies():
+    bodies = [dumps({"frame": i}) for i in range(3)]
+    assert json.loads(join(bodies)) == [{"frame": i} for i in range(3)]
+
+
+def test_msgpack_content_type():
+    msgpack = pytest.importorskip("msgpack")
+    for n in (3, 20):
+        bodies = [encode({"frame": np.int64(i)}, "msgpack") for i in range(n)]
+        assert msgpack.unpackb(join(bodies, "msgpack")) == [{"frame": i} for i in range(n)]
+
+
+def test_check_content_type():
+    check_content_type("json")
+    with pytest.raises(ValueError):
+        check_content_type("xml")
+    with patch.object(serializer, "msgpack", None):
+        with pytest.raises(ImportError):
+            check_content_type("msgpack")
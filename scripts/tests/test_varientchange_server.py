@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import MagicMock, patch, call
 import pika
 import json
+import threading
 from datetime import datetime
 from assembly.components.FileVideoStream import varientchange_server
 # Import the varientchange_server class from the appropriate module
@@ -111,5 +112,56 @@ class TestVarientChangeServer(unittest.TestCase):
         self.assertIsNone(self.server.channel)
         self.mock_logger.logger.exception.assert_called_once_with("Error in NodeCommServer read: Read failed")
 
+    def test_on_message_signals_event(self):
+        # Mock channel and message delivered to the consumer thread
+        mock_channel = MagicMock()
+        mock_method_frame = MagicMock()
+        mock_method_frame.routing_key = "camera_1"
+        mock_body = json.dumps({"key": "value"}).encode('utf-8')
+
+        self.assertFalse(self.server.message_event.is_set())
+        self.server.on_message(mock_channel, mock_method_frame, MagicMock(), mock_body)
+
+        # Verify the message is queued and the main loop is signalled
+        self.assertTrue(self.server.message_event.is_set())
+        mock_channel.basic_ack.assert_called_once_with(delivery_tag=mock_method_frame.delivery_tag)
+        result = self.server.get_message()
+        self.assertEqual(result["key"], "value")
+        self.assertEqual(result["camera_id"], "camera_1")
+        self.assertFalse(self.server.message_event.is_set())
+        self.assertIsNone(self.server.get_message())
+
+    def test_get_message_keeps_event_for_pending_messages(self):
+        mock_method_frame = MagicMock()
+        mock_method_frame.routing_key = "camera_1"
+        for value in ["first", "second"]:
+            self.server.on_message(MagicMock(), mock_method_frame, MagicMock(), json.dumps({"key": value}))
+
+        self.assertEqual(self.server.get_message()["key"], "first")
+        self.assertTrue(self.server.message_event.is_set())
+        self.assertEqual(self.server.get_message()["key"], "second")
+        self.assertFalse(self.server.message_event.is_set())
+
+    @patch('pika.BlockingConnection')
+    def test_consumer_thread(self, mock_blocking_connection):
+        mock_connection = MagicMock()
+        mock_channel = MagicMock()
+        mock_blocking_connection.return_value = mock_connection
+        mock_connection.channel.return_value = mock_channel
+
+        # Waiting for the consumer thread to be listening before stopping it
+        listening = threading.Event()
+        mock_connection.process_data_events.side_effect = lambda time_limit: listening.set()
+
+        self.server.start_consumer()
+        self.assertTrue(listening.wait(timeout=5))
+        self.server.stop_consumer()
+
+        # Verify the consumer registers on the consuming queue and closes the connection
+        mock_channel.basic_consume.assert_called_once_with(queue="test_consume_queue", on_message_callback=self.server.on_message)
+        mock_connection.process_data_events.assert_called_with(time_limit=1)
+        mock_connection.close.assert_called_once()
+        self.assertIsNone(self.server.consumer_thread)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,26 @@
+import numpy as np
+from assembly.model_utils.Visualisor import VisualizeResults
+
+
+def test_draw_on_downscaled_image():
+    visualisor = VisualizeResults(uuid_class_map={"uuid_1": "Tag"})
+    image = np.zeros((2048, 3072, 3), dtype=np.uint8)
+    results = {"result": [{"uuid_1": {"pass": True, "boxes": [[400, 800, 1200, 1600]], "fail_boxes": []}}]}
+
+    res_image = visualisor.draw(image=image, results=results, object_count=3, roi=2000, direction="left2right")
+
+    # The caller's frame is not drawn on
+    assert not image.any()
+    assert res_image.shape == (512, 768, 3)
+    # Box and ROI line at the scaled coordinates
+    assert (res_image[300, 100] == [0, 255, 0]).all() and (res_image[300, 300] == [0, 255, 0]).all()
+    assert (res_image[500, 500] == [0, 255, 0]).all()
+    assert not res_image[300, 200].any()
+
+
+def test_draw_full_resolution():
+    visualisor = VisualizeResults(uuid_class_map={}, resize_ratio=1)
+    image = np.zeros((100, 100, 3), dtype=np.uint8)
+    res_image = visualisor.draw(image=image, results={"result": []}, roi=0.5, direction="up2down")
+    assert res_image.shape == (100, 100, 3)
+    assert (res_image[50, 10] == [0, 255, 0]).all()
@@ -90,3 +90,22 @@ def test_call(yolov8_classification_instance):
 
 #         yolov8_classification_instance.to(device="cpu")
 #         mock_cpu.assert_called_once()
+
+def test_forward_batch(yolov8_classification_instance):
+    # Mock the model's predict method for two images
+    mock_outputs = []
+    for class_id, conf in [(0, 0.9), (2, 0.8)]:
+        mock_pred_output = MagicMock()
+        mock_pred_output.probs.top5 = [class_id]
+        mock_pred_output.probs.top5conf.cpu.return_value = torch.tensor([conf])
+        mock_outputs.append(mock_pred_output)
+    yolov8_classification_instance.model.predict.return_value = mock_outputs
+
+    images = [np.zeros((64, 64, 3), dtype=np.uint8), np.zeros((32, 48, 3), dtype=np.uint8)]
+    results = yolov8_classification_instance(images)
+
+    # A single predict call with all the images
+    yolov8_classification_instance.model.predict.assert_called_once()
+    assert len(yolov8_classification_instance.model.predict.call_args.kwargs["source"]) == 2
+    assert [class_name for class_name, _ in results] == ["class1", "class3"]
+    assert results[1][1] == pytest.approx(0.8)
@@ -86,3 +86,76 @@ def test_warm_up(yolov8_instance):
     with patch.object(yolov8_instance, 'forward', return_value=None) as mock_forward:
         yolov8_instance.warm_up()
         assert mock_forward.call_count == 2  # Warm up calls forward twice
+
+
+def test_forward_batch(yolov8_instance):
+    # Mock model prediction output for two images
+    mock_outputs = []
+    for cls in [0, 1]:
+        mock_output = MagicMock()
+        mock_output.boxes.xyxy = torch.tensor([[10, 10, 100, 100]])
+        mock_output.boxes.conf = torch.tensor([0.9])
+        mock_output.boxes.cls = torch.tensor([cls])
+        mock_outputs.append(mock_output)
+    yolov8_instance.model.predict.reset_mock()  # Ignoring the warm up calls
+    yolov8_instance.model.predict.return_value = mock_outputs
+
+    images = [np.zeros((640, 640, 3), dtype=np.uint8), np.zeros((320, 320, 3), dtype=np.uint8)]
+    results = yolov8_instance(images)
+
+    # A single predict call with all the images
+    yolov8_instance.model.predict.assert_called_once()
+    assert len(yolov8_instance.model.predict.call_args.kwargs["source"]) == 2
+    assert [class_names for _, class_names, _ in results] == [["class1"], ["class2"]]
+    assert results[0][0] == [[10, 10, 100, 100]]
+
+
+class FakeNetwork(torch.nn.Module):
+    # Returns one class2 box at the centre of the letterboxed image for every input
+    def __init__(self):
+        super().__init__()
+        self.register_buffer("stride", torch.tensor([8., 16., 32.]))
+        self.inputs = []
+
+    def forward(self, x):
+        self.inputs.append(x)
+        pred = torch.zeros((x.shape[0], 6, 4))
+        pred[:, :4, 0] = torch.tensor([x.shape[3] / 2, x.shape[2] / 2, 100., 50.])
+        pred[:, 5, 0] = 0.9
+        return pred, None
+
+
+@pytest.fixture
+def yolov8_fast_instance(monkeypatch):
+    monkeypatch.setenv("YOLOV8_THRESH", "0.5")
+    with patch('assembly.models.detection.Yolov8_model.YOLO') as mock_yolo:
+        mock_yolo.return_value.model = FakeNetwork()
+        instance = YoloV8(model_weights="dummy_weights.pth", classes=["class1", "class2"], device="cpu", fast_path=True)
+    instance.network.inputs = []
+    return instance
+
+
+def test_fast_path(yolov8_fast_instance):
+    image = np.zeros((480, 700, 3), dtype=np.uint8)
+    boxes, class_names, scores = yolov8_fast_instance(image)
+
+    # predict() is not used, the network gets the normalised minimum rectangle letterbox
+    yolov8_fast_instance.model.predict.assert_not_called()
+    assert yolov8_fast_instance.network.inputs[0].shape == (1, 3, 448, 640)
+    assert float(yolov8_fast_instance.network.inputs[0].max()) == pytest.approx(114 / 255)
+    assert class_names == ["class2"]
+    assert scores == [pytest.approx(0.9)]
+    assert boxes == [[295, 213, 404, 267]]
+
+
+def test_fast_path_forward_batch(yolov8_fast_instance):
+    images = [np.zeros((480, 700, 3), dtype=np.uint8), np.zeros((320, 320, 3), dtype=np.uint8)]
+    results = yolov8_fast_instance.forward_batch(images)
+
+    # A single forward with both images padded to the full size
+    assert len(yolov8_fast_instance.network.inputs) == 1
+    assert yolov8_fast_instance.network.inputs[0].shape == (2, 3, 640, 640)
+    assert results[1] == ([[135, 147, 185, 172]], ["class2"], [pytest.approx(0.9)])
+    buffer = yolov8_fast_instance.input_buffer
+    yolov8_fast_instance.forward_batch(images)
+    assert yolov8_fast_instance.input_buffer is buffer # The input tensor is reused
@@ -0,0 +1,135 @@
+import pytest
+from unittest.mock import patch, MagicMock
+import numpy as np
+from assembly.models.onnxUtils import letterbox, nms, to_blob
+from assembly.models.detection.Yolov8_onnx import YoloV8Onnx
+from assembly.models.classification.yolov8ClassificationOnnx import YoloV8ClassificationOnnx
+
+
+def make_session(output):
+    session = MagicMock()
+    session.get_inputs.return_value = [MagicMock(name="input")]
+    session.run.side_effect = lambda names, feed: [output(list(feed.values())[0])]
+    return session
+
+
+@pytest.fixture
+def yolov8_onnx_instance(monkeypatch):
+    monkeypatch.setenv("YOLOV8_THRESH", "0.5")
+    # One box of class1 at the centre of the letterboxed image
+    def output(blob):
+        pred = np.zeros((len(blob), 6, 10), dtype=np.float32)
+        pred[:, :4, 0] = [320, 320, 100, 50]
+        pred[:, 5, 0] = 0.9
+        pred[:, :4, 1] = [322, 320, 100, 50] # Overlapping box, removed by NMS
+        pred[:, 5, 1] = 0.8
+        pred[:, 4, 2] = 0.2 # Below threshold
+        return pred
+    with patch('assembly.models.detection.Yolov8_onnx.export_onnx', return_value="dummy.onnx"), \
+         patch('assembly.models.detection.Yolov8_onnx.create_session', return_value=make_session(output)):
+        instance = YoloV8Onnx(model_weights="dummy.pt", classes=["class0", "class1"], iou_thres=0.3, imgsz=(640, 640))
+    instance.session.run.reset_mock()
+    return instance
+
+
+def test_letterbox():
+    image = np.zeros((480, 700, 3), dtype=np.uint8)
+    output, gain, pad = letterbox(image, new_shape=(640, 640))
+    assert output.shape == (640, 640, 3)
+    assert pad == (0, 100)
+    assert gain == pytest.approx((640 / 700, 439 / 480))
+    assert output[0, 0, 0] == 114
+
+
+def test_to_blob():
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    image[..., 2] = 255 # Red in BGR
+    blob = to_blob([image, image])
+    assert blob.shape == (2, 3, 4, 4)
+    assert blob.dtype == np.float32
+    assert np.all(blob[:, 0] == 1) and np.all(blob[:, 2] == 0)
+
+
+def test_nms():
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 10, 10], [20, 20, 30, 30]], dtype=np.float32)
+    scores = np.array([0.9, 0.95, 0.5], dtype=np.float32)
+    assert nms(boxes, scores, 0.5).tolist() == [1, 2]
+    assert nms(boxes, scores, 0.9).tolist() == [1, 0, 2]
+
+
+def test_call(yolov8_onnx_instance):
+    image = np.zeros((480, 700, 3), dtype=np.uint8)
+    boxes, class_names, scores = yolov8_onnx_instance(image)
+    assert class_names == ["class1"]
+    assert scores == [pytest.approx(0.9)]
+    # Box scaled back from the letterboxed image
+    assert boxes == [[295, 213, 404, 267]]
+
+
+def test_forward_batch(yolov8_onnx_instance):
+    images = [np.zeros((480, 700, 3), dtype=np.uint8), np.zeros((640, 640, 3), dtype=np.uint8)]
+    results = yolov8_onnx_instance.forward_batch(images)
+    assert yolov8_onnx_instance.session.run.call_count == 1 # Single session call for the batch
+    assert len(results) == 2
+    assert results[0] == yolov8_onnx_instance(images[0])
+    assert results[1][0] == [[270, 295, 370, 345]]
+    assert yolov8_onnx_instance([images[0]]) == results[:1]
+
+
+def test_no_detection(yolov8_onnx_instance):
+    yolov8_onnx_instance.score_thresh = 0.95
+    assert yolov8_onnx_instance(np.zeros((640, 640, 3), dtype=np.uint8)) == ([], [], [])
+
+
+@pytest.fixture
+def classification_onnx_instance():
+    output = lambda blob: np.tile(np.array([[0.1, 0.7, 0.2]], dtype=np.float32), (len(blob), 1))
+    with patch('assembly.models.classification.yolov8ClassificationOnnx.export_onnx', return_value="dummy.onnx"), \
+         patch('assembly.models.classification.yolov8ClassificationOnnx.create_session', return_value=make_session(output)):
+        return YoloV8ClassificationOnnx(model_weights="dummy.pt", classes=["a", "b", "c"], imgsz=(64, 64))
+
+
+def test_classification_call(classification_onnx_instance):
+    image = np.zeros((100, 150, 3), dtype=np.uint8)
+    assert classification_onnx_instance.preProcess(image).shape == (64, 64, 3)
+    class_name, class_conf = classification_onnx_instance(image)
+    assert class_name == "b"
+    assert class_conf == pytest.approx(0.7)
+
+
+def test_classification_forward_batch(classification_onnx_instance):
+    images = [np.zeros((100, 150, 3), dtype=np.uint8), np.zeros((30, 20, 3), dtype=np.uint8)]
+    results = classification_onnx_instance.forward_batch(images)
+    assert classification_onnx_instance.session.run.call_count == 1
+    assert [class_name for class_name, _ in results] == ["b", "b"]
+
+
+def test_classification_matches_ultralytics_on_non_square_images(tmp_path):
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    from ultralytics import YOLO
+    from assembly.models.classification.yolov8Classification import YoloV8Classification
+    # Untrained model with calibrated batch norms, so its output depends on the input
+    torch.manual_seed(0)
+    model = YOLO("yolov8n-cls.yaml", task="classify")
+    for module in model.model.modules():
+        if isinstance(module, torch.nn.BatchNorm2d):
+            module.momentum = None
+    model.model.train()
+    with torch.no_grad():
+        for _ in range(10):
+            model.model(torch.rand(16, 3, 64, 64))
+    model.model.eval()
+    weights = str(tmp_path / "cls.pt")
+    model.save(weights)
+
+    classes = [str(i) for i in range(1000)]
+    reference = YoloV8Classification(model_weights=weights, classes=classes, device="cpu", imgsz=(64, 64))
+    onnx_model = YoloV8ClassificationOnnx(model_weights=weights, classes=classes, imgsz=(64, 64))
+    image = np.random.default_rng(0).integers(0, 255, (90, 160, 3), dtype=np.uint8)
+    image[:, :50] = 0
+    for expected, result in zip([reference(image)] + reference([image, image[::-1].copy()]),
+                                [onnx_model(image)] + onnx_model([image, image[::-1].copy()])):
+        assert result[0] == expected[0]
+        assert result[1] == pytest.approx(expected[1], rel=1e-4)